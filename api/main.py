@@ -1,11 +1,40 @@
 # api/main.py
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from api.routes import router
+from api.routes import router, ingest_job_batch
+from core.client import init_client, close_client
+from utils.embedding_client import start_embedding_client, close_embedding_client
+from utils.chunking import warm_up
+from utils.jobs import start_job_queue, close_job_queue
+from utils.metrics import ServerTimingMiddleware, TimedJSONResponse, metrics_response
 
-app = FastAPI(title="Mercados Qdrant API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_client()
+    start_embedding_client()
+    # Los jobs interrumpidos por un reinicio se retoman desde su primer batch pendiente
+    await start_job_queue(ingest_job_batch).start()
+    # Los tokenizers se cargan en segundo plano para no demorar el arranque del worker
+    warming = asyncio.create_task(asyncio.to_thread(warm_up))
+    yield
+    warming.cancel()
+    await close_job_queue()
+    await close_embedding_client()
+    await close_client()
+
+app = FastAPI(title="Mercados Qdrant API", lifespan=lifespan, default_response_class=TimedJSONResponse)
+app.add_middleware(ServerTimingMiddleware)
 
 app.include_router(router, prefix="/api")
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Métricas de latencia por etapa, tamaños de batch, bytes y errores en formato Prometheus.
+    """
+    return metrics_response()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("api.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -1,30 +1,128 @@
 # api/routes.py
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Body
+import asyncio
+import json
+import tempfile
+from fastapi import APIRouter, Depends, HTTPException, Path, Body, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from api.schemas import (
     CreateCollectionRequest,
     DocumentItem,
     SearchRequest,
+    BatchSearchRequest,
     TitlesToDelete,
-    FilterRequest
+    FilterRequest,
+    PartitionProfileRequest,
+    METADATA_PAYLOAD_INDEXES
     )
 from core.client import (
     return_collection_names,
     create_collection,
+    create_partitioned_collection,
+    list_partitions,
+    drop_partition,
+    set_partition_profile,
+    ensure_payload_indexes,
     delete_collection,
     insert_data,
     search,
+    search_groups,
+    search_batch,
     get_collection_documents,
-    delete_document_by_title,
-    doc_filter
+    delete_documents_by_titles,
+    doc_filter,
+    iter_points,
+    point_to_dict
 )
 from api.dependencies import verify_api_key
-from utils.payload import build_payload, build_query_vector
+from core.profiles import search_params
+from utils.payload import build_payload, build_query_vector, build_query_vectors
 from utils.query_filters import build_filter
-from typing import List
+from utils.embedding_client import embedding_cache, start_embedding_client
+from utils.search_cache import search_cache
+from utils.projection import delete_projection
+from utils.pagination import encode_cursor, decode_cursor
+from utils.chunking import warm_up_error
+from utils.ingest import ingest_stream
+from utils.incremental import incremental_upload
+from utils.jobs import get_job_queue
+from utils.metrics import TimedORJSONResponse
+from typing import List, Optional
 
 router = APIRouter()
 
+# Bytes del body NDJSON que se mantienen en memoria antes de pasar a un archivo temporal
+NDJSON_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+def _parse_cursor(cursor: Optional[str]):
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def _stream_points(collection_name: str, filters, page_size: int, offset, with_vectors: bool, fields):
+    """
+    Recorre el scroll de forma perezosa y emite un punto por línea (NDJSON), página a página.
+    """
+    try:
+        async for points, _ in iter_points(collection_name, filters, page_size, offset, with_vectors, fields):
+            yield "".join(
+                json.dumps(point_to_dict(point, with_vectors), ensure_ascii=False) + "\n"
+                for point in points
+            )
+    except Exception as e:
+        yield json.dumps({"error": str(e)}) + "\n"
+
+async def _spool_body(request: Request):
+    """
+    Lee el body completo antes de responder y lo guarda en un archivo temporal (en memoria
+    hasta NDJSON_SPOOL_MAX_MEMORY). No se puede leer el body desde el iterador de un
+    StreamingResponse: Starlette escucha la desconexión del cliente con `receive()` al
+    mismo tiempo y las dos lecturas compiten por los mensajes del body.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=NDJSON_SPOOL_MAX_MEMORY)
+    try:
+        async for data in request.stream():
+            spool.write(data)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+async def _ndjson_documents(spool, read_size: int = 1 << 20):
+    """
+    Emite un DocumentItem por línea del body NDJSON guardado, leyendo de a bloques
+    de líneas fuera del event loop.
+    """
+    while True:
+        lines = await asyncio.to_thread(spool.readlines, read_size)
+        if not lines:
+            break
+        for line in lines:
+            if line.strip():
+                yield DocumentItem.parse_raw(line)
+
+async def ingest_job_batch(collection_name: str, documents: List[dict], options: dict) -> dict:
+    """
+    Procesa un batch de un job de ingesta en segundo plano (ver utils.jobs).
+    """
+    items = [DocumentItem.parse_obj(document) for document in documents]
+    chunk = options.get("chunk", True)
+
+    if options.get("incremental"):
+        result = await incremental_upload(collection_name, items, chunk=chunk)
+        result.setdefault("num_points", result.get("new", 0))
+    else:
+        payloads = await build_payload(items, chunk=chunk, collection_name=collection_name)
+        if payloads and "error" in payloads[0]:
+            return payloads[0]
+        result = await insert_data(collection_name, payloads)
+
+    search_cache.invalidate(collection_name)
+    return result
+
 @router.get("/", summary="Bienvenida a la API de Mercados Qdrant")
 async def welcome():
     """
@@ -43,12 +141,38 @@ async def ping():
     """
     return {"message": "Pong"}
 
+@router.get("/health/live", summary="Liveness")
+async def liveness():
+    """
+    El proceso está vivo y atiende requests.
+    """
+    return {"status": "alive"}
+
+@router.get("/health/ready", summary="Readiness")
+async def readiness(response: Response):
+    """
+    La API puede recibir tráfico: Qdrant y el servicio de embeddings responden.
+    Un fallo al precargar los tokenizers se informa pero no bloquea: se reintenta en el primer uso.
+    """
+    collections = await return_collection_names()
+    qdrant_ready = not (isinstance(collections, dict) and "error" in collections)
+    embeddings_ready = await start_embedding_client().ready()
+
+    if not (qdrant_ready and embeddings_ready):
+        response.status_code = 503
+    return {
+        "status": "ready" if qdrant_ready and embeddings_ready else "not_ready",
+        "qdrant": qdrant_ready,
+        "embeddings_service": embeddings_ready,
+        "tokenizers_error": warm_up_error()
+    }
+
 @router.get("/collections", dependencies=[Depends(verify_api_key)], summary="Listar todas las colecciones")
 async def list_collections():
     """
     Devuelve las colecciones de la base de datos.
     """
-    collections = return_collection_names()
+    collections = await return_collection_names()
     if isinstance(collections, dict) and "error" in collections:
         return {
             "status": "error",
@@ -67,7 +191,20 @@ async def create_new_collection(payload: CreateCollectionRequest):
     """
     Crea una nueva colección en Qdrant con el nombre proporcionado.
     """
-    result = create_collection(payload.name, payload.vectorsize)
+    if payload.partition_by:
+        result = await create_partitioned_collection(
+            payload.name, payload.partition_by, payload.vectorsize, METADATA_PAYLOAD_INDEXES,
+            payload.profile, payload.sharding_options()
+        )
+    else:
+        result = await create_collection(
+            payload.name, payload.vectorsize, METADATA_PAYLOAD_INDEXES, payload.profile, payload.sharding_options()
+        )
+    # create_collection recrea la colección si ya existía
+    search_cache.invalidate(payload.name)
+    if "error" not in result:
+        # La colección nueva guarda vectores completos; si falló, la existente conserva su proyección
+        delete_projection(payload.name)
 
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
@@ -76,13 +213,36 @@ async def create_new_collection(payload: CreateCollectionRequest):
         "status": "success",
         "message": f"Colección '{payload.name}' creada exitosamente",
         "collection": {
-            "name": payload.name
+            "name": payload.name,
+            "profile": payload.profile,
+            "sharding": payload.sharding,
+            "partition_by": payload.partition_by,
+            **payload.sharding_options()
         }
     }
 
+@router.post("/collections/{collection_name}/indexes", dependencies=[Depends(verify_api_key)], summary="Crear índices de payload faltantes")
+async def ensure_collection_indexes(collection_name: str = Path(..., description="Nombre de la colección")):
+    """
+    Crea en una colección existente los índices de payload declarados en METADATA_PAYLOAD_INDEXES.
+    """
+    result = await ensure_payload_indexes(collection_name, METADATA_PAYLOAD_INDEXES)
+
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+
+    return {
+        "status": "success",
+        "message": f"{len(result['created'])} índice(s) creado(s) en la colección '{collection_name}'",
+        "data": result
+    }
+
 @router.delete("/collections/{collection_name}", dependencies=[Depends(verify_api_key)], summary="Eliminar colección")
 async def delete_existing_collection(collection_name: str = Path(..., description="Nombre de la colección a eliminar")):
-    result = delete_collection(collection_name)
+    result = await delete_collection(collection_name)
+    search_cache.invalidate(collection_name)
+    if "error" not in result:
+        delete_projection(collection_name)
 
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
@@ -92,16 +252,94 @@ async def delete_existing_collection(collection_name: str = Path(..., descriptio
         "message": f"Colección '{collection_name}' eliminada exitosamente"
     }
 
+@router.get("/collections/{collection_name}/partitions", dependencies=[Depends(verify_api_key)], summary="Listar particiones por tiempo")
+async def get_partitions(collection_name: str = Path(..., description="Nombre de la colección particionada")):
+    """
+    Devuelve las particiones de una colección particionada por tiempo: período, puntos y almacenamiento.
+    """
+    result = await list_partitions(collection_name)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return {"status": "success", "data": result}
+
+@router.delete("/collections/{collection_name}/partitions/{partition}", dependencies=[Depends(verify_api_key)], summary="Eliminar una partición")
+async def delete_partition(
+    collection_name: str = Path(..., description="Nombre de la colección particionada"),
+    partition: str = Path(..., description="Clave de la partición, p. ej. 2024-05")
+):
+    """
+    Elimina la partición completa (una colección de Qdrant) en lugar de borrar sus puntos por filtro.
+    """
+    result = await drop_partition(collection_name, partition)
+    search_cache.invalidate(collection_name)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return {
+        "status": "success",
+        "message": f"Partición '{partition}' de la colección '{collection_name}' eliminada"
+    }
+
+@router.post("/collections/{collection_name}/partitions/{partition}/profile", dependencies=[Depends(verify_api_key)], summary="Cambiar el almacenamiento de una partición")
+async def update_partition_profile(
+    body: PartitionProfileRequest,
+    collection_name: str = Path(..., description="Nombre de la colección particionada"),
+    partition: str = Path(..., description="Clave de la partición, p. ej. 2024-05")
+):
+    """
+    Pasa la partición a otro perfil de almacenamiento; por defecto `disk-large`, para
+    llevar a disco los períodos viejos. Qdrant reconstruye los segmentos en segundo plano.
+    """
+    result = await set_partition_profile(collection_name, partition, body.profile)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return {
+        "status": "success",
+        "message": f"Partición '{partition}' pasando al perfil '{body.profile}'",
+        "data": result
+    }
+
 @router.post("/collections/{collection_name}/upload", summary="Subir documentos a una colección")
 async def upload_documents(
+    response: Response,
     collection_name: str = Path(..., description="Nombre de la colección"),
     data: List[DocumentItem] = Body(..., description="Lista de documentos a subir"),
-    chunk: bool = Body(True, description="Indica si se debe hacer chunking de los textos")
+    chunk: bool = Body(True, description="Indica si se debe hacer chunking de los textos"),
+    incremental: bool = Body(False, description="Embeber solo los fragmentos nuevos o modificados y eliminar los obsoletos de cada título"),
+    wait: bool = Body(True, description="Esperar a que Qdrant aplique cada batch; con false solo se encolan"),
+    background: bool = Body(False, description="Encolar la carga como job en segundo plano y responder de inmediato con su ID")
 ):
     if not data:
         raise HTTPException(status_code=400, detail="No se proporcionaron documentos para subir")
 
-    payloads = await build_payload(data, chunk=chunk)
+    if background:
+        job_id = await get_job_queue().submit(
+            collection_name,
+            [item.dict() for item in data],
+            {"chunk": chunk, "incremental": incremental}
+        )
+        response.status_code = 202
+        return {
+            "status": "accepted",
+            "message": f"{len(data)} documento(s) encolado(s) para la colección '{collection_name}'",
+            "job_id": job_id,
+            "status_url": f"/api/jobs/{job_id}"
+        }
+
+    if incremental:
+        result = await incremental_upload(collection_name, data, chunk=chunk)
+        search_cache.invalidate(collection_name)
+        if "error" in result:
+            raise HTTPException(status_code=500, detail=f"Error insertando datos: {result['error']}")
+        return {
+            "status": "success",
+            "message": (
+                f"{result['new']} fragmento(s) nuevo(s), {result['unchanged']} sin cambios y "
+                f"{result['deleted']} eliminado(s) en la colección '{collection_name}'"
+            ),
+            "data": result
+        }
+
+    payloads = await build_payload(data, chunk=chunk, collection_name=collection_name)
 
     # # Verificar si hay error en alguno de los payloads
     # for item in payloads:
@@ -109,92 +347,278 @@ async def upload_documents(
     #         raise HTTPException(status_code=400, detail=item["error"])
     
     # Insertar cada chunk
-    result = insert_data(collection_name, payloads)
-    if "error" in result:
+    result = await insert_data(collection_name, payloads, wait=wait)
+    search_cache.invalidate(collection_name, pending=not wait)
+    if "error" in result and not result.get("num_points"):
         raise HTTPException(status_code=500, detail=f"Error insertando datos: {result['error']}")
 
+    if "error" in result:
+        return {
+            "status": "partial",
+            "message": (
+                f"{result['num_points']} de {len(payloads)} fragmento(s) subido(s) a la colección "
+                f"'{collection_name}'; {len(result['failed_batches'])} batch(es) fallaron"
+            ),
+            "data": result
+        }
+
     return {
         "status": "success",
-        "message": f"{len(payloads)} fragmento(s) subido(s) a la colección '{collection_name}'"
+        "message": f"{len(payloads)} fragmento(s) {'subido(s)' if wait else 'encolado(s)'} a la colección '{collection_name}'",
+        "data": result
     }
 
-@router.post("/collections/{collection_name}/search", summary="Buscar documentos en una colección")
+@router.post("/collections/{collection_name}/upload/stream", summary="Subir documentos en streaming (NDJSON)")
+async def upload_documents_stream(
+    request: Request,
+    collection_name: str = Path(..., description="Nombre de la colección"),
+    chunk: bool = Query(True, description="Indica si se debe hacer chunking de los textos"),
+    batch_size: int = Query(16, ge=1, le=1000, description="Documentos por batch del pipeline"),
+    embed_concurrency: int = Query(2, ge=1, le=16, description="Batches embebiéndose en simultáneo"),
+    upsert_concurrency: int = Query(2, ge=1, le=16, description="Batches escribiéndose en Qdrant en simultáneo")
+):
+    """
+    Recibe un documento por línea (NDJSON) y los procesa en un pipeline de batches
+    (chunking, embeddings y upsert solapados). Responde con eventos de progreso en NDJSON.
+    El body se recibe completo antes de empezar a procesar y responder.
+    """
+    spool = await _spool_body(request)
+
+    async def sink(payloads):
+        result = await insert_data(collection_name, payloads)
+        search_cache.invalidate(collection_name)
+        return result
+
+    events = ingest_stream(
+        _ndjson_documents(spool),
+        sink,
+        batch_size=batch_size,
+        embed_concurrency=embed_concurrency,
+        upsert_concurrency=upsert_concurrency,
+        chunk=chunk,
+        collection_name=collection_name
+    )
+    return StreamingResponse(
+        (json.dumps(event, ensure_ascii=False) + "\n" async for event in events),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(spool.close)
+    )
+
+@router.post("/collections/{collection_name}/search", response_class=TimedORJSONResponse, summary="Buscar documentos en una colección")
 async def search_collection(collection_name: str, body: SearchRequest):
-    try:
-        query_vector = await build_query_vector(body.query)
-        print(body.metadata)
+    """
+    Búsqueda semántica. Los resultados se cachean por colección y request normalizado
+    hasta la próxima escritura en la colección.
+    Con `fields` solo se leen esos campos del payload, `snippet_chars` recorta el texto y
+    `group_by_title` devuelve `groups` (un grupo por documento) en lugar de `results`.
+    En colecciones con sharding por tags, `metadata.shard_keys` limita la búsqueda a esos shards.
+    """
+    async def run_search():
+        query_vector = await build_query_vector(body.query, collection_name)
         filters = build_filter(body.metadata)
-        print("Filters:", filters)
+        shard_keys = body.metadata.shard_keys if body.metadata else None
 
-        response = search(collection_name, query_vector, body.limit, filters, body.threshold)
+        params = search_params(body.hnsw_ef, body.exact, body.rescore, body.oversampling)
+        if body.group_by_title:
+            response = await search_groups(
+                collection_name, query_vector, body.limit, filters, body.threshold, params,
+                body.fields, body.snippet_chars, body.group_size, shard_keys=shard_keys
+            )
+        else:
+            response = await search(
+                collection_name, query_vector, body.limit, filters, body.threshold, params,
+                body.fields, body.snippet_chars, shard_keys
+            )
 
+        # Los errores se propagan como excepción para que no queden en el cache
         if "error" in response:
             raise HTTPException(status_code=500, detail=response["error"])
+        return response
 
-        return {
+    try:
+        request_key = search_cache.request_key(
+            body.query,
+            metadata=body.metadata.dict() if body.metadata else None,
+            limit=body.limit,
+            threshold=body.threshold,
+            hnsw_ef=body.hnsw_ef,
+            exact=body.exact,
+            rescore=body.rescore,
+            oversampling=body.oversampling,
+            fields=sorted(body.fields) if body.fields is not None else None,
+            snippet_chars=body.snippet_chars,
+            group_size=body.group_size if body.group_by_title else None
+        )
+        response = await search_cache.get_or_compute(collection_name, request_key, run_search)
+
+        key = "groups" if body.group_by_title else "results"
+        return TimedORJSONResponse({
             "status": "success",
             "message": "Search completed",
             "data": {
                 "collection_name": response["collection_name"],
-                "results": response["results"]
+                key: response[key]
             }
-        }
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
     
-@router.get("/collections/{collection_name}/docs", summary="Ver documentos en una colección")
-async def get_documents(collection_name: str):
+@router.post("/collections/{collection_name}/search/batch", response_class=TimedORJSONResponse, summary="Ejecutar varias búsquedas en una colección")
+async def search_collection_batch(collection_name: str, body: BatchSearchRequest):
+    """
+    Ejecuta varias búsquedas con un único llamado al servicio de embeddings y un único
+    request de búsqueda en batch a Qdrant. Los resultados se devuelven en el orden de `searches`.
+    """
+    if any(item.group_by_title for item in body.searches):
+        raise HTTPException(status_code=400, detail="group_by_title no está soportado en búsquedas en batch")
+
+    try:
+        query_vectors = await build_query_vectors([item.query for item in body.searches], collection_name)
+        queries = [
+            {
+                "query_vector": vector,
+                "limit": item.limit,
+                "filters": build_filter(item.metadata),
+                "threshold": item.threshold,
+                "params": search_params(item.hnsw_ef, item.exact, item.rescore, item.oversampling),
+                "payload_fields": item.fields,
+                "snippet_chars": item.snippet_chars,
+                "shard_keys": item.metadata.shard_keys if item.metadata else None
+            } for item, vector in zip(body.searches, query_vectors)
+        ]
+
+        response = await search_batch(collection_name, queries)
+        if "error" in response:
+            raise HTTPException(status_code=500, detail=response["error"])
+
+        return TimedORJSONResponse({
+            "status": "success",
+            "message": f"{len(queries)} search(es) completed",
+            "data": {
+                "collection_name": response["collection_name"],
+                "results": response["results"]
+            }
+        })
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+
+@router.get("/collections/{collection_name}/docs", response_class=TimedORJSONResponse, summary="Ver documentos en una colección")
+async def get_documents(
+    collection_name: str,
+    cursor: Optional[str] = Query(None, description="Cursor opaco devuelto en 'next_cursor' por la página anterior"),
+    page_size: int = Query(1000, ge=1, le=10000, description="Número de puntos por página"),
+    fields: Optional[List[str]] = Query(None, description="Campos del payload a devolver, p. ej. 'metadata.title'"),
+    with_vectors: bool = Query(False, description="Incluir los vectores en la respuesta"),
+    stream: bool = Query(False, description="Devolver toda la colección como NDJSON, página a página")
+):
     """
-    Obtiene todos los documentos de una colección.
+    Obtiene los documentos de una colección, paginados por cursor y agrupados por título.
+    Con `stream=true` recorre toda la colección y emite un punto por línea (NDJSON).
     """
+    offset = _parse_cursor(cursor)
+    if stream:
+        return StreamingResponse(
+            _stream_points(collection_name, None, page_size, offset, with_vectors, fields),
+            media_type="application/x-ndjson"
+        )
+
     try:
-        documents = get_collection_documents(collection_name)
+        documents = await get_collection_documents(collection_name, page_size, offset, with_vectors, fields)
         if "error" in documents:
             raise HTTPException(status_code=500, detail=documents["error"])
         
-        return {
+        next_cursor = encode_cursor(documents.pop("next_offset"))
+        return TimedORJSONResponse({
             "status": "success",
             "message": f"Documents retrieved from collection '{collection_name}'",
-            "data": documents
-        }
+            "data": documents,
+            "next_cursor": next_cursor
+        })
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving documents: {str(e)}")
     
 @router.post("/collections/{collection_name}/docs/delete", summary="Eliminar documentos por títulos")
 async def delete_documents(collection_name: str, body: TitlesToDelete):
-    errors = []
-    results = []
-    for title in body.titles:
-        result = delete_document_by_title(collection_name, title)
-        if "error" in result:
-            errors.append({"title": title, "error": result["error"]})
-        else:
-            results.append(result)
+    """
+    Elimina todos los fragmentos cuyos títulos estén en la lista, con un único filtro en Qdrant.
+    Devuelve la cantidad de fragmentos eliminados por título.
+    """
+    if not body.titles:
+        raise HTTPException(status_code=400, detail="No se proporcionaron títulos para eliminar")
+
+    result = await delete_documents_by_titles(collection_name, body.titles, wait=body.wait)
+    search_cache.invalidate(collection_name, pending=not body.wait)
+    if "error" in result:
+        raise HTTPException(status_code=500, detail=f"Error eliminando documentos: {result['error']}")
 
-    if errors:
-        return {
-            "status": "partial_success",
-            "message": "Algunos documentos no pudieron ser eliminados",
-            "errors": errors,
-            "results": results
-        }
     return {
         "status": "success",
-        "message": "Documentos eliminados correctamente",
-        "results": results
+        "message": "Documentos eliminados correctamente" if body.wait else "Eliminación encolada en Qdrant",
+        "results": result
     }
 
-@router.post("/collections/{collection_name}/filter")
+@router.post("/collections/{collection_name}/filter", response_class=TimedORJSONResponse)
 async def filter_documents(
     collection_name: str = Path(..., description="Nombre de la colección"),
     body: FilterRequest = Body(..., description="Criterios de filtro")
 ):
     """
     Filtra documentos en una colección según los criterios de búsqueda y filtros proporcionados.
+    Los resultados se paginan con `limit` y `cursor`; con `stream=true` se devuelven todos como NDJSON.
     """
     filters = build_filter(body.metadata)
-    response = doc_filter(collection_name, filters)
-    return response
+    offset = _parse_cursor(body.cursor)
+    if body.stream:
+        return StreamingResponse(
+            _stream_points(collection_name, filters, body.limit, offset, body.with_vectors, body.fields),
+            media_type="application/x-ndjson"
+        )
+
+    response = await doc_filter(collection_name, filters, body.limit, offset, body.with_vectors, body.fields)
+    if "next_offset" in response:
+        response["next_cursor"] = encode_cursor(response.pop("next_offset"))
+    return TimedORJSONResponse(response)
+
+@router.get("/jobs/{job_id}", summary="Estado de un job de ingesta")
+async def get_job(job_id: str = Path(..., description="ID devuelto al encolar la carga")):
+    """
+    Devuelve el estado del job, el avance por batches y los puntos subidos.
+    """
+    job = await get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' no encontrado")
+    return {"status": "success", "data": job}
+
+@router.post("/jobs/{job_id}/cancel", summary="Cancelar un job de ingesta")
+async def cancel_job(job_id: str = Path(..., description="ID devuelto al encolar la carga")):
+    """
+    Cancela el job antes de su siguiente batch. Los batches ya subidos se conservan.
+    """
+    job = await get_job_queue().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' no encontrado")
+    return {"status": "success", "message": "Cancelación solicitada", "data": job}
+
+@router.get("/embeddings/cache", dependencies=[Depends(verify_api_key)], summary="Estadísticas del cache de embeddings")
+async def embeddings_cache_stats():
+    """
+    Devuelve los contadores de hits/misses del cache de embeddings.
+    """
+    return {
+        "status": "success",
+        "data": embedding_cache.stats()
+    }
+
+@router.get("/search/cache", dependencies=[Depends(verify_api_key)], summary="Estadísticas del cache de búsquedas")
+async def search_cache_stats():
+    """
+    Devuelve los contadores de hits/misses/coalescidos del cache de resultados de búsqueda.
+    """
+    return {
+        "status": "success",
+        "data": search_cache.stats()
+    }
         
\ No newline at end of file
@@ -1,9 +1,61 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
 from typing import List, Optional
+from core.partitions import GRANULARITIES
+from core.profiles import STORAGE_PROFILES
 
 class CreateCollectionRequest(BaseModel):
     name: str
-    vectorsize: int = Field(384, description="Tamaño del vector para la colección, por defecto 384")
+    vectorsize: int = Field(512, description="Tamaño del vector para la colección: 512 (salida del modelo) o la dimensión de su proyección")
+    profile: str = Field("default", description=f"Perfil de almacenamiento: {', '.join(STORAGE_PROFILES)}")
+    shard_number: Optional[int] = Field(None, ge=1, description="Shards de la colección (con sharding 'tags', shards por tag)")
+    replication_factor: Optional[int] = Field(None, ge=1, description="Copias de cada shard en nodos distintos del cluster")
+    write_consistency_factor: Optional[int] = Field(None, ge=1, description="Réplicas que deben confirmar cada escritura")
+    sharding: str = Field("auto", description="'auto' (hash del ID) o 'tags' (un shard key por primer tag del documento)")
+    partition_by: Optional[str] = Field(None, description=f"Particionar por metadata.date en colecciones por período: {', '.join(GRANULARITIES)}")
+
+    @validator("profile")
+    def validate_profile(cls, value):
+        if value not in STORAGE_PROFILES:
+            raise ValueError(f"Perfil desconocido: {value}. Opciones: {', '.join(STORAGE_PROFILES)}")
+        return value
+
+    @validator("sharding")
+    def validate_sharding(cls, value):
+        if value not in ("auto", "tags"):
+            raise ValueError(f"Sharding desconocido: {value}. Opciones: auto, tags")
+        return value
+
+    @validator("partition_by")
+    def validate_partition_by(cls, value):
+        if value is not None and value not in GRANULARITIES:
+            raise ValueError(f"Granularidad desconocida: {value}. Opciones: {', '.join(GRANULARITIES)}")
+        return value
+
+    @validator("write_consistency_factor")
+    def validate_write_consistency(cls, value, values):
+        replication = values.get("replication_factor") or 1
+        if value is not None and value > replication:
+            raise ValueError(f"write_consistency_factor ({value}) no puede superar replication_factor ({replication})")
+        return value
+
+    def sharding_options(self) -> dict:
+        """Argumentos de core.profiles.sharding_config; vacío si se usan los defaults del servidor."""
+        options = {
+            "shard_number": self.shard_number,
+            "replication_factor": self.replication_factor,
+            "write_consistency_factor": self.write_consistency_factor,
+            "custom_sharding": self.sharding == "tags" or None,
+        }
+        return {key: value for key, value in options.items() if value is not None}
+
+class PartitionProfileRequest(BaseModel):
+    profile: str = Field("disk-large", description=f"Perfil de almacenamiento de la partición: {', '.join(STORAGE_PROFILES)}")
+
+    @validator("profile")
+    def validate_profile(cls, value):
+        if value not in STORAGE_PROFILES:
+            raise ValueError(f"Perfil desconocido: {value}. Opciones: {', '.join(STORAGE_PROFILES)}")
+        return value
 
 class Metadata(BaseModel):
     title: str = Field(..., description="Título del documento")
@@ -12,6 +64,14 @@ class Metadata(BaseModel):
     url : Optional[str] = Field(None, description="URL del documento")
     images: Optional[List[str]] = Field(None, description="URLs o identificadores de imágenes")
 
+# Índices de payload para los campos de Metadata usados en filtros y eliminaciones.
+# Clave: ruta en el payload de Qdrant; valor: tipo de índice. `date` se guarda en ms UTC.
+METADATA_PAYLOAD_INDEXES = {
+    "metadata.title": "keyword",
+    "metadata.tags": "keyword",
+    "metadata.date": "integer",
+}
+
 class DocumentItem(BaseModel):
     text: str = Field(..., description="Texto completo del documento")
     metadata: Optional[Metadata] = Field(None, description="Metadatos asociados al documento")
@@ -20,12 +80,24 @@ class QueryMetadata(BaseModel):
     tags: Optional[List[str]] = Field(None, description="Lista de etiquetas para filtrar resultados")
     date_1: Optional[str] = Field(None, description="Fecha de inicio en formato YYYY-MM-DD")
     date_2: Optional[str] = Field(None, description="Fecha de fin en formato YYYY-MM-DD")
+    shard_keys: Optional[List[str]] = Field(None, description="Solo en colecciones con sharding 'tags': buscar únicamente en los shards de estos shard keys (primer tag de cada documento)")
 
 class SearchRequest(BaseModel):
     query: str = Field(..., description="Texto de consulta para generar el vector de búsqueda")
     metadata : Optional[QueryMetadata] = Field(None, description="Metadatos opcionales para filtrar resultados")
     limit: int = Field(10, description="Número máximo de resultados a retornar")
     threshold: float = Field(0.3, description="Umbral de similitud para filtrar resultados")
+    hnsw_ef: Optional[int] = Field(None, ge=1, description="Candidatos explorados en el HNSW; más alto = más recall y latencia")
+    exact: bool = Field(False, description="Búsqueda exhaustiva sin índice (referencia de recall, lenta)")
+    rescore: Optional[bool] = Field(None, description="Recalcular scores con los vectores originales en colecciones cuantizadas")
+    oversampling: Optional[float] = Field(None, ge=1, description="Factor de candidatos extra de la copia cuantizada antes del rescoring")
+    fields: Optional[List[str]] = Field(None, description="Campos del payload a devolver, p. ej. 'metadata.title'; lista vacía = sin payload")
+    snippet_chars: Optional[int] = Field(None, ge=1, description="Truncar el 'text' de cada resultado a esta cantidad de caracteres")
+    group_by_title: bool = Field(False, description="Agrupar los resultados por título: `limit` pasa a ser el número de documentos")
+    group_size: int = Field(1, ge=1, le=100, description="Fragmentos por documento cuando se agrupa por título")
+
+class BatchSearchRequest(BaseModel):
+    searches: List[SearchRequest] = Field(..., min_items=1, max_items=1000, description="Búsquedas a ejecutar; los resultados se devuelven en el mismo orden")
 
 class EmbeddingsRequest(BaseModel):
     texts: List[str]
@@ -35,7 +107,12 @@ class EmbeddingsResponse(BaseModel):
 
 class TitlesToDelete(BaseModel):
     titles: List[str]
+    wait: bool = Field(True, description="Esperar a que Qdrant aplique la eliminación antes de responder")
 
 class FilterRequest(BaseModel):
     metadata : Optional[QueryMetadata] = Field(None, description="Metadatos opcionales para filtrar resultados")
-    limit: int = Field(10, description="Número máximo de resultados a retornar")
\ No newline at end of file
+    limit: int = Field(10, ge=1, le=10000, description="Número máximo de resultados por página")
+    cursor: Optional[str] = Field(None, description="Cursor opaco devuelto en 'next_cursor' por la página anterior")
+    fields: Optional[List[str]] = Field(None, description="Campos del payload a devolver, p. ej. 'metadata.title'")
+    with_vectors: bool = Field(False, description="Incluir los vectores en la respuesta")
+    stream: bool = Field(False, description="Devolver todos los resultados como NDJSON, página a página")
\ No newline at end of file
@@ -0,0 +1,243 @@
+# benchmarks/bench_api.py
+"""
+Benchmark end-to-end de la API sin servicios externos.
+
+Levanta la app FastAPI en proceso (httpx + ASGITransport) contra Qdrant embebido
+(":memory:" o un directorio local) y un embedder falso determinista, y mide:
+
+  - ingest: documentos/seg y fragmentos/seg a través de /upload
+  - search: latencia p50/p95/p99 bajo carga concurrente, sin y con filtros de metadata
+            (solo requests exitosos; con errores el resultado se marca inválido y el
+            proceso termina con código 1)
+  - docs:   recorrido completo de /docs paginado por cursor sobre la colección cargada
+
+El resultado es un JSON apto para comparar entre versiones.
+
+Uso:
+    python -m benchmarks.bench_api --docs 2000 --queries 500 --concurrency 16 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from benchmarks.bench_chunking import make_documents
+from benchmarks.standins import DEFAULT_DIM, configure_local_qdrant, install_fake_embedder, percentiles
+
+COLLECTION = "bench"
+TAGS = ["mercados", "bonos", "acciones", "divisas", "commodities", "macro", "tasas", "empresas"]
+
+
+def make_items(texts: list[str], seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "text": text,
+            "metadata": {
+                "title": f"doc-{i}",
+                "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "tags": rng.sample(TAGS, 2),
+            }
+        } for i, text in enumerate(texts)
+    ]
+
+
+def make_queries(count: int, filtered: bool, seed: int = 1) -> list[dict]:
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        query = {"query": f"consulta {i} sobre {rng.choice(TAGS)} y tasas de interés", "limit": 10, "threshold": 0.0}
+        if filtered:
+            month = rng.randint(1, 11)
+            query["metadata"] = {
+                "tags": [rng.choice(TAGS)],
+                "date_1": f"2024-{month:02d}-01",
+                "date_2": f"2024-{month + 1:02d}-01",
+            }
+        queries.append(query)
+    return queries
+
+
+async def bench_ingest(http, items: list[dict], batch_size: int, chunk: bool) -> dict:
+    started = time.perf_counter()
+    chunks = 0
+    for start in range(0, len(items), batch_size):
+        response = await http.post(
+            f"/api/collections/{COLLECTION}/upload",
+            json={"data": items[start:start + batch_size], "chunk": chunk}
+        )
+        response.raise_for_status()
+        chunks += int(response.json()["message"].split()[0])
+    seconds = time.perf_counter() - started
+    return {
+        "documents": len(items),
+        "chunks": chunks,
+        "seconds": seconds,
+        "docs_per_sec": len(items) / seconds,
+        "chunks_per_sec": chunks / seconds,
+    }
+
+
+async def bench_search(http, queries: list[dict], concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+    first_error = None
+
+    async def run(query: dict) -> None:
+        nonlocal errors, first_error
+        async with semaphore:
+            started = time.perf_counter()
+            response = await http.post(f"/api/collections/{COLLECTION}/search", json=query)
+            elapsed = (time.perf_counter() - started) * 1000
+            # Un error rápido (p. ej. 500 inmediato) no debe mejorar los percentiles
+            if response.status_code != 200:
+                errors += 1
+                first_error = first_error or f"{response.status_code}: {response.text[:200]}"
+            else:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(query) for query in queries))
+    seconds = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "queries_per_sec": len(latencies) / seconds,
+        "errors": errors,
+        "valid": errors == 0,
+        **({"first_error": first_error} if first_error else {}),
+        **percentiles(latencies),
+    }
+
+
+async def check_search(http) -> None:
+    """
+    Una búsqueda de prueba antes de medir: si la búsqueda está rota (p. ej. un cliente de
+    Qdrant incompatible) el benchmark se corta con el error en lugar de medir solo fallos.
+    """
+    query = make_queries(1, False)[0]
+    response = await http.post(f"/api/collections/{COLLECTION}/search", json=query)
+    if response.status_code != 200:
+        raise RuntimeError(f"La búsqueda de prueba falló ({response.status_code}): {response.text[:500]}")
+
+
+async def bench_docs(http, page_size: int) -> dict:
+    latencies = []
+    points = 0
+    cursor = None
+    started = time.perf_counter()
+    while True:
+        params = {"page_size": page_size}
+        if cursor:
+            params["cursor"] = cursor
+        page_started = time.perf_counter()
+        response = await http.get(f"/api/collections/{COLLECTION}/docs", params=params)
+        latencies.append((time.perf_counter() - page_started) * 1000)
+        response.raise_for_status()
+        body = response.json()
+        points += sum(len(chunks) for chunks in body["data"]["documents_by_title"].values())
+        cursor = body.get("next_cursor")
+        if not cursor:
+            break
+    seconds = time.perf_counter() - started
+    return {
+        "page_size": page_size,
+        "pages": len(latencies),
+        "points": points,
+        "seconds": seconds,
+        "points_per_sec": points / seconds if seconds else 0.0,
+        "page_latency": percentiles(latencies),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+async def run(args) -> dict:
+    import httpx
+    from api.main import app
+    from utils.search_cache import search_cache
+
+    if not args.search_cache:
+        # Medir búsquedas reales, no hits del cache de resultados
+        search_cache.ttl = 0
+    fake = install_fake_embedder(args.dim, args.embed_latency_ms)
+
+    texts = make_documents(args.docs, args.paragraphs, args.sentences)
+    items = make_items(texts)
+    headers = {"Authorization": os.environ["API_KEY"]}
+    results = {}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=None) as http:
+            response = await http.post("/api/collections/create", json={"name": COLLECTION, "vectorsize": args.dim})
+            response.raise_for_status()
+
+            results["ingest"] = await bench_ingest(http, items, args.upload_batch, not args.no_chunk)
+            await check_search(http)
+            results["search_unfiltered"] = await bench_search(http, make_queries(args.queries, False), args.concurrency)
+            results["search_filtered"] = await bench_search(http, make_queries(args.queries, True), args.concurrency)
+            results["docs_listing"] = await bench_docs(http, args.page_size)
+
+    results["embedder"] = {"calls": fake.calls, "texts": fake.texts}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--paragraphs", type=int, default=6)
+    parser.add_argument("--sentences", type=int, default=6)
+    parser.add_argument("--upload-batch", type=int, default=100, help="Documentos por request a /upload")
+    parser.add_argument("--no-chunk", action="store_true", help="Subir cada documento como un único fragmento")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM)
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="Latencia simulada del servicio de embeddings")
+    parser.add_argument("--location", default=":memory:", help="':memory:' o un directorio para Qdrant embebido")
+    parser.add_argument("--search-cache", action="store_true", help="Mantener activo el cache de resultados de búsqueda")
+    parser.add_argument("--output", help="Archivo donde escribir el JSON (por defecto stdout)")
+    args = parser.parse_args()
+
+    configure_local_qdrant(args.location)
+    os.environ.setdefault("API_KEY", "bench")
+
+    started = time.perf_counter()
+    results = asyncio.run(run(args))
+    report = {
+        "benchmark": "api",
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "params": vars(args),
+        "wall_seconds": time.perf_counter() - started,
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    invalid = [name for name, result in results.items() if result.get("valid") is False]
+    if invalid:
+        sys.exit(f"Resultados inválidos por requests fallidos: {', '.join(invalid)}")
+
+
+if __name__ == "__main__":
+    main()
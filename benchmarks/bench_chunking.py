@@ -0,0 +1,133 @@
+# benchmarks/bench_chunking.py
+"""
+Micro-benchmark del chunking sobre documentos largos en español.
+
+Compara el splitter anterior (recuento cuadrático, solapamiento en oraciones) con el
+actual en palabras y en tokens del modelo, y el modo con pool de procesos.
+
+Uso:
+    python -m benchmarks.bench_chunking --docs 200 --paragraphs 40 --processes 4
+"""
+
+import argparse
+import json
+import random
+import time
+
+from utils.chunking import text_splitter, count_words, get_token_counter, split_texts, sent_tokenize
+
+SENTENCES = [
+    "El índice bursátil cerró la jornada con una suba moderada impulsada por el sector energético.",
+    "Los analistas esperan que el banco central mantenga la tasa de referencia sin cambios.",
+    "La inflación mensual se desaceleró por tercer mes consecutivo según el instituto de estadística.",
+    "Las exportaciones de soja alcanzaron un récord histórico durante el primer trimestre del año.",
+    "El tipo de cambio oficial mostró una leve depreciación frente al dólar estadounidense.",
+    "Las empresas tecnológicas lideraron las ganancias en la bolsa de Nueva York.",
+    "El gobierno anunció un paquete de medidas para estimular la inversión en infraestructura.",
+    "Los bonos soberanos registraron una caída en sus precios tras la publicación del informe fiscal.",
+    "La demanda de crédito hipotecario creció gracias a la baja de las tasas de interés.",
+    "Según fuentes del mercado, la licitación del Tesoro superó las expectativas oficiales.",
+]
+
+
+def make_documents(docs: int, paragraphs: int, sentences_per_paragraph: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        "\n".join(
+            " ".join(rng.choice(SENTENCES) for _ in range(sentences_per_paragraph))
+            for _ in range(paragraphs)
+        )
+        for _ in range(docs)
+    ]
+
+
+def legacy_text_splitter(text: str, max_words: int = 300, overlap: int = 50) -> list[str]:
+    """Implementación anterior de utils.chunking.text_splitter, como línea de base."""
+    paragraphs = [p.strip() for p in text.split('\n') if p.strip() and len(p.strip().split()) >= 3]
+    chunks = []
+    for para in paragraphs:
+        if len(para.split()) <= max_words:
+            chunks.append(para)
+        else:
+            sentences = sent_tokenize(para, language="spanish")
+            chunk = []
+            count = 0
+            for sent in sentences:
+                sent_words = sent.split()
+                if count + len(sent_words) <= max_words:
+                    chunk.append(sent)
+                    count += len(sent_words)
+                else:
+                    chunks.append(" ".join(chunk))
+                    chunk = chunk[-overlap:] if overlap < len(chunk) else chunk
+                    chunk.append(sent)
+                    count = sum(len(s.split()) for s in chunk)
+            if chunk:
+                chunks.append(" ".join(chunk))
+    return chunks
+
+
+def measure(name: str, fn, texts: list[str], repeat: int) -> dict:
+    best = float("inf")
+    chunks = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        chunks = sum(len(result) for result in fn(texts))
+        best = min(best, time.perf_counter() - started)
+    return {
+        "name": name,
+        "seconds": best,
+        "chunks": chunks,
+        "chunks_per_sec": chunks / best if best else 0.0,
+        "docs_per_sec": len(texts) / best if best else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=40)
+    parser.add_argument("--sentences", type=int, default=60, help="Oraciones por párrafo")
+    parser.add_argument("--max-words", type=int, default=300)
+    parser.add_argument("--overlap", type=int, default=50)
+    parser.add_argument("--max-tokens", type=int, default=126)
+    parser.add_argument("--overlap-tokens", type=int, default=16)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-tokens", action="store_true", help="No medir el modo tokens (requiere el tokenizer)")
+    args = parser.parse_args()
+
+    texts = make_documents(args.docs, args.paragraphs, args.sentences)
+    results = [
+        measure("legacy_words", lambda ts: [legacy_text_splitter(t, args.max_words, args.overlap) for t in ts], texts, args.repeat),
+        measure("words", lambda ts: [text_splitter(t, args.max_words, args.overlap, count_words) for t in ts], texts, args.repeat),
+    ]
+    if not args.skip_tokens:
+        counter = get_token_counter()
+        results.append(measure(
+            "tokens",
+            lambda ts: [text_splitter(t, args.max_tokens, args.overlap_tokens, counter) for t in ts],
+            texts, args.repeat
+        ))
+    if args.processes > 1:
+        unit = "words" if args.skip_tokens else "tokens"
+        max_size = args.max_words if args.skip_tokens else args.max_tokens
+        overlap = args.overlap if args.skip_tokens else args.overlap_tokens
+        # Primera llamada fuera de la medición para no contar el arranque del pool
+        split_texts(texts[:args.processes * 2], max_size, overlap, unit, args.processes, min_chars=0)
+        results.append(measure(
+            f"{unit}_pool_{args.processes}",
+            lambda ts: split_texts(ts, max_size, overlap, unit, args.processes, min_chars=0),
+            texts, args.repeat
+        ))
+
+    print(json.dumps({
+        "benchmark": "chunking",
+        "docs": args.docs,
+        "chars": sum(len(t) for t in texts),
+        "results": results,
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
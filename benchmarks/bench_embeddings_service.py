@@ -0,0 +1,122 @@
+# benchmarks/bench_embeddings_service.py
+"""
+Throughput de encode del servicio de embeddings según el tamaño de batch.
+
+Para cada tamaño de batch mide textos/seg llamando directamente a `encode` y, con
+`--concurrency`, a través del EmbeddingBatcher del servicio con requests concurrentes
+de un texto (el patrón de las búsquedas). Con `--fake` usa un encoder determinista
+para validar el harness sin descargar el modelo.
+
+Uso:
+    python -m benchmarks.bench_embeddings_service --backend onnx --batch-sizes 1 8 32 64 128
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import time
+
+from benchmarks.bench_chunking import make_documents
+from benchmarks.standins import FakeEncoder, percentiles
+from embeddings_service.backends import BACKENDS
+from embeddings_service.batching import EmbeddingBatcher
+
+MODEL_NAME = "sentence-transformers/distiluse-base-multilingual-cased-v2"
+
+
+def bench_encode(model, texts: list[str], batch_size: int, repeat: int) -> dict:
+    model.encode(texts[:batch_size], batch_size=batch_size)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for start in range(0, len(texts), batch_size):
+            model.encode(texts[start:start + batch_size], batch_size=batch_size)
+        best = min(best, time.perf_counter() - started)
+    return {
+        "batch_size": batch_size,
+        "seconds": best,
+        "texts_per_sec": len(texts) / best,
+        "ms_per_batch": 1000 * best / -(-len(texts) // batch_size),
+    }
+
+
+async def bench_batcher(model, texts: list[str], batch_size: int, concurrency: int, max_wait_ms: float) -> dict:
+    batcher = EmbeddingBatcher(model.encode, max_batch_size=batch_size, max_wait_ms=max_wait_ms)
+    await batcher.start()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def request(text: str) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await batcher.encode([text])
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(request(text) for text in texts))
+    seconds = time.perf_counter() - started
+    await batcher.stop()
+
+    stats = batcher.stats()
+    return {
+        "batch_size": batch_size,
+        "concurrency": concurrency,
+        "texts_per_sec": len(texts) / seconds,
+        "avg_batch_size": stats["avg_batch_size"],
+        "avg_fill_ratio": stats["avg_fill_ratio"],
+        "latency": percentiles(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="torch", choices=BACKENDS)
+    parser.add_argument("--fake", action="store_true", help="Usar un encoder falso en lugar del modelo")
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 16, 32, 64, 128])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=0, help="Requests concurrentes contra el batcher (0 = omitir)")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--cache-dir", default="/opt/embed_backends")
+    parser.add_argument("--output", help="Archivo donde escribir el JSON (por defecto stdout)")
+    args = parser.parse_args()
+
+    if args.fake:
+        model = FakeEncoder()
+    else:
+        from embeddings_service.backends import load_encoder
+
+        model = load_encoder(MODEL_NAME, args.backend, args.cache_dir)
+
+    # Textos de longitud variable, como los fragmentos de una ingesta real
+    texts = [
+        text[: 80 + (i * 37) % 600]
+        for i, text in enumerate(make_documents(args.texts, 1, 8))
+    ]
+
+    results = {"encode": [bench_encode(model, texts, size, args.repeat) for size in args.batch_sizes]}
+    if args.concurrency:
+        results["batcher"] = [
+            asyncio.run(bench_batcher(model, texts, size, args.concurrency, args.max_wait_ms))
+            for size in args.batch_sizes
+        ]
+
+    report = {
+        "benchmark": "embeddings_service",
+        "model": "fake" if args.fake else MODEL_NAME,
+        "backend": None if args.fake else args.backend,
+        "python": platform.python_version(),
+        "params": vars(args),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
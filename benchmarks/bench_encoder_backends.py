@@ -0,0 +1,83 @@
+# benchmarks/bench_encoder_backends.py
+"""
+Precisión vs. velocidad de los backends de inferencia del servicio de embeddings.
+
+Para cada backend mide textos/seg y la similitud coseno de sus embeddings contra
+el baseline PyTorch fp32 sobre el mismo conjunto de textos en español.
+
+Uso:
+    python -m benchmarks.bench_encoder_backends --backends torch onnx onnx-int8 --texts 512
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmarks.bench_chunking import make_documents
+from embeddings_service.backends import BACKENDS, load_encoder
+
+MODEL_NAME = "sentence-transformers/distiluse-base-multilingual-cased-v2"
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def measure(model, texts: list[str], batch_size: int, repeat: int) -> tuple:
+    model.encode(texts[:batch_size], batch_size=batch_size)
+    best = float("inf")
+    embeddings = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        embeddings = model.encode(texts, batch_size=batch_size)
+        best = min(best, time.perf_counter() - started)
+    return np.asarray(embeddings, dtype=np.float32), best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cache-dir", default="/opt/embed_backends")
+    parser.add_argument("--quantization", default="avx2")
+    args = parser.parse_args()
+
+    # Textos de longitud variable: de una oración a un párrafo corto
+    texts = [
+        text[: 80 + (i * 37) % 600]
+        for i, text in enumerate(make_documents(args.texts, 1, 8))
+    ]
+
+    baseline, baseline_seconds = measure(load_encoder(MODEL_NAME, "torch"), texts, args.batch_size, args.repeat)
+    baseline = normalize(baseline)
+
+    results = []
+    for backend in args.backends:
+        model = load_encoder(MODEL_NAME, backend, args.cache_dir, args.quantization)
+        embeddings, seconds = measure(model, texts, args.batch_size, args.repeat)
+        cosine = np.sum(normalize(embeddings) * baseline, axis=1)
+        results.append({
+            "backend": backend,
+            "seconds": seconds,
+            "texts_per_sec": len(texts) / seconds,
+            "speedup_vs_fp32": baseline_seconds / seconds,
+            "cosine_mean": float(cosine.mean()),
+            "cosine_min": float(cosine.min()),
+            "cosine_p01": float(np.percentile(cosine, 1)),
+        })
+
+    print(json.dumps({
+        "benchmark": "encoder_backends",
+        "model": MODEL_NAME,
+        "texts": len(texts),
+        "batch_size": args.batch_size,
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
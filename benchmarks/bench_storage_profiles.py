@@ -0,0 +1,186 @@
+# benchmarks/bench_storage_profiles.py
+"""
+Memoria vs. recall de los perfiles de almacenamiento de colecciones.
+
+Para cada perfil de core.profiles crea una colección en un Qdrant real (QDRANT_HOST /
+QDRANT_PORT; el modo embebido ignora cuantización y HNSW), carga vectores sintéticos
+agrupados en clusters, espera a que termine la indexación y mide recall@k contra la
+búsqueda exacta calculada con numpy, más la latencia p50/p95, para distintos `hnsw_ef`
+y con/sin rescoring. La RAM y el disco de cada colección se leen de la telemetría de
+Qdrant una vez indexada (`memory_measured`, suma de los segmentos de los shards locales
+del nodo consultado) y se reportan junto a la estimación a partir de la configuración
+del perfil (`memory_estimate`).
+
+Qdrant solo construye el HNSW por encima de su `indexing_threshold` (~10k vectores de
+512 dimensiones), así que conviene usar al menos 50k vectores.
+
+Uso:
+    python -m benchmarks.bench_storage_profiles --vectors 100000 --queries 200 --profiles default int8-quantized disk-large
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Optional
+
+import numpy as np
+
+from benchmarks.standins import percentiles
+from core.client import create_collection, delete_collection, get_client, insert_data, search
+from core.profiles import STORAGE_PROFILES, search_params
+
+
+def make_vectors(count: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    """Vectores unitarios agrupados alrededor de centroides, más parecidos a embeddings reales que ruido uniforme."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centroids[rng.integers(0, clusters, count)] + 0.6 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def estimate_memory(profile: str, count: int, dim: int) -> dict:
+    """Estimación de RAM y disco del perfil: vectores fp32, copia cuantizada y grafo HNSW."""
+    spec = STORAGE_PROFILES[profile]
+    m = spec.get("hnsw", {}).get("m", 16)
+    fp32 = count * dim * 4
+    quantized = {"int8": count * dim, "binary": count * dim // 8}.get(spec.get("quantization"), 0)
+    # Cada nodo guarda ~2*m vecinos en la capa 0, IDs de 4 bytes
+    graph = count * m * 2 * 4
+
+    vectors_on_disk = spec["on_disk"]
+    graph_on_disk = spec.get("hnsw", {}).get("on_disk", False)
+    ram = quantized + (0 if vectors_on_disk else fp32) + (0 if graph_on_disk else graph)
+    disk = (fp32 if vectors_on_disk else 0) + (graph if graph_on_disk else 0)
+    return {"ram_bytes": ram, "disk_bytes": disk, "ram_vs_fp32": ram / (fp32 + graph)}
+
+
+async def measure_memory(collection_name: str) -> Optional[dict]:
+    """
+    RAM y disco que Qdrant reporta para la colección en la telemetría de sus segmentos.
+    None si no hay telemetría (modo embebido) o la colección no tiene shards en este nodo.
+    """
+    try:
+        response = await get_client().http.service_api.telemetry(details_level=3)
+    except Exception:
+        return None
+    collections = (response.result.collections.collections if response.result.collections else None) or []
+    for collection in collections:
+        if getattr(collection, "id", None) != collection_name:
+            continue
+        totals = {"ram_bytes": 0, "disk_bytes": 0, "vectors_bytes": 0, "segments": 0}
+        for shard in collection.shards or []:
+            segments = (shard.local.segments if shard.local else None) or []
+            for segment in segments:
+                totals["ram_bytes"] += segment.info.ram_usage_bytes or 0
+                totals["disk_bytes"] += segment.info.disk_usage_bytes or 0
+                totals["vectors_bytes"] += segment.info.vectors_size_bytes or 0
+                totals["segments"] += 1
+        return totals if totals["segments"] else None
+    return None
+
+
+async def wait_indexed(collection_name: str, count: int, timeout: float) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        info = await get_client().get_collection(collection_name=collection_name)
+        if str(info.status).lower().endswith("green") and (info.indexed_vectors_count or 0) >= count * 0.9:
+            break
+        await asyncio.sleep(1)
+    return time.perf_counter() - started
+
+
+async def bench_profile(args, profile: str, vectors: np.ndarray, queries: np.ndarray, truth: np.ndarray) -> dict:
+    collection_name = f"bench_profile_{profile.replace('-', '_')}"
+    result = await create_collection(collection_name, vectors.shape[1], profile=profile)
+    if "error" in result:
+        return {"profile": profile, "error": result["error"]}
+
+    started = time.perf_counter()
+    data = [
+        {"id": i, "text": "", "embedding": vector, "metadata": {}}
+        for i, vector in enumerate(vectors)
+    ]
+    inserted = await insert_data(collection_name, data)
+    upload_seconds = time.perf_counter() - started
+    if "error" in inserted:
+        return {"profile": profile, "error": inserted["error"]}
+    index_seconds = await wait_indexed(collection_name, len(vectors), args.index_timeout)
+    measured = await measure_memory(collection_name)
+
+    quantized = "quantization" in STORAGE_PROFILES[profile]
+    settings = [{"hnsw_ef": ef} for ef in args.hnsw_ef]
+    if quantized:
+        settings += [{"hnsw_ef": ef, "rescore": True, "oversampling": args.oversampling} for ef in args.hnsw_ef]
+
+    runs = []
+    for setting in settings:
+        params = search_params(**setting)
+        latencies = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            query_started = time.perf_counter()
+            response = await search(collection_name, query.tolist(), args.k, None, 0.0, params)
+            latencies.append((time.perf_counter() - query_started) * 1000)
+            if "error" in response:
+                return {"profile": profile, "error": response["error"]}
+            found = {int(item["id"]) for item in response["results"]}
+            hits += len(found & set(expected.tolist()))
+        runs.append({
+            **setting,
+            f"recall@{args.k}": hits / (len(queries) * args.k),
+            "latency": percentiles(latencies),
+        })
+
+    if not args.keep:
+        await delete_collection(collection_name)
+
+    return {
+        "profile": profile,
+        "config": STORAGE_PROFILES[profile],
+        "upload_seconds": upload_seconds,
+        "index_seconds": index_seconds,
+        "memory_measured": measured,
+        "memory_estimate": estimate_memory(profile, len(vectors), vectors.shape[1]),
+        "runs": runs,
+    }
+
+
+async def run(args) -> list:
+    vectors = make_vectors(args.vectors, args.dim, args.clusters)
+    queries = make_vectors(args.queries, args.dim, args.clusters, seed=1)
+    # Vecinos exactos por producto interno (vectores normalizados = coseno)
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.k]
+    return [await bench_profile(args, profile, vectors, queries, truth) for profile in args.profiles]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=list(STORAGE_PROFILES), choices=list(STORAGE_PROFILES))
+    parser.add_argument("--vectors", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--clusters", type=int, default=64)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--hnsw-ef", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--oversampling", type=float, default=2.0)
+    parser.add_argument("--index-timeout", type=float, default=600)
+    parser.add_argument("--keep", action="store_true", help="No borrar las colecciones al terminar")
+    parser.add_argument("--output", help="Archivo donde escribir el JSON (por defecto stdout)")
+    args = parser.parse_args()
+
+    report = {
+        "benchmark": "storage_profiles",
+        "params": vars(args),
+        "results": asyncio.run(run(args)),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
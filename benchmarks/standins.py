@@ -0,0 +1,94 @@
+# benchmarks/standins.py
+"""
+Reemplazos locales para correr la API sin servicios externos: un embedder falso
+determinista en lugar del servicio de embeddings y Qdrant en modo embebido
+(QDRANT_LOCATION). Solo se usan desde los benchmarks.
+"""
+
+import asyncio
+import hashlib
+import os
+
+import numpy as np
+
+DEFAULT_DIM = 512
+
+
+def configure_local_qdrant(location: str = ":memory:") -> None:
+    """Apunta core.client a Qdrant embebido. Debe llamarse antes de crear el cliente."""
+    os.environ["QDRANT_LOCATION"] = location
+
+
+def fake_embedding(text: str, dim: int = DEFAULT_DIM) -> np.ndarray:
+    """Vector unitario pseudoaleatorio derivado del hash del texto: mismo texto, mismo vector."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class FakeEmbeddingClient:
+    """
+    Mismo contrato que utils.embedding_client.EmbeddingServiceClient, sin red.
+
+    Args:
+        dim (int): Dimensión de los vectores.
+        latency_ms (float): Latencia simulada por llamado, para aproximar el round trip real.
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM, latency_ms: float = 0.0):
+        self.dim = dim
+        self.latency = latency_ms / 1000
+        self.calls = 0
+        self.texts = 0
+        self.encoder = "fake"
+
+    async def embed(self, texts: list[str], operation: str = "query") -> np.ndarray:
+        self.calls += 1
+        self.texts += len(texts)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+        return np.stack([fake_embedding(text, self.dim) for text in texts])
+
+    async def ready(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        pass
+
+
+def install_fake_embedder(dim: int = DEFAULT_DIM, latency_ms: float = 0.0) -> FakeEmbeddingClient:
+    """
+    Registra el embedder falso como cliente compartido de utils.embedding_client;
+    `start_embedding_client()` lo devuelve en lugar de crear el cliente HTTP.
+    """
+    from utils import embedding_client
+
+    fake = FakeEmbeddingClient(dim, latency_ms)
+    embedding_client._service_client = fake
+    return fake
+
+
+class FakeEncoder:
+    """Modelo falso con la interfaz `encode` de SentenceTransformer, para el modo encode."""
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        self.dim = dim
+
+    def encode(self, texts, batch_size: int = 32, **kwargs) -> np.ndarray:
+        return np.stack([fake_embedding(text, self.dim) for text in texts])
+
+
+def percentiles(samples_ms: list[float]) -> dict:
+    if not samples_ms:
+        return {"count": 0}
+    values = np.asarray(samples_ms)
+    return {
+        "count": len(samples_ms),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
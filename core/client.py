@@ -1,52 +1,600 @@
 # core/client.py
 
-from qdrant_client import QdrantClient
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+import asyncio
+import heapq
+import time
+import httpx
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import (
-    VectorParams,
-    Distance,
-    PointStruct,
-    PointIdsList
+    Batch,
+    PayloadSelectorInclude,
+    Filter,
+    FieldCondition,
+    MatchAny,
+    FilterSelector,
+    PointIdsList,
+    PayloadSchemaType
 )
-from utils.ids import generate_uuid4
+from qdrant_client import models
+from core import partitions
+from core.profiles import collection_config, profile_update, sharding_config
+from utils.ids import generate_point_id
 from utils.serialization import serialize_metadata
+from utils.env import get_env_var
+from utils.metrics import timed, observe_batch
 import numpy as np
 
-client = QdrantClient(
-    host="qdrant",
-    port= 6333
-)
+# Máximo de consultas `count` simultáneas al eliminar por títulos
+COUNT_CONCURRENCY = 16
+
+# Puntos por request de upsert y requests de upsert simultáneos en insert_data
+UPSERT_BATCH_SIZE = int(get_env_var("QDRANT_UPSERT_BATCH", 256))
+UPSERT_CONCURRENCY = int(get_env_var("QDRANT_UPSERT_CONCURRENCY", 4))
+
+# Shard key de los puntos sin tags en colecciones con sharding personalizado
+DEFAULT_SHARD_KEY = "untagged"
+
+# Particiones consultadas a la vez en colecciones particionadas por tiempo
+PARTITION_CONCURRENCY = int(get_env_var("PARTITION_CONCURRENCY", 8))
+
+# Mínimo de segundos entre relecturas de la lista de particiones de una colección lógica
+PARTITIONS_REFRESH_SECONDS = 5.0
+
+_client: Optional[AsyncQdrantClient] = None
+
+# Mínimo de segundos entre relecturas de los shard keys cuando una búsqueda pide un tag desconocido
+SHARD_KEYS_REFRESH_SECONDS = 5.0
+
+# colección -> shard keys conocidos, o None si la colección no usa sharding personalizado
+_sharding: Dict[str, Optional[Set[str]]] = {}
+_sharding_loaded_at: Dict[str, float] = {}
+
+# colección lógica -> (momento de la lectura, clave de partición -> colección física)
+_partitions: Dict[str, Tuple[float, Dict[str, str]]] = {}
+_partitions_lock = asyncio.Lock()
+
+def init_client() -> AsyncQdrantClient:
+    """
+    Create the shared async Qdrant client from QDRANT_HOST, QDRANT_PORT and
+    QDRANT_POOL_SIZE. Called from the application lifespan. With
+    QDRANT_PREFER_GRPC=true data operations go over gRPC (QDRANT_GRPC_PORT).
+
+    QDRANT_LOCATION switches to Qdrant's embedded local mode (no server):
+    ":memory:" keeps everything in RAM, any other value is a storage directory.
+    Used by the benchmarks and for local development.
+    """
+    global _client
+    if _client is None:
+        location = get_env_var("QDRANT_LOCATION")
+        if location:
+            _client = AsyncQdrantClient(location=location) if location == ":memory:" else AsyncQdrantClient(path=location)
+            return _client
+
+        pool_size = int(get_env_var("QDRANT_POOL_SIZE", 20))
+        _client = AsyncQdrantClient(
+            host=get_env_var("QDRANT_HOST", "qdrant"),
+            port=int(get_env_var("QDRANT_PORT", 6333)),
+            grpc_port=int(get_env_var("QDRANT_GRPC_PORT", 6334)),
+            prefer_grpc=get_env_var("QDRANT_PREFER_GRPC", "false").lower() == "true",
+            timeout=int(get_env_var("QDRANT_TIMEOUT", 30)),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+    return _client
+
+async def close_client() -> None:
+    """
+    Close the shared Qdrant client and its connection pool.
+    """
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+def get_client() -> AsyncQdrantClient:
+    """
+    Return the shared client, creating it lazily outside of the app lifespan (scripts).
+    """
+    return _client if _client is not None else init_client()
 
-def create_collection(collection_name: str, vectorsize: int = 384):
+async def create_collection(
+    collection_name: str,
+    vectorsize: int = 512,
+    payload_indexes: Optional[Dict[str, str]] = None,
+    profile: str = "default",
+    sharding: Optional[dict] = None,
+    recreate: bool = True
+):
     """
     Create a collection in Qdrant with the specified name.
+    `profile` selects the storage layout (see core.profiles.STORAGE_PROFILES):
+    quantization, on-disk vectors/payload and HNSW settings.
+    `sharding` holds the cluster layout (see core.profiles.sharding_config): shard
+    number, replication factor, write consistency and custom sharding by first tag.
+    If `payload_indexes` is given, the payload indexes are created right after.
+    With recreate=False an existing collection is kept as is instead of being dropped.
     """
     try:
-        client.recreate_collection(
-            collection_name=collection_name,
-            vectors_config=VectorParams(
-                size=vectorsize,  # TODO: Comprobar que embeddings utilizar y ajustar el tamaño
-                distance=Distance.COSINE
+        _sharding.pop(collection_name, None)
+        config = {**collection_config(profile, vectorsize), **sharding_config(**(sharding or {}))}
+        if recreate:
+            # Recrear como colección simple una que estaba particionada
+            if partitions.get_spec(collection_name) is not None:
+                deleted = await delete_collection(collection_name)
+                if "error" in deleted:
+                    return deleted
+            await get_client().recreate_collection(collection_name=collection_name, **config)
+        else:
+            try:
+                await get_client().create_collection(collection_name=collection_name, **config)
+            except Exception as e:
+                if "already exists" not in str(e).lower():
+                    raise
+        result = {"status": "Collection created successfully", "collection_name": collection_name, "profile": profile}
+        if sharding:
+            result["sharding"] = sharding
+        if payload_indexes:
+            indexes = await ensure_payload_indexes(collection_name, payload_indexes)
+            if "error" in indexes:
+                return indexes
+            result["payload_indexes"] = indexes["created"]
+        return result
+    except Exception as e:
+        return {"error": str(e), "collection_name": collection_name}
+
+async def ensure_payload_indexes(collection_name: str, payload_indexes: Dict[str, str]):
+    """
+    Create the missing payload indexes of a collection.
+
+    Args:
+        collection_name (str): Collection name.
+        payload_indexes (dict): Payload path -> Qdrant index type ("keyword", "integer", ...).
+
+    Returns:
+        dict: Created and already existing indexes, or an error.
+    """
+    try:
+        client = get_client()
+        info = await client.get_collection(collection_name=collection_name)
+        existing = info.payload_schema or {}
+        created = []
+        for field_name, field_type in payload_indexes.items():
+            if field_name in existing:
+                continue
+            await client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=PayloadSchemaType(field_type),
+                wait=True
             )
-        )
-        return {"status": "Collection created successfully", "collection_name": collection_name}
+            created.append(field_name)
+        return {
+            "status": "Payload indexes ensured",
+            "collection_name": collection_name,
+            "created": created,
+            "existing": [name for name in payload_indexes if name not in created]
+        }
     except Exception as e:
         return {"error": str(e), "collection_name": collection_name}
 
-def delete_collection(collection_name: str):
+async def delete_collection(collection_name: str):
+    """
+    Delete a collection. For a time-partitioned collection every partition is
+    deleted (together with its alias) and the partitioning spec is removed.
+    """
     try:
-        client.delete_collection(collection_name=collection_name)
+        _sharding.pop(collection_name, None)
+        if partitions.get_spec(collection_name) is not None:
+            existing = await collection_partitions(collection_name, refresh=True)
+            for physical_name in existing.values():
+                await get_client().delete_collection(collection_name=physical_name)
+            partitions.delete_spec(collection_name)
+            _partitions.pop(collection_name, None)
+            return {
+                "status": "Collection deleted successfully",
+                "collection_name": collection_name,
+                "partitions": sorted(existing)
+            }
+        await get_client().delete_collection(collection_name=collection_name)
         return {"status": "Collection deleted successfully", "collection_name": collection_name}
     except Exception as e:
         return {"error": str(e), "collection_name": collection_name}
 
-def insert_data(collection_name: str, data: list):
+async def create_partitioned_collection(
+    collection_name: str,
+    granularity: str = "month",
+    vectorsize: int = 512,
+    payload_indexes: Optional[Dict[str, str]] = None,
+    profile: str = "default",
+    sharding: Optional[dict] = None
+):
+    """
+    Create a time-partitioned logical collection (see core.partitions). Physical
+    partitions are created on demand when points with a new period arrive, all with
+    the same vector size, payload indexes, profile and sharding. Like `create_collection`,
+    an existing collection or partition set with this name is dropped first.
+    """
+    try:
+        if granularity not in partitions.GRANULARITIES:
+            raise ValueError(f"Granularidad desconocida: {granularity}. Opciones: {', '.join(partitions.GRANULARITIES)}")
+        collection_config(profile, vectorsize)
+
+        client = get_client()
+        if partitions.get_spec(collection_name) is not None:
+            deleted = await delete_collection(collection_name)
+            if "error" in deleted:
+                return deleted
+        else:
+            # El nombre lógico queda reservado para el alias
+            await client.delete_collection(collection_name=collection_name)
+            for physical_name in (await collection_partitions(collection_name, refresh=True)).values():
+                await client.delete_collection(collection_name=physical_name)
+
+        partitions.save_spec(collection_name, {
+            "granularity": granularity,
+            "vectorsize": vectorsize,
+            "payload_indexes": payload_indexes or {},
+            "profile": profile,
+            "sharding": sharding or {},
+        })
+        _partitions[collection_name] = (time.monotonic(), {})
+        return {
+            "status": "Partitioned collection created successfully",
+            "collection_name": collection_name,
+            "granularity": granularity,
+            "profile": profile
+        }
+    except Exception as e:
+        return {"error": str(e), "collection_name": collection_name}
+
+async def collection_partitions(collection_name: str, refresh: bool = False) -> Dict[str, str]:
+    """
+    Existing partitions of a logical collection: partition key -> physical collection.
+    The list is cached and re-read from Qdrant at most every PARTITIONS_REFRESH_SECONDS
+    (other API instances may have created partitions).
+    """
+    cached = _partitions.get(collection_name)
+    if refresh or cached is None or time.monotonic() - cached[0] > PARTITIONS_REFRESH_SECONDS:
+        collections = (await get_client().get_collections()).collections
+        found = {}
+        for collection in collections:
+            key = partitions.parse_partition(collection_name, collection.name)
+            if key is not None:
+                found[key] = collection.name
+        cached = (time.monotonic(), found)
+        _partitions[collection_name] = cached
+    return cached[1]
+
+async def _point_alias(collection_name: str, existing: Dict[str, str]) -> None:
+    """
+    Point the logical name alias to the latest partition, so tools that address
+    the logical collection directly read the most recent data.
+    """
+    latest = partitions.latest(set(existing))
+    client = get_client()
+    aliases = (await client.get_aliases()).aliases
+    current = next((alias.collection_name for alias in aliases if alias.alias_name == collection_name), None)
+    if latest is None or current == existing[latest]:
+        return
+
+    operations = []
+    if current is not None:
+        operations.append(models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=collection_name)))
+    operations.append(models.CreateAliasOperation(
+        create_alias=models.CreateAlias(collection_name=existing[latest], alias_name=collection_name)
+    ))
+    await client.update_collection_aliases(change_aliases_operations=operations)
+
+async def ensure_partitions(collection_name: str, keys) -> Dict[str, str]:
+    """
+    Create the missing partitions for `keys` and move the alias if a newer one appeared.
+    """
+    spec = partitions.get_spec(collection_name)
+    async with _partitions_lock:
+        existing = await collection_partitions(collection_name)
+        missing = [key for key in keys if key not in existing]
+        for key in missing:
+            physical_name = partitions.partition_name(collection_name, key)
+            created = await create_collection(
+                physical_name,
+                spec["vectorsize"],
+                spec["payload_indexes"],
+                spec["profile"],
+                spec["sharding"],
+                recreate=False
+            )
+            if "error" in created:
+                raise RuntimeError(created["error"])
+            existing[key] = physical_name
+        if missing:
+            await _point_alias(collection_name, existing)
+    return existing
+
+async def _partition_targets(collection_name: str, filters=None) -> Optional[Dict[str, str]]:
+    """
+    Partitions a read must touch: those overlapping the `metadata.date` range of
+    `filters`, or all of them without a range. None if the collection is not partitioned.
+    """
+    spec = partitions.get_spec(collection_name)
+    if spec is None:
+        return None
+    existing = await collection_partitions(collection_name)
+    keys = partitions.overlapping(existing, spec["granularity"], partitions.date_window(filters))
+    return {key: existing[key] for key in keys}
+
+async def _fan_out(calls) -> list:
+    """
+    Await the given coroutines with at most PARTITION_CONCURRENCY running at once.
+    """
+    semaphore = asyncio.Semaphore(max(1, PARTITION_CONCURRENCY))
+
+    async def run(call):
+        async with semaphore:
+            return await call
+
+    return await asyncio.gather(*(run(call) for call in calls))
+
+async def list_partitions(collection_name: str):
+    """
+    Describe the partitions of a logical collection: period, points and storage.
+    """
+    try:
+        spec = partitions.get_spec(collection_name)
+        if spec is None:
+            return {"error": f"La colección '{collection_name}' no está particionada", "collection_name": collection_name}
+        existing = await collection_partitions(collection_name, refresh=True)
+        keys = sorted(existing)
+        infos = await _fan_out(get_client().get_collection(collection_name=existing[key]) for key in keys)
+
+        items = []
+        for key, info in zip(keys, infos):
+            bounds = partitions.partition_bounds(key, spec["granularity"])
+            vectors = info.config.params.vectors
+            items.append({
+                "key": key,
+                "collection_name": existing[key],
+                "start": bounds[0] if bounds else None,
+                "end": bounds[1] if bounds else None,
+                "points_count": info.points_count,
+                "status": str(info.status),
+                "vectors_on_disk": bool(getattr(vectors, "on_disk", False)),
+                "payload_on_disk": bool(info.config.params.on_disk_payload),
+            })
+        return {
+            "status": "Partitions retrieved",
+            "collection_name": collection_name,
+            "granularity": spec["granularity"],
+            "partitions": items
+        }
+    except Exception as e:
+        return {"error": str(e), "collection_name": collection_name}
+
+async def drop_partition(collection_name: str, key: str):
+    """
+    Delete one partition of a logical collection: a single collection drop instead
+    of a delete-by-filter over the whole corpus.
+    """
+    try:
+        if partitions.get_spec(collection_name) is None:
+            return {"error": f"La colección '{collection_name}' no está particionada", "collection_name": collection_name}
+        async with _partitions_lock:
+            existing = await collection_partitions(collection_name, refresh=True)
+            if key not in existing:
+                return {"error": f"Partición '{key}' no encontrada", "collection_name": collection_name}
+            await get_client().delete_collection(collection_name=existing.pop(key))
+            if existing:
+                await _point_alias(collection_name, existing)
+        return {"status": "Partition deleted successfully", "collection_name": collection_name, "partition": key}
+    except Exception as e:
+        return {"error": str(e), "collection_name": collection_name}
+
+async def set_partition_profile(collection_name: str, key: str, profile: str = "disk-large"):
+    """
+    Move one partition to another storage profile (e.g. old months to disk-large).
+    Qdrant rebuilds the segments in the background.
+    """
+    try:
+        if partitions.get_spec(collection_name) is None:
+            return {"error": f"La colección '{collection_name}' no está particionada", "collection_name": collection_name}
+        existing = await collection_partitions(collection_name, refresh=True)
+        if key not in existing:
+            return {"error": f"Partición '{key}' no encontrada", "collection_name": collection_name}
+        await get_client().update_collection(collection_name=existing[key], **profile_update(profile))
+        return {
+            "status": "Partition profile updated",
+            "collection_name": collection_name,
+            "partition": key,
+            "profile": profile
+        }
+    except Exception as e:
+        return {"error": str(e), "collection_name": collection_name}
+
+def shard_key_for(payload: Optional[dict]) -> str:
+    """
+    Shard key of a point in a custom-sharded collection: its stored 'metadata.shard_key'
+    if it has one (points copied between collections), otherwise the first tag.
+    """
+    metadata = (payload or {}).get("metadata") or {}
+    if metadata.get("shard_key"):
+        return str(metadata["shard_key"])
+    tags = metadata.get("tags")
+    return str(tags[0]) if tags else DEFAULT_SHARD_KEY
+
+def _with_shard_key(payload: dict) -> dict:
+    """
+    Copy of the payload with its routing key stored as 'metadata.shard_key', so the shard
+    a point lives in can be read back and a search can target it explicitly.
+    """
+    metadata = payload.get("metadata") or {}
+    return {**payload, "metadata": {**metadata, "shard_key": shard_key_for(payload)}}
+
+async def _drop_moved_points(collection_name: str, ids: list, payloads: List[dict]) -> None:
+    """
+    Delete the copies of `ids` stored under a different shard key than the one they
+    are about to be written to (e.g. a re-uploaded document whose first tag changed);
+    otherwise the upsert would leave a duplicate in the old shard.
+    """
+    client = get_client()
+    new_keys = {str(point_id): payload["metadata"]["shard_key"] for point_id, payload in zip(ids, payloads)}
+    stored = await client.retrieve(
+        collection_name=collection_name,
+        ids=ids,
+        with_payload=PayloadSelectorInclude(include=["metadata.shard_key"]),
+        with_vectors=False
+    )
+    moved = defaultdict(list)
+    for point in stored:
+        old_key = ((point.payload or {}).get("metadata") or {}).get("shard_key")
+        if old_key is not None and old_key != new_keys.get(str(point.id)):
+            moved[old_key].append(point.id)
+    for old_key, point_ids in moved.items():
+        await client.delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=point_ids),
+            shard_key_selector=old_key,
+            wait=True
+        )
+
+async def _load_sharding(collection_name: str) -> Optional[Set[str]]:
+    """
+    Detect custom sharding with get_collection and read the existing shard keys
+    from the cluster info. Returns None for regular collections.
+    """
+    client = get_client()
+    info = await client.get_collection(collection_name=collection_name)
+    if info.config.params.sharding_method != models.ShardingMethod.CUSTOM:
+        return None
+    cluster = (await client.http.cluster_api.collection_cluster_info(collection_name=collection_name)).result
+    return {
+        str(shard.shard_key)
+        for shard in [*cluster.local_shards, *cluster.remote_shards]
+        if shard.shard_key is not None
+    }
+
+async def collection_shard_keys(collection_name: str, refresh: bool = False) -> Optional[Set[str]]:
+    """
+    Known shard keys of a custom-sharded collection (None if it is not custom-sharded).
+    The result is cached per collection; `refresh` re-reads it from Qdrant.
+    """
+    if refresh or collection_name not in _sharding:
+        _sharding[collection_name] = await _load_sharding(collection_name)
+        _sharding_loaded_at[collection_name] = time.monotonic()
+    return _sharding[collection_name]
+
+async def ensure_shard_keys(collection_name: str, keys) -> None:
+    """
+    Create the shard keys that do not exist yet. Each one gets the collection's
+    shard number and replication factor.
+    """
+    known = await collection_shard_keys(collection_name)
+    for key in keys:
+        if key in known:
+            continue
+        try:
+            await get_client().create_shard_key(collection_name=collection_name, shard_key=key)
+        except Exception as e:
+            # Otro batch concurrente (u otra instancia de la API) pudo haberlo creado
+            if "already exists" not in str(e).lower():
+                raise
+        known.add(key)
+
+async def shard_key_selector(collection_name: str, shard_keys: Optional[List[str]]):
+    """
+    Resolve the shards a search must touch from the requested shard keys. Each point
+    lives only in the shard of its 'metadata.shard_key', so restricting the search to
+    those shards is an exact filter on that field (a tag filter, which matches any tag
+    of a point, must search every shard).
+
+    Returns:
+        None to search every shard (no tags, or the collection is not custom-sharded),
+        or the list of existing shard keys among `shard_keys` (empty if none exists,
+        meaning no point can match).
+    """
+    if not shard_keys:
+        return None
+    known = await collection_shard_keys(collection_name)
+    if known is None:
+        return None
+    # Otra instancia de la API pudo haber creado shard keys nuevos
+    stale = time.monotonic() - _sharding_loaded_at.get(collection_name, 0) > SHARD_KEYS_REFRESH_SECONDS
+    if stale and not set(shard_keys) <= known:
+        known = await collection_shard_keys(collection_name, refresh=True)
+    return [key for key in dict.fromkeys(shard_keys) if key in known]
+
+async def upsert_points(collection_name: str, ids: list, vectors, payloads: List[dict], wait: bool = True) -> None:
+    """
+    Upsert already-built points (IDs, vector matrix and payloads) in a single request.
+    In custom-sharded collections the points are split by shard key (first tag),
+    one request per key, creating the missing keys first and removing the copies
+    left under a previous key.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    observe_batch("qdrant_upsert", len(ids))
+
+    if await collection_shard_keys(collection_name) is None:
+        groups = {None: list(range(len(ids)))}
+    else:
+        payloads = [_with_shard_key(payload) for payload in payloads]
+        groups = defaultdict(list)
+        for index, payload in enumerate(payloads):
+            groups[payload["metadata"]["shard_key"]].append(index)
+        await ensure_shard_keys(collection_name, groups)
+        await _drop_moved_points(collection_name, ids, payloads)
+
+    with timed("qdrant_upsert"):
+        for shard_key, indexes in groups.items():
+            # Una sola conversión de la matriz del batch en lugar de validar cada PointStruct
+            points = Batch(
+                ids=[ids[i] for i in indexes],
+                vectors=vectors[indexes].tolist(),
+                payloads=[payloads[i] for i in indexes]
+            )
+            await get_client().upsert(
+                collection_name=collection_name,
+                points=points,
+                wait=wait,
+                shard_key_selector=shard_key
+            )
+
+async def _upsert_batch(collection_name: str, data: list, wait: bool) -> None:
+    await upsert_points(
+        collection_name,
+        ids=[
+            item.get("id") or generate_point_id(
+                collection_name, (item.get("metadata") or {}).get("title"), item["text"]
+            ) for item in data
+        ],
+        vectors=[item["embedding"] for item in data],
+        payloads=[
+            {
+                "text": item["text"],
+                "metadata": serialize_metadata(item.get("metadata", {}))
+            } for item in data
+        ],
+        wait=wait
+    )
+
+async def insert_data(
+    collection_name: str,
+    data: list,
+    batch_size: int = UPSERT_BATCH_SIZE,
+    parallel: int = UPSERT_CONCURRENCY,
+    wait: bool = True
+):
     """
     Inserta una lista de documentos en la colección especificada de Qdrant.
 
     Cada documento debe ser un dict con:
-      - 'embedding': lista de floats (vector embebido)
+      - 'embedding': vector embebido (fila de np.ndarray o lista de floats)
       - 'text': texto asociado al documento
       - 'metadata': dict opcional con campos adicionales (title, date, tags, etc.)
+      - 'id': ID opcional; si falta se deriva de la colección, el título y el texto,
+        de modo que volver a subir el mismo fragmento lo sobrescribe en lugar de duplicarlo.
+
+    Los puntos se envían en batches de `batch_size`, hasta `parallel` a la vez. Un batch
+    fallido no cancela los demás: el resultado detalla qué batches fallaron y, como los IDs
+    son deterministas, reintentar la carga completa es idempotente.
 
     La función serializa automáticamente los campos datetime en metadata
     para que sean compatibles con el formato JSON de Qdrant.
@@ -54,66 +602,421 @@ def insert_data(collection_name: str, data: list):
     Args:
         collection_name (str): Nombre de la colección en Qdrant.
         data (list): Lista de documentos con embedding, text y metadata.
+        batch_size (int): Puntos por request de upsert.
+        parallel (int): Requests de upsert simultáneos.
+        wait (bool): Si es False, Qdrant confirma cada batch al encolarlo, sin esperar a que se aplique.
+
+    En colecciones particionadas por tiempo (core.partitions) cada documento va a la
+    partición de su `metadata.date`, creándola si hace falta.
 
     Returns:
-        dict: Resultado del upsert o error en caso de excepción.
+        dict: Puntos insertados y batches fallidos. Incluye "error" si falló al menos un batch.
     """
+    spec = partitions.get_spec(collection_name)
+    if spec is not None:
+        return await _insert_partitioned(collection_name, spec, data, batch_size, parallel, wait)
+
+    batch_size = max(1, batch_size)
+    semaphore = asyncio.Semaphore(max(1, parallel))
+
+    async def upsert(start: int):
+        async with semaphore:
+            try:
+                await _upsert_batch(collection_name, data[start:start + batch_size], wait)
+            except Exception as e:
+                return {"index": start // batch_size, "start": start, "size": len(data[start:start + batch_size]), "error": str(e)}
+
+    results = await asyncio.gather(*(upsert(start) for start in range(0, len(data), batch_size)))
+    failed = [result for result in results if result is not None]
+    inserted = len(data) - sum(batch["size"] for batch in failed)
+
+    response = {
+        "status": "Data inserted successfully" if wait else "Upsert operations enqueued",
+        "collection_name": collection_name,
+        "num_points": inserted,
+        "batches": len(results),
+        "failed_batches": failed,
+        "completed": wait
+    }
+    if failed:
+        response["status"] = "Data partially inserted" if inserted else "Data insertion failed"
+        response["error"] = f"{len(failed)} de {len(results)} batch(es) fallaron: {failed[0]['error']}"
+    return response
+
+async def _insert_partitioned(collection_name: str, spec: dict, data: list, batch_size: int, parallel: int, wait: bool):
+    groups = defaultdict(list)
+    for item in data:
+        metadata = item.get("metadata") or {}
+        # El ID se deriva del nombre lógico, igual que en una colección sin particionar
+        item = {**item, "id": item.get("id") or generate_point_id(collection_name, metadata.get("title"), item["text"])}
+        date_ms = serialize_metadata({"date": metadata.get("date")})["date"]
+        groups[partitions.partition_key(date_ms, spec["granularity"])].append(item)
+
     try:
-        points = [
-            PointStruct(
-                id=generate_uuid4(),
-                vector=item["embedding"],
-                payload={
-                    "text": item["text"],
-                    "metadata": serialize_metadata(item.get("metadata", {}))
-                }
-            ) for item in data
+        existing = await ensure_partitions(collection_name, groups)
+        await _drop_moved_partition_points(existing, groups, wait)
+    except Exception as e:
+        return {"error": str(e), "collection_name": collection_name, "num_points": 0, "failed_batches": []}
+
+    # Una partición por vez; cada una ya reparte sus batches en `parallel` requests
+    results = {}
+    for key, items in sorted(groups.items()):
+        results[key] = await insert_data(existing[key], items, batch_size, parallel, wait)
+
+    failed = [
+        {**batch, "partition": key}
+        for key, result in results.items() for batch in result["failed_batches"]
+    ]
+    inserted = sum(result["num_points"] for result in results.values())
+    response = {
+        "status": "Data inserted successfully" if wait else "Upsert operations enqueued",
+        "collection_name": collection_name,
+        "num_points": inserted,
+        "batches": sum(result["batches"] for result in results.values()),
+        "failed_batches": failed,
+        "completed": wait,
+        "partitions": {key: result["num_points"] for key, result in results.items()}
+    }
+    if failed:
+        response["status"] = "Data partially inserted" if inserted else "Data insertion failed"
+        response["error"] = f"{len(failed)} batch(es) fallaron: {failed[0]['error']}"
+    return response
+
+async def _drop_moved_partition_points(existing: Dict[str, str], groups: Dict[str, list], wait: bool) -> None:
+    """
+    Point IDs do not include the date: when a re-upload changes `metadata.date` the
+    same point lands in another partition. Look up the IDs being written in every
+    other partition and delete the copies found there. Other documents that share
+    the title keep their points (their content, and so their ID, differs).
+    """
+    async def drop(key: str, physical_name: str):
+        ids = [item["id"] for other, items in groups.items() if other != key for item in items]
+        stale = await existing_point_ids(physical_name, ids)
+        await delete_points(physical_name, list(stale), wait)
+
+    await _fan_out(drop(key, physical_name) for key, physical_name in existing.items())
+
+async def existing_point_ids(collection_name: str, ids: List[str], batch_size: int = 1000) -> set:
+    """
+    Return the subset of `ids` that already exist in the collection.
+    """
+    client = get_client()
+    existing = set()
+    for start in range(0, len(ids), batch_size):
+        points = await client.retrieve(
+            collection_name=collection_name,
+            ids=ids[start:start + batch_size],
+            with_payload=False,
+            with_vectors=False
+        )
+        existing.update(str(point.id) for point in points)
+    return existing
+
+async def document_point_ids(collection_name: str, title: str, page_size: int = 1000) -> set:
+    """
+    Return the IDs of every point whose metadata 'title' equals `title`.
+    """
+    ids = set()
+    async for points, _ in iter_points(
+        collection_name, _title_filter([title]), page_size, payload_fields=[], with_vectors=False
+    ):
+        ids.update(str(point.id) for point in points)
+    return ids
+
+async def update_points_metadata(collection_name: str, ids: List[str], metadata: dict) -> None:
+    """
+    Replace the 'metadata' payload key of the given points without touching their vectors.
+    In custom-sharded collections, points whose shard key changes are re-upserted
+    into the new shard (set_payload cannot move them).
+    """
+    if ids and await collection_shard_keys(collection_name) is not None:
+        metadata = _with_shard_key({"metadata": metadata})["metadata"]
+        points = await get_client().retrieve(
+            collection_name=collection_name, ids=ids, with_payload=True, with_vectors=True
+        )
+        moved = [
+            point for point in points
+            if ((point.payload or {}).get("metadata") or {}).get("shard_key") != metadata["shard_key"]
         ]
+        if moved:
+            await upsert_points(
+                collection_name,
+                ids=[point.id for point in moved],
+                vectors=[point.vector for point in moved],
+                payloads=[{**point.payload, "metadata": metadata} for point in moved]
+            )
+            moved_ids = {str(point.id) for point in moved}
+            ids = [point_id for point_id in ids if str(point_id) not in moved_ids]
 
-        client.upsert(
+    if ids:
+        await get_client().set_payload(
             collection_name=collection_name,
-            points=points
+            payload={"metadata": metadata},
+            points=ids
         )
+
+async def delete_points(collection_name: str, ids: List[str], wait: bool = True) -> None:
+    """
+    Delete points by ID.
+    """
+    if ids:
+        await get_client().delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=ids),
+            wait=wait
+        )
+
+def truncate_snippet(text: str, max_chars: int) -> str:
+    """
+    Cut `text` to at most `max_chars` characters, on a word boundary when possible.
+    """
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    space = cut.rfind(" ")
+    return (cut[:space] if space > max_chars // 2 else cut).rstrip() + "…"
+
+def hit_to_dict(hit, snippet_chars: Optional[int] = None) -> dict:
+    """
+    Convert a scored point into the response dict, truncating the payload 'text'
+    to `snippet_chars` characters if given.
+    """
+    payload = hit.payload
+    if snippet_chars and payload and isinstance(payload.get("text"), str):
+        payload = {**payload, "text": truncate_snippet(payload["text"], snippet_chars)}
+    return {"id": hit.id, "score": hit.score, "payload": payload}
+
+async def search(
+    collection_name: str,
+    query_vector: list,
+    limit: int = 10,
+    filters = None,
+    threshold: float = 0.3,
+    params = None,
+    payload_fields: Optional[List[str]] = None,
+    snippet_chars: Optional[int] = None,
+    shard_keys: Optional[List[str]] = None
+):
+    """
+    Search for similar vectors in the specified collection.
+    `params` are optional SearchParams (see core.profiles.search_params).
+    `payload_fields` limits the returned payload to those paths (e.g. "metadata.title")
+    and `snippet_chars` truncates the returned 'text'.
+    `shard_keys` (the tags of the filter) restricts custom-sharded collections to those shards.
+    Time-partitioned collections search, concurrently, only the partitions that overlap
+    the date range of `filters` and merge the top `limit` hits by score.
+    """
+    try:
+        targets = await _partition_targets(collection_name, filters)
+        if targets is not None:
+            responses = await _fan_out(
+                search(
+                    physical_name, query_vector, limit, filters, threshold, params,
+                    payload_fields, snippet_chars, shard_keys
+                ) for physical_name in targets.values()
+            )
+            errors = [response["error"] for response in responses if "error" in response]
+            if errors:
+                return {"error": errors[0], "collection_name": collection_name}
+            return {
+                "status": "Search completed",
+                "collection_name": collection_name,
+                "partitions": list(targets),
+                "results": heapq.nlargest(
+                    limit,
+                    (hit for response in responses for hit in response["results"]),
+                    key=lambda hit: hit["score"]
+                )
+            }
+
+        selector = await shard_key_selector(collection_name, shard_keys)
+        if selector == []:
+            results = []
+        else:
+            with timed("qdrant_search"):
+                response = await get_client().query_points(
+                    collection_name=collection_name,
+                    query=query_vector,
+                    limit=limit,
+                    query_filter=filters if filters else None,
+                    score_threshold=threshold,
+                    search_params=params,
+                    with_payload=_payload_selector(payload_fields),
+                    shard_key_selector=selector
+                )
+            results = response.points
         return {
-            "status": "Data inserted successfully",
+            "status": "Search completed",
             "collection_name": collection_name,
-            "num_points": len(points)
+            "results": [hit_to_dict(result, snippet_chars) for result in results]
         }
     except Exception as e:
+        return {"error": str(e), "collection_name": collection_name}
+
+async def search_groups(
+    collection_name: str,
+    query_vector: list,
+    limit: int = 10,
+    filters = None,
+    threshold: float = 0.3,
+    params = None,
+    payload_fields: Optional[List[str]] = None,
+    snippet_chars: Optional[int] = None,
+    group_size: int = 1,
+    group_by: str = "metadata.title",
+    shard_keys: Optional[List[str]] = None
+):
+    """
+    Search grouped by a payload field (the document title by default), so a single
+    long document cannot fill the whole result list. Returns up to `limit` groups
+    with at most `group_size` hits each, best group first. `group_by` must have a
+    keyword or integer payload index. Time-partitioned collections merge the groups
+    of the partitions that overlap the date range (a title may span several).
+    """
+    try:
+        targets = await _partition_targets(collection_name, filters)
+        if targets is not None:
+            responses = await _fan_out(
+                search_groups(
+                    physical_name, query_vector, limit, filters, threshold, params,
+                    payload_fields, snippet_chars, group_size, group_by, shard_keys
+                ) for physical_name in targets.values()
+            )
+            errors = [response["error"] for response in responses if "error" in response]
+            if errors:
+                return {"error": errors[0], "collection_name": collection_name}
+            merged = defaultdict(list)
+            for response in responses:
+                for group in response["groups"]:
+                    merged[group["id"]].extend(group["hits"])
+            grouped = [
+                {"id": group_id, "hits": heapq.nlargest(group_size, hits, key=lambda hit: hit["score"])}
+                for group_id, hits in merged.items()
+            ]
+            return {
+                "status": "Search completed",
+                "collection_name": collection_name,
+                "partitions": list(targets),
+                "groups": heapq.nlargest(limit, grouped, key=lambda group: group["hits"][0]["score"])
+            }
+
+        selector = await shard_key_selector(collection_name, shard_keys)
+        groups = []
+        if selector != []:
+            with timed("qdrant_search"):
+                result = await get_client().query_points_groups(
+                    collection_name=collection_name,
+                    query=query_vector,
+                    group_by=group_by,
+                    limit=limit,
+                    group_size=group_size,
+                    query_filter=filters if filters else None,
+                    score_threshold=threshold,
+                    search_params=params,
+                    with_payload=_payload_selector(payload_fields),
+                    shard_key_selector=selector
+                )
+            groups = result.groups
         return {
-            "error": str(e),
-            "collection_name": collection_name
+            "status": "Search completed",
+            "collection_name": collection_name,
+            "groups": [
+                {
+                    "id": group.id,
+                    "hits": [hit_to_dict(hit, snippet_chars) for hit in group.hits]
+                } for group in groups
+            ]
         }
-    
-def search(collection_name: str, query_vector: list, limit: int = 10, filters = None, threshold: float = 0.3):
+    except Exception as e:
+        return {"error": str(e), "collection_name": collection_name}
+
+async def search_batch(collection_name: str, queries: List[dict]):
     """
-    Search for similar vectors in the specified collection.
+    Run several searches against the same collection in a single Qdrant request
+    (query_batch_points).
+
+    Args:
+        collection_name (str): Collection to search.
+        queries (List[dict]): One dict per search with `query_vector`, `limit`,
+            `filters`, `threshold`, `params`, `payload_fields`, `snippet_chars` and
+            `shard_keys` (same meaning as in `search`).
+
+    Returns:
+        dict: `results` holds one result list per query, in the same order.
     """
     try:
-        results = client.search(
-            collection_name=collection_name,
-            query_vector=query_vector,
-            limit=limit,
-            query_filter=filters if filters else None,
-            score_threshold=threshold
-        )
+        if partitions.get_spec(collection_name) is not None:
+            return await _search_batch_partitioned(collection_name, queries)
+
+        selectors = [await shard_key_selector(collection_name, query.get("shard_keys")) for query in queries]
+        # Las búsquedas cuyos tags no tienen shard no pueden devolver nada y no se envían
+        sent = [index for index, selector in enumerate(selectors) if selector != []]
+        batches = [[] for _ in queries]
+
+        observe_batch("qdrant_search", len(sent))
+        if sent:
+            with timed("qdrant_search"):
+                responses = await get_client().query_batch_points(
+                    collection_name=collection_name,
+                    requests=[
+                        models.QueryRequest(
+                            query=queries[index]["query_vector"],
+                            limit=queries[index].get("limit", 10),
+                            filter=queries[index].get("filters") or None,
+                            score_threshold=queries[index].get("threshold", 0.3),
+                            params=queries[index].get("params"),
+                            with_payload=_payload_selector(queries[index].get("payload_fields")),
+                            shard_key=selectors[index]
+                        ) for index in sent
+                    ]
+                )
+            for index, response in zip(sent, responses):
+                batches[index] = response.points
         return {
             "status": "Search completed",
             "collection_name": collection_name,
             "results": [
-                {
-                    "id": result.id,
-                    "score": result.score,
-                    "payload": result.payload
-                } for result in results
+                [hit_to_dict(result, query.get("snippet_chars")) for result in results]
+                for query, results in zip(queries, batches)
             ]
         }
     except Exception as e:
         return {"error": str(e), "collection_name": collection_name}
 
-def return_collection_names():
+async def _search_batch_partitioned(collection_name: str, queries: List[dict]):
+    """
+    Group the queries by the partitions their date range touches, send one
+    search_batch per partition and merge the top hits of each query.
+    """
+    by_partition = defaultdict(list)
+    for index, query in enumerate(queries):
+        for physical_name in (await _partition_targets(collection_name, query.get("filters"))).values():
+            by_partition[physical_name].append(index)
+
+    physical_names = list(by_partition)
+    responses = await _fan_out(
+        search_batch(physical_name, [queries[index] for index in by_partition[physical_name]])
+        for physical_name in physical_names
+    )
+    hits = [[] for _ in queries]
+    for physical_name, response in zip(physical_names, responses):
+        if "error" in response:
+            return {"error": response["error"], "collection_name": collection_name}
+        for index, results in zip(by_partition[physical_name], response["results"]):
+            hits[index].extend(results)
+
+    return {
+        "status": "Search completed",
+        "collection_name": collection_name,
+        "results": [
+            heapq.nlargest(query.get("limit", 10), query_hits, key=lambda hit: hit["score"])
+            for query, query_hits in zip(queries, hits)
+        ]
+    }
+
+async def return_collection_names():
     try:
-        collections = client.get_collections().collections
+        collections = (await get_client().get_collections()).collections
         return [
             {"collection_name": col.name}
             for col in collections
@@ -121,14 +1024,127 @@ def return_collection_names():
     except Exception as e:
         return {"error": str(e)}
     
-def get_collection_documents(collection_name: str):
+def _payload_selector(payload_fields: Optional[List[str]] = None):
     """
-    Returns all documents in the specified collection, grouped by metadata 'title'.
+    Build the `with_payload` argument: the full payload (None), no payload ([])
+    or only the given fields.
     """
-    try:
-        points, _ = client.scroll(
+    if payload_fields is None:
+        return True
+    return PayloadSelectorInclude(include=payload_fields) if payload_fields else False
+
+def point_to_dict(point, with_vectors: bool = False) -> dict:
+    item = {"id": point.id, "payload": point.payload}
+    if with_vectors:
+        item["vector"] = point.vector
+    return item
+
+async def scroll_page(
+    collection_name: str,
+    filters=None,
+    limit: int = 1000,
+    offset=None,
+    with_vectors: bool = False,
+    payload_fields: Optional[List[str]] = None
+):
+    """
+    Fetch a single scroll page. Returns the points and the offset of the next page
+    (None when the collection is exhausted).
+    Time-partitioned collections are read partition by partition, in date order and
+    only those overlapping the date range of `filters`; their offset is composite,
+    {"p": partition key, "o": point ID or None}.
+    """
+    targets = await _partition_targets(collection_name, filters)
+    if targets is not None:
+        return await _scroll_partitions(targets, filters, limit, offset, with_vectors, payload_fields)
+
+    with timed("qdrant_scroll"):
+        return await get_client().scroll(
             collection_name=collection_name,
-            limit=1000  # Adjust as needed
+            scroll_filter=filters,
+            limit=limit,
+            offset=offset,
+            with_vectors=with_vectors,
+            with_payload=_payload_selector(payload_fields)
+        )
+
+async def _scroll_partitions(
+    targets: Dict[str, str],
+    filters,
+    limit: int,
+    offset,
+    with_vectors: bool,
+    payload_fields: Optional[List[str]]
+):
+    if offset is not None and not isinstance(offset, dict):
+        raise ValueError("Cursor inválido para una colección particionada")
+    keys = list(targets)
+    start_key, inner_offset = (offset["p"], offset["o"]) if offset else (None, None)
+    if start_key is not None:
+        # La partición del cursor pudo haberse eliminado: seguir por la siguiente
+        if start_key not in targets:
+            inner_offset = None
+        keys = [key for key in keys if key >= start_key]
+
+    collected = []
+    for position, key in enumerate(keys):
+        points, next_offset = await scroll_page(
+            targets[key], filters, limit - len(collected), inner_offset, with_vectors, payload_fields
+        )
+        collected.extend(points)
+        inner_offset = None
+        if next_offset is not None:
+            return collected, {"p": key, "o": next_offset}
+        if len(collected) >= limit:
+            following = keys[position + 1:]
+            return collected, ({"p": following[0], "o": None} if following else None)
+    return collected, None
+
+async def count_points(collection_name: str, exact: bool = False) -> int:
+    """
+    Number of points in a collection, summing every partition of a time-partitioned one.
+    """
+    targets = await _partition_targets(collection_name)
+    names = list(targets.values()) if targets is not None else [collection_name]
+    counts = await _fan_out(get_client().count(collection_name=name, exact=exact) for name in names)
+    return sum(result.count for result in counts)
+
+async def iter_points(
+    collection_name: str,
+    filters=None,
+    page_size: int = 1000,
+    offset=None,
+    with_vectors: bool = False,
+    payload_fields: Optional[List[str]] = None
+) -> AsyncIterator[Tuple[list, Optional[object]]]:
+    """
+    Lazily walk the whole scroll, yielding each page with the offset that follows it.
+    Only one page is held in memory at a time.
+    """
+    while True:
+        points, offset = await scroll_page(
+            collection_name, filters, page_size, offset, with_vectors, payload_fields
+        )
+        yield points, offset
+        if offset is None:
+            break
+
+async def get_collection_documents(
+    collection_name: str,
+    limit: int = 1000,
+    offset=None,
+    with_vectors: bool = False,
+    payload_fields: Optional[List[str]] = None
+):
+    """
+    Returns one page of documents in the specified collection, grouped by metadata 'title',
+    together with the offset of the next page.
+    """
+    try:
+        if payload_fields and "metadata.title" not in payload_fields:
+            payload_fields = payload_fields + ["metadata.title"]
+        points, next_offset = await scroll_page(
+            collection_name, None, limit, offset, with_vectors, payload_fields
         )
         grouped = {}
         for point in points:
@@ -138,67 +1154,103 @@ def get_collection_documents(collection_name: str):
                 title = metadata.get("title")
             if title not in grouped:
                 grouped[title] = []
-            grouped[title].append({
-                "id": point.id,
-                "payload": point.payload
-            })
+            grouped[title].append(point_to_dict(point, with_vectors))
         return {
             "status": "Documents retrieved and grouped by title successfully",
             "collection_name": collection_name,
-            "documents_by_title": grouped
+            "documents_by_title": grouped,
+            "next_offset": next_offset
         }
     except Exception as e:
         return {"error": str(e), "collection_name": collection_name}
     
-def delete_document_by_title(collection_name: str, title: str):
+def _title_filter(titles: List[str]) -> Filter:
+    return Filter(must=[FieldCondition(key="metadata.title", match=MatchAny(any=titles))])
+
+async def delete_documents_by_titles(collection_name: str, titles: List[str], wait: bool = True):
     """
-    Deletes all documents in the specified collection with the given title in metadata.
+    Deletes every point whose metadata 'title' is in `titles` with a single filter selector.
+    Per-title counts are taken with exact `count` queries before the delete.
+    With wait=False the delete is only enqueued by Qdrant.
+    Time-partitioned collections delete from every partition.
     """
     try:
-        points, _ = client.scroll(
-            collection_name=collection_name,
-            limit=1000  # Adjust as needed
-        )
-        ids_to_delete = [
-            point.id for point in points
-            if point.payload.get("metadata", {}).get("title") == title
-        ]
-        
-        if not ids_to_delete:
-            return {"status": "No documents found with the specified title", "collection_name": collection_name}
-        
-        client.delete(
-            collection_name=collection_name,
-            points_selector=PointIdsList(points=ids_to_delete)
-        )
-        
+        targets = await _partition_targets(collection_name)
+        if targets is not None:
+            responses = await _fan_out(
+                delete_documents_by_titles(physical_name, titles, wait) for physical_name in targets.values()
+            )
+            errors = [response["error"] for response in responses if "error" in response]
+            if errors:
+                return {"error": errors[0], "collection_name": collection_name}
+            deleted = {title: 0 for title in dict.fromkeys(titles)}
+            for response in responses:
+                for title, count in response["deleted_by_title"].items():
+                    deleted[title] += count
+            return {
+                "status": "Documents deleted successfully" if wait else "Delete operation enqueued",
+                "collection_name": collection_name,
+                "deleted_by_title": deleted,
+                "total_deleted": sum(deleted.values()),
+                "completed": wait
+            }
+
+        client = get_client()
+        titles = list(dict.fromkeys(titles))
+        semaphore = asyncio.Semaphore(COUNT_CONCURRENCY)
+
+        async def count_title(title: str) -> int:
+            async with semaphore:
+                result = await client.count(
+                    collection_name=collection_name,
+                    count_filter=_title_filter([title]),
+                    exact=True
+                )
+                return result.count
+
+        counts = await asyncio.gather(*(count_title(title) for title in titles))
+        deleted = dict(zip(titles, counts))
+        total = sum(counts)
+
+        if total:
+            with timed("qdrant_delete"):
+                await client.delete(
+                    collection_name=collection_name,
+                    points_selector=FilterSelector(filter=_title_filter(titles)),
+                    wait=wait
+                )
+
         return {
-            "status": f"Documents with title '{title}' deleted successfully",
+            "status": "Documents deleted successfully" if wait else "Delete operation enqueued",
             "collection_name": collection_name,
-            "deleted_ids": ids_to_delete
+            "deleted_by_title": deleted,
+            "total_deleted": total,
+            "completed": wait
         }
     except Exception as e:
         return {"error": str(e), "collection_name": collection_name}
 
-def doc_filter(collection_name: str, filters: dict):
+async def doc_filter(
+    collection_name: str,
+    filters: dict,
+    limit: int = 1000,
+    offset=None,
+    with_vectors: bool = False,
+    payload_fields: Optional[List[str]] = None
+):
     """
     Filters documents in the specified collection based on the provided filters.
+    Returns one page of results and the offset of the next page.
     """
     try:
-        results = client.scroll(
-            collection_name=collection_name,
-            scroll_filter=filters,
-            limit=1000
+        points, next_offset = await scroll_page(
+            collection_name, filters, limit, offset, with_vectors, payload_fields
         )
         return {
             "status": "Documents filtered successfully",
             "collection_name": collection_name,
-            "results": [
-                {
-                    "id": point.id,
-                    "payload": point.payload
-                } for point in results[0]
-            ]
+            "results": [point_to_dict(point, with_vectors) for point in points],
+            "next_offset": next_offset
         }
     except Exception as e:
-        return {"error": str(e), "collection_name": collection_name}
\ No newline at end of file
+        return {"error": str(e), "collection_name": collection_name}
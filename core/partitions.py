@@ -0,0 +1,140 @@
+# core/partitions.py
+"""
+Colecciones particionadas por tiempo.
+
+Una colección lógica `noticias` se reparte en colecciones físicas por período de
+`metadata.date` (`noticias__p2024-05` con particiones mensuales), creadas a medida que
+llegan documentos. El alias `noticias` apunta a la partición más reciente. Los documentos
+sin fecha van a `noticias__pundated`.
+
+La configuración de cada colección lógica se guarda como `{PARTITIONS_DIR}/{colección}.json`.
+Este módulo solo tiene la lógica pura (nombres, períodos, ventana de fechas); las
+operaciones contra Qdrant están en core.client.
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from utils.env import get_env_var
+from utils.file_store import MtimeCache, atomic_write
+
+PARTITIONS_DIR = get_env_var("PARTITIONS_DIR", "partitions")
+
+# Granularidad -> formato de la clave de partición (ordenable como texto)
+GRANULARITIES = {
+    "day": "%Y-%m-%d",
+    "month": "%Y-%m",
+    "year": "%Y",
+}
+
+PARTITION_SEPARATOR = "__p"
+
+# Partición de los documentos sin fecha; solo se consulta en búsquedas sin rango de fechas
+UNDATED_KEY = "undated"
+
+
+def spec_path(collection_name: str) -> Path:
+    return Path(PARTITIONS_DIR) / f"{collection_name}.json"
+
+
+_specs = MtimeCache(spec_path, lambda path: json.loads(path.read_text()))
+
+
+def get_spec(collection_name: str) -> Optional[dict]:
+    """
+    Configuración de la colección lógica (granularity, vectorsize, profile, sharding),
+    o None si no está particionada.
+    """
+    return _specs.get(collection_name)
+
+
+def save_spec(collection_name: str, spec: dict) -> None:
+    atomic_write(spec_path(collection_name), lambda tmp: tmp.write_text(json.dumps(spec)))
+
+
+def delete_spec(collection_name: str) -> None:
+    _specs.delete(collection_name)
+
+
+def partition_key(date_ms: Optional[int], granularity: str) -> str:
+    """
+    Clave de la partición de un punto a partir de su `metadata.date` serializada (ms UTC).
+    """
+    if date_ms is None:
+        return UNDATED_KEY
+    moment = datetime.fromtimestamp(date_ms / 1000, tz=timezone.utc)
+    return moment.strftime(GRANULARITIES[granularity])
+
+
+def partition_name(collection_name: str, key: str) -> str:
+    return f"{collection_name}{PARTITION_SEPARATOR}{key}"
+
+
+def parse_partition(collection_name: str, physical_name: str) -> Optional[str]:
+    """
+    Clave de partición de una colección física, o None si no pertenece a `collection_name`.
+    """
+    prefix = collection_name + PARTITION_SEPARATOR
+    return physical_name[len(prefix):] if physical_name.startswith(prefix) else None
+
+
+def partition_bounds(key: str, granularity: str) -> Optional[Tuple[int, int]]:
+    """
+    Rango [inicio, fin) en ms UTC que cubre la partición; None para la partición sin fecha.
+    """
+    if key == UNDATED_KEY:
+        return None
+    start = datetime.strptime(key, GRANULARITIES[granularity]).replace(tzinfo=timezone.utc)
+    if granularity == "day":
+        end = datetime.fromtimestamp(start.timestamp() + 86400, tz=timezone.utc)
+    elif granularity == "month":
+        end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    else:
+        end = start.replace(year=start.year + 1)
+    return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+
+
+def date_window(filters) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """
+    Extrae del Filter de Qdrant (ver utils.query_filters.build_filter) el rango sobre
+    `metadata.date` en ms, con extremos opcionales. Solo se miran las condiciones `must`,
+    que todo punto del resultado cumple; None si no hay rango de fechas.
+    """
+    for condition in getattr(filters, "must", None) or []:
+        if getattr(condition, "key", None) != "metadata.date" or getattr(condition, "range", None) is None:
+            continue
+        date_range = condition.range
+        lower = date_range.gte if date_range.gte is not None else date_range.gt
+        upper = date_range.lte if date_range.lte is not None else date_range.lt
+        return (
+            int(lower) if lower is not None else None,
+            int(upper) if upper is not None else None,
+        )
+    return None
+
+
+def overlapping(keys: Iterable[str], granularity: str, window) -> List[str]:
+    """
+    Particiones cuyo período se solapa con la ventana de fechas, ordenadas.
+    Sin ventana se devuelven todas, incluida la de documentos sin fecha.
+    """
+    if window is None:
+        return sorted(keys)
+    lower, upper = window
+    selected = []
+    for key in sorted(keys):
+        bounds = partition_bounds(key, granularity)
+        if bounds is None:
+            continue
+        start, end = bounds
+        if (upper is None or start <= upper) and (lower is None or end > lower):
+            selected.append(key)
+    return selected
+
+
+def latest(keys: Iterable[str]) -> Optional[str]:
+    """La partición más reciente (con fecha, si hay alguna): el destino del alias."""
+    dated = [key for key in keys if key != UNDATED_KEY]
+    return max(dated) if dated else (UNDATED_KEY if UNDATED_KEY in keys else None)
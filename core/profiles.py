@@ -0,0 +1,155 @@
+# core/profiles.py
+
+from typing import Optional
+
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CollectionParamsDiff,
+    Disabled,
+    Distance,
+    HnswConfigDiff,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    ShardingMethod,
+    VectorParams,
+    VectorParamsDiff,
+)
+
+# Perfiles de almacenamiento de una colección:
+#   default          fp32 en RAM con la configuración HNSW de Qdrant (comportamiento histórico)
+#   ram-fast         fp32 en RAM, grafo HNSW más denso: mejor recall y latencia, más memoria
+#   int8-quantized   vectores originales en disco, copia int8 en RAM (~4x menos memoria)
+#   binary-quantized vectores originales en disco, copia binaria en RAM (~32x menos); requiere rescoring
+#   disk-large       vectores, grafo HNSW y payload en disco, copia int8 en RAM para colecciones que no entran en memoria
+STORAGE_PROFILES = {
+    "default": {
+        "on_disk": False,
+    },
+    "ram-fast": {
+        "on_disk": False,
+        "hnsw": {"m": 32, "ef_construct": 256},
+    },
+    "int8-quantized": {
+        "on_disk": True,
+        "hnsw": {"m": 16, "ef_construct": 128},
+        "quantization": "int8",
+    },
+    "binary-quantized": {
+        "on_disk": True,
+        "hnsw": {"m": 16, "ef_construct": 128},
+        "quantization": "binary",
+    },
+    "disk-large": {
+        "on_disk": True,
+        "on_disk_payload": True,
+        "hnsw": {"m": 16, "ef_construct": 100, "on_disk": True},
+        "quantization": "int8",
+    },
+}
+
+
+def _quantization(spec: dict):
+    if spec.get("quantization") == "int8":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if spec.get("quantization") == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def collection_config(profile: str, vectorsize: int) -> dict:
+    """
+    Traduce un perfil de almacenamiento a los argumentos de `create_collection` de Qdrant.
+
+    Args:
+        profile (str): Nombre del perfil (una clave de STORAGE_PROFILES).
+        vectorsize (int): Dimensión de los vectores.
+
+    Returns:
+        dict: vectors_config, hnsw_config, quantization_config y on_disk_payload.
+    """
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Perfil de almacenamiento desconocido: {profile}. Opciones: {', '.join(STORAGE_PROFILES)}")
+
+    spec = STORAGE_PROFILES[profile]
+    return {
+        "vectors_config": VectorParams(size=vectorsize, distance=Distance.COSINE, on_disk=spec["on_disk"] or None),
+        "hnsw_config": HnswConfigDiff(**spec["hnsw"]) if "hnsw" in spec else None,
+        "quantization_config": _quantization(spec),
+        "on_disk_payload": spec.get("on_disk_payload"),
+    }
+
+
+def profile_update(profile: str) -> dict:
+    """
+    Argumentos de `update_collection` para llevar una colección existente a otro perfil,
+    p. ej. mover a disco una partición vieja con "disk-large". Qdrant reconstruye los
+    segmentos en segundo plano; la colección sigue atendiendo búsquedas mientras tanto.
+
+    Args:
+        profile (str): Nombre del perfil (una clave de STORAGE_PROFILES).
+    """
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Perfil de almacenamiento desconocido: {profile}. Opciones: {', '.join(STORAGE_PROFILES)}")
+
+    spec = STORAGE_PROFILES[profile]
+    return {
+        # "" es el vector sin nombre de las colecciones de este proyecto
+        "vectors_config": {"": VectorParamsDiff(on_disk=spec["on_disk"])},
+        "hnsw_config": HnswConfigDiff(**{"on_disk": False, **spec.get("hnsw", {})}),
+        "quantization_config": _quantization(spec) or Disabled.DISABLED,
+        "collection_params": CollectionParamsDiff(on_disk_payload=bool(spec.get("on_disk_payload"))),
+    }
+
+
+def search_params(
+    hnsw_ef: Optional[int] = None,
+    exact: bool = False,
+    rescore: Optional[bool] = None,
+    oversampling: Optional[float] = None,
+) -> Optional[SearchParams]:
+    """
+    Arma los SearchParams de Qdrant; devuelve None si no se pidió nada distinto del default.
+
+    Args:
+        hnsw_ef (int, optional): Tamaño de la lista de candidatos del HNSW (más alto = más recall).
+        exact (bool): Búsqueda exhaustiva sin índice, útil como referencia de recall.
+        rescore (bool, optional): Recalcular el score con los vectores originales en colecciones cuantizadas.
+        oversampling (float, optional): Factor de candidatos extra a recuperar con la copia cuantizada antes del rescoring.
+    """
+    quantization = None
+    if rescore is not None or oversampling is not None:
+        quantization = QuantizationSearchParams(rescore=rescore, oversampling=oversampling)
+    if hnsw_ef is None and not exact and quantization is None:
+        return None
+    return SearchParams(hnsw_ef=hnsw_ef, exact=exact, quantization=quantization)
+
+
+def sharding_config(
+    shard_number: Optional[int] = None,
+    replication_factor: Optional[int] = None,
+    write_consistency_factor: Optional[int] = None,
+    custom_sharding: bool = False,
+) -> dict:
+    """
+    Argumentos de distribución en un cluster de Qdrant para `create_collection`.
+    Los valores en None quedan con el default del servidor (un shard, sin réplicas).
+
+    Args:
+        shard_number (int, optional): Shards de la colección; con sharding personalizado, shards por shard key.
+        replication_factor (int, optional): Copias de cada shard en nodos distintos.
+        write_consistency_factor (int, optional): Réplicas que deben confirmar cada escritura.
+        custom_sharding (bool): Repartir los puntos por shard key (el primer tag) en lugar de por hash del ID.
+    """
+    config = {
+        "shard_number": shard_number,
+        "replication_factor": replication_factor,
+        "write_consistency_factor": write_consistency_factor,
+        "sharding_method": ShardingMethod.CUSTOM if custom_sharding else None,
+    }
+    return {key: value for key, value in config.items() if value is not None}
@@ -0,0 +1,76 @@
+# embeddings_service/backends.py
+
+from pathlib import Path
+
+# Backends soportados:
+#   torch       PyTorch fp32 (referencia)
+#   torch-int8  PyTorch con cuantización dinámica int8 de las capas Linear
+#   onnx        ONNX Runtime fp32
+#   onnx-int8   ONNX Runtime con cuantización dinámica int8
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+
+def _model_dir(cache_dir: str, model_name: str) -> Path:
+    return Path(cache_dir) / model_name.replace("/", "__")
+
+
+def _export_onnx(model_name: str, path: Path) -> None:
+    """
+    Exporta el modelo a ONNX una sola vez y lo guarda en `path`.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if (path / "onnx" / "model.onnx").exists():
+        return
+    exported = SentenceTransformer(model_name, backend="onnx")
+    exported.save_pretrained(str(path))
+
+
+def load_encoder(
+    model_name: str,
+    backend: str = "torch",
+    cache_dir: str = "/opt/embed_backends",
+    quantization: str = "avx2"
+):
+    """
+    Carga el modelo con el backend de inferencia indicado. La exportación a ONNX y
+    la cuantización se guardan en `cache_dir` y se reutilizan en los siguientes arranques.
+
+    Args:
+        model_name (str): Nombre del modelo de sentence-transformers.
+        backend (str): Uno de BACKENDS.
+        cache_dir (str): Directorio donde se cachean los modelos exportados.
+        quantization (str): Configuración de cuantización ONNX ("avx2", "avx512", "avx512_vnni", "arm64").
+
+    Returns:
+        SentenceTransformer: Modelo listo para `encode`.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de embeddings no soportado: {backend}. Opciones: {', '.join(BACKENDS)}")
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+
+    if backend == "torch-int8":
+        import torch
+
+        model = SentenceTransformer(model_name)
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    path = _model_dir(cache_dir, model_name)
+    _export_onnx(model_name, path)
+    if backend == "onnx":
+        return SentenceTransformer(str(path), backend="onnx")
+
+    file_name = f"onnx/model_qint8_{quantization}.onnx"
+    if not (path / file_name).exists():
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+
+        export_dynamic_quantized_onnx_model(
+            SentenceTransformer(str(path), backend="onnx"),
+            quantization_config=quantization,
+            model_name_or_path=str(path)
+        )
+    return SentenceTransformer(str(path), backend="onnx", model_kwargs={"file_name": file_name})
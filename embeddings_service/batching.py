@@ -0,0 +1,199 @@
+# embeddings_service/batching.py
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utils.metrics import add_timing, count_error, current_timings, observe_batch, record
+
+
+class QueueFullError(Exception):
+    """Se lanza cuando la cola de batching alcanzó su capacidad máxima."""
+
+
+@dataclass
+class _PendingRequest:
+    texts: List[str]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    # Tiempos del request HTTP que lo originó, para su header Server-Timing
+    timings: Optional[Dict[str, float]] = field(default_factory=current_timings)
+
+
+class EmbeddingBatcher:
+    """
+    Agrupa textos de requests concurrentes en un único llamado a `encode`.
+
+    Cada request se encola con su propio future; un worker toma requests de la
+    cola hasta alcanzar `max_batch_size` textos o hasta que pasen `max_wait_ms`
+    desde el primero, ejecuta un solo `encode` en un thread y devuelve a cada
+    caller su porción de la matriz resultante.
+
+    Args:
+        encode_fn (Callable): Función síncrona que recibe una lista de textos y
+            devuelve un array (n_textos, dim).
+        max_batch_size (int): Máximo número de textos por llamado a `encode`.
+        max_wait_ms (float): Tiempo máximo de espera para completar un batch.
+        max_queue_size (int): Máximo número de requests en cola antes de rechazar.
+        max_concurrent_batches (int): Batches ejecutándose a la vez (uno por worker del pool).
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        max_queue_size: int = 1024,
+        max_concurrent_batches: int = 1,
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.max_concurrent_batches = max_concurrent_batches
+
+        self._queue: asyncio.Queue = None
+        self._worker: asyncio.Task = None
+        self._in_flight: set = set()
+
+        # Métricas acumuladas
+        self.batches = 0
+        self.texts = 0
+        self.requests = 0
+        self.rejected = 0
+        self.queue_wait_total = 0.0
+        self.encode_time_total = 0.0
+
+    async def start(self) -> None:
+        """Crea la cola y lanza el worker en el event loop actual."""
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Detiene el worker y cancela los requests que quedaron en cola."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        for task in list(self._in_flight):
+            task.cancel()
+
+        while self._queue is not None and not self._queue.empty():
+            pending = self._queue.get_nowait()
+            if not pending.future.done():
+                pending.future.set_exception(RuntimeError("Embedding batcher detenido"))
+
+    async def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Encola los textos y espera sus embeddings.
+
+        Raises:
+            QueueFullError: Si la cola está llena.
+        """
+        if self._queue is None:
+            raise RuntimeError("Embedding batcher no iniciado")
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait(_PendingRequest(texts=list(texts), future=future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError(f"Cola de embeddings llena ({self.max_queue_size} requests)")
+
+        return await future
+
+    async def _collect(self) -> List[_PendingRequest]:
+        """Espera el primer request y agrega más hasta llenar el batch o agotar la espera."""
+        first = await self._queue.get()
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.perf_counter() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                pending = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            batch.append(pending)
+            size += len(pending.texts)
+
+        return batch
+
+    async def _run(self) -> None:
+        # Con un pool de procesos puede haber varios batches en vuelo a la vez
+        slots = asyncio.Semaphore(self.max_concurrent_batches)
+        while True:
+            # Esperar un slot libre antes de juntar el batch: mientras tanto la cola sigue llenándose
+            await slots.acquire()
+            batch = await self._collect()
+            # Descartar requests cuyo caller ya se desconectó
+            batch = [p for p in batch if not p.future.cancelled()]
+            if not batch:
+                slots.release()
+                continue
+
+            task = asyncio.create_task(self._process(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _process(self, batch: List[_PendingRequest]) -> None:
+        started = time.perf_counter()
+        texts = [text for pending in batch for text in pending.texts]
+        try:
+            embeddings = await asyncio.to_thread(self.encode_fn, texts)
+        except Exception as e:
+            count_error("encode")
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+        finished = time.perf_counter()
+
+        record("encode", finished - started)
+        observe_batch("encode", len(texts))
+        for pending in batch:
+            record("queue_wait", started - pending.enqueued_at)
+            add_timing(pending.timings, "queue_wait", started - pending.enqueued_at)
+            add_timing(pending.timings, "encode", finished - started)
+
+        self.batches += 1
+        self.texts += len(texts)
+        self.requests += len(batch)
+        self.encode_time_total += finished - started
+        self.queue_wait_total += sum(started - p.enqueued_at for p in batch)
+
+        offset = 0
+        for pending in batch:
+            end = offset + len(pending.texts)
+            if not pending.future.done():
+                pending.future.set_result(embeddings[offset:end])
+            offset = end
+
+    def stats(self) -> dict:
+        """Devuelve métricas de uso del batcher, incluido el fill ratio promedio."""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_queue_size": self.max_queue_size,
+            "max_concurrent_batches": self.max_concurrent_batches,
+            "in_flight_batches": len(self._in_flight),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "requests": self.requests,
+            "texts": self.texts,
+            "rejected": self.rejected,
+            "avg_batch_size": self.texts / self.batches if self.batches else 0.0,
+            "avg_fill_ratio": self.texts / (self.batches * self.max_batch_size) if self.batches else 0.0,
+            "avg_queue_wait_ms": 1000 * self.queue_wait_total / self.requests if self.requests else 0.0,
+            "avg_encode_ms": 1000 * self.encode_time_total / self.batches if self.batches else 0.0,
+        }
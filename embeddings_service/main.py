@@ -1,23 +1,148 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Header, Response
 from embeddings_service.schemas import TextRequest, EmbeddingResponse
-from sentence_transformers import SentenceTransformer
+from embeddings_service.batching import EmbeddingBatcher, QueueFullError
+from embeddings_service.backends import load_encoder
+from embeddings_service.workers import POOL_BACKENDS, EncoderPool
 from utils.env import load_env, get_env_var
-import asyncio
+from utils.vector_codec import JSON_MEDIA_TYPE, negotiate_media_type, encode_embeddings
+from utils.metrics import ServerTimingMiddleware, TimedJSONResponse, metrics_response, observe_bytes, timed
 
 load_env()
 model_name = "sentence-transformers/distiluse-base-multilingual-cased-v2"
-model = SentenceTransformer(model_name)
+backend = get_env_var("EMBED_BACKEND", "torch")
+quantization = get_env_var("EMBED_QUANTIZATION", "avx2")
+# Identidad del encoder: los vectores de backends distintos no son intercambiables,
+# así que la API la usa en la clave de su cache de embeddings
+encoder_id = f"{backend}-{quantization}" if backend == "onnx-int8" else backend
+ENCODER_HEADER = "X-Embedding-Encoder"
+# 0 = encode en el mismo proceso; N > 0 = pool de N procesos encoder
+workers = int(get_env_var("EMBED_WORKERS", 0))
+
+model = None
+pool: Optional[EncoderPool] = None
+batcher: Optional[EmbeddingBatcher] = None
+startup_error: Optional[str] = None
+
+def load_model():
+    """
+    Carga el modelo (desde el cache local de la imagen) y ejecuta un encode de warm-up
+    para que la inicialización perezosa de kernels no la pague el primer request.
+    Con pool de workers el warm-up lo hace cada worker después del fork.
+    """
+    loaded = load_encoder(
+        model_name,
+        backend=backend,
+        cache_dir=get_env_var("EMBED_BACKEND_CACHE", "/opt/embed_backends"),
+        quantization=quantization,
+    )
+    if workers == 0:
+        loaded.encode(["warm up", "Texto de calentamiento " * 64])
+    return loaded
+
+async def startup() -> None:
+    global model, pool, batcher, startup_error
+    try:
+        if workers > 0 and backend not in POOL_BACKENDS:
+            raise ValueError(
+                f"EMBED_WORKERS solo aplica a los backends {', '.join(POOL_BACKENDS)}; "
+                f"con '{backend}' usar EMBED_WORKERS=0"
+            )
+        model = await asyncio.to_thread(load_model)
+        encode_fn = model.encode
+        if workers > 0:
+            pool = EncoderPool(model, workers, int(get_env_var("EMBED_THREADS_PER_WORKER", 0)))
+            await asyncio.to_thread(pool.start)
+            encode_fn = pool.encode
+        batcher = EmbeddingBatcher(
+            encode_fn=encode_fn,
+            max_batch_size=int(get_env_var("EMBED_BATCH_MAX_SIZE", 64)),
+            max_wait_ms=float(get_env_var("EMBED_BATCH_MAX_WAIT_MS", 5)),
+            max_queue_size=int(get_env_var("EMBED_BATCH_QUEUE_SIZE", 1024)),
+            max_concurrent_batches=max(1, workers),
+        )
+        await batcher.start()
+    except Exception as e:
+        startup_error = str(e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # La carga corre en segundo plano: el proceso responde liveness mientras el modelo carga
+    loading = asyncio.create_task(startup())
+    yield
+    loading.cancel()
+    if batcher is not None:
+        await batcher.stop()
+    if pool is not None:
+        pool.close()
 
-app = FastAPI(title="Embeddings Service", version="1.0.0")
+app = FastAPI(title="Embeddings Service", version="1.0.0", lifespan=lifespan, default_response_class=TimedJSONResponse)
+app.add_middleware(ServerTimingMiddleware)
 
 @app.post("/embed", response_model=EmbeddingResponse)
-async def embed_texts(request: TextRequest):
+async def embed_texts(request: TextRequest, response: Response, accept: str = Header(JSON_MEDIA_TYPE)):
+    """
+    Genera embeddings. Por defecto responde JSON; con `Accept: application/x-embeddings-f32`
+    o `application/x-npy` devuelve la matriz float32 en binario.
+    """
     if not request.texts:
         raise HTTPException(status_code=400, detail="No texts provided")
+    if batcher is None:
+        raise HTTPException(status_code=503, detail="Model is still loading")
 
     try:
-        embeddings = await asyncio.to_thread(lambda: model.encode(request.texts))
+        embeddings = await batcher.encode(request.texts)
 
+        media_type = negotiate_media_type(accept)
+        if media_type != JSON_MEDIA_TYPE:
+            with timed("serialization"):
+                content = encode_embeddings(embeddings, media_type)
+            observe_bytes("response", len(content))
+            return Response(content=content, media_type=media_type, headers={ENCODER_HEADER: encoder_id})
+        response.headers[ENCODER_HEADER] = encoder_id
         return EmbeddingResponse(embeddings=embeddings.tolist())
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Embedding generation failed: {str(e)}")
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Métricas de latencia por etapa (cola, encode, serialización), tamaños de batch y errores en formato Prometheus.
+    """
+    return metrics_response()
+
+@app.get("/health/live")
+async def liveness():
+    """
+    El proceso está vivo y atiende requests (aunque el modelo todavía esté cargando).
+    """
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness(response: Response):
+    """
+    El modelo está cargado y calentado; el servicio puede recibir tráfico.
+    """
+    if batcher is None:
+        response.status_code = 503
+        return {"status": "error" if startup_error else "loading", "detail": startup_error}
+    if pool is not None and not pool.alive():
+        response.status_code = 503
+        return {"status": "error", "detail": "No quedan workers de encoding vivos"}
+    return {"status": "ready", "model": model_name, "backend": backend, "encoder": encoder_id, "workers": workers}
+
+@app.get("/stats")
+async def batching_stats():
+    """
+    Métricas del scheduler de batching (tamaño promedio, fill ratio, cola) y del pool de workers.
+    """
+    if batcher is None:
+        raise HTTPException(status_code=503, detail="Model is still loading")
+    stats = batcher.stats()
+    if pool is not None:
+        stats["pool"] = pool.stats()
+    return stats
@@ -0,0 +1,225 @@
+# embeddings_service/workers.py
+
+import multiprocessing
+import os
+import queue
+import threading
+from typing import List
+
+import numpy as np
+
+# Modelo cargado en el proceso padre; los workers creados con fork lo heredan
+# copy-on-write sin volver a leer los pesos.
+_shared_model = None
+
+# Backends que pueden repartirse en el pool de procesos
+POOL_BACKENDS = ("torch", "torch-int8")
+
+# Cada cuánto un caller esperando un worker ocioso revisa si queda alguno vivo
+IDLE_POLL_SECONDS = 1.0
+
+
+def split_cores(workers: int) -> List[List[int]]:
+    """
+    Reparte los cores disponibles para el proceso en `workers` rebanadas contiguas.
+    """
+    cores = sorted(os.sched_getaffinity(0))
+    size = max(1, len(cores) // workers)
+    slices = [cores[i * size:(i + 1) * size] for i in range(workers)]
+    # Los cores sobrantes van al último worker; si hay más workers que cores se comparten
+    slices[-1].extend(cores[workers * size:])
+    return [s or [cores[i % len(cores)]] for i, s in enumerate(slices)]
+
+
+def _worker_main(worker_id: int, cores: List[int], threads: int, conn) -> None:
+    os.sched_setaffinity(0, cores)
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    model = _shared_model
+    try:
+        # El warm-up corre en cada worker: el padre no debe inicializar los thread pools antes del fork
+        model.encode(["warm up", "Texto de calentamiento " * 64])
+        conn.send(("ready", worker_id))
+    except Exception as e:
+        conn.send(("error", str(e)))
+        return
+
+    while True:
+        texts = conn.recv()
+        if texts is None:
+            break
+        try:
+            conn.send(("ok", np.asarray(model.encode(texts), dtype=np.float32)))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+class _Worker:
+    def __init__(self, worker_id: int, process, conn, cores: List[int]):
+        self.worker_id = worker_id
+        self.process = process
+        self.conn = conn
+        self.cores = cores
+        self.batches = 0
+
+
+class EncoderPool:
+    """
+    Pool de N procesos encoder, cada uno fijado a una rebanada de cores y con sus
+    propios threads de PyTorch. Los pesos se cargan una sola vez en el padre y se
+    comparten copy-on-write con los workers (fork). `encode` envía cada batch al
+    primer worker ocioso y bloquea hasta tener el resultado, por lo que se llama
+    desde un thread (el batcher usa `asyncio.to_thread`).
+
+    Un worker que muere se reemplaza por uno nuevo en los mismos cores; mientras
+    el reemplazo hace su warm-up los callers esperan en lugar de fallar. Si no
+    arranca, el pool sigue con los restantes y, sin ninguno vivo, `encode` falla
+    en lugar de esperar indefinidamente.
+
+    Solo aplica a los backends de PyTorch (POOL_BACKENDS): las sesiones de ONNX
+    Runtime ya reparten cada encode en sus propios threads.
+
+    Args:
+        model: Modelo ya cargado en el proceso padre, sin inferencias previas.
+        workers (int): Número de procesos encoder.
+        threads_per_worker (int): Threads de PyTorch por worker (0 = uno por core asignado).
+    """
+
+    def __init__(self, model, workers: int, threads_per_worker: int = 0):
+        self.model = model
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self._workers: List[_Worker] = []
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        # Lugares cuyo reemplazo está arrancando: cuentan como vivos hasta terminar el warm-up
+        self._respawning = 0
+
+    def _spawn(self, worker_id: int, cores: List[int]) -> _Worker:
+        context = multiprocessing.get_context("fork")
+        parent_conn, child_conn = context.Pipe()
+        threads = self.threads_per_worker or len(cores)
+        process = context.Process(
+            target=_worker_main,
+            args=(worker_id, cores, threads, child_conn),
+            name=f"encoder-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(worker_id, process, parent_conn, cores)
+
+    @staticmethod
+    def _wait_ready(worker: _Worker) -> None:
+        try:
+            status, detail = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            status, detail = "error", str(e)
+        if status != "ready":
+            raise RuntimeError(f"El worker {worker.worker_id} no pudo iniciar: {detail}")
+
+    def start(self) -> None:
+        """Crea los procesos y espera a que todos terminen su warm-up."""
+        global _shared_model
+        _shared_model = self.model
+
+        for worker_id, cores in enumerate(split_cores(self.workers)):
+            self._workers.append(self._spawn(worker_id, cores))
+
+        for worker in self._workers:
+            try:
+                self._wait_ready(worker)
+            except RuntimeError:
+                self.close()
+                raise
+            self._idle.put(worker)
+
+    def _respawn(self, worker: _Worker) -> None:
+        """Retira un worker muerto y lo reemplaza por uno nuevo en los mismos cores."""
+        with self._lock:
+            self._workers.remove(worker)
+            self._respawning += 1
+        try:
+            worker.conn.close()
+            worker.process.join(timeout=1)
+
+            replacement = self._spawn(worker.worker_id, worker.cores)
+            try:
+                self._wait_ready(replacement)
+            except RuntimeError:
+                replacement.process.join(timeout=1)
+                if replacement.process.is_alive():
+                    replacement.process.terminate()
+                return
+            with self._lock:
+                self._workers.append(replacement)
+            self._idle.put(replacement)
+        finally:
+            with self._lock:
+                self._respawning -= 1
+
+    def _acquire(self) -> _Worker:
+        while True:
+            if not self.alive():
+                raise RuntimeError("No quedan workers de encoding vivos")
+            try:
+                return self._idle.get(timeout=IDLE_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+    def alive(self) -> bool:
+        """True si queda al menos un worker en el pool o uno reemplazándose."""
+        with self._lock:
+            return bool(self._workers) or self._respawning > 0
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Ejecuta el batch en un worker ocioso y devuelve la matriz de embeddings."""
+        worker = self._acquire()
+        try:
+            worker.conn.send(list(texts))
+            status, result = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            # El proceso murió: se reemplaza en lugar de devolverlo a la cola de ociosos
+            self._respawn(worker)
+            raise RuntimeError(f"El worker {worker.worker_id} terminó inesperadamente: {e}")
+
+        worker.batches += 1
+        self._idle.put(worker)
+        if status != "ok":
+            raise RuntimeError(result)
+        return result
+
+    def close(self) -> None:
+        """Detiene los workers."""
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        with self._lock:
+            self._workers = []
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._workers),
+            "respawning": self._respawning,
+            "idle_workers": self._idle.qsize(),
+            "per_worker": [
+                {
+                    "worker_id": worker.worker_id,
+                    "pid": worker.process.pid,
+                    "cores": worker.cores,
+                    "batches": worker.batches,
+                    "alive": worker.process.is_alive(),
+                } for worker in self._workers
+            ],
+        }
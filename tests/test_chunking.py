@@ -0,0 +1,40 @@
+# tests/test_chunking.py
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from utils import chunking
+
+
+def test_overlap_carries_trailing_words(monkeypatch):
+    """Con oraciones más largas que el solapamiento se arrastran sus últimas palabras."""
+    monkeypatch.setattr(
+        chunking, "sent_tokenize",
+        lambda text, language="spanish": [part.strip() + "." for part in text.split(".") if part.strip()]
+    )
+    sentences = [" ".join(f"s{i}w{j}" for j in range(12)) for i in range(4)]
+    text = ". ".join(sentences) + "."
+
+    chunks = chunking.text_splitter(text, max_words=30, overlap=8)
+
+    assert len(chunks) == 3
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.split()[:8] == previous.split()[-8:]
+        assert len(current.split()) <= 30
+
+
+def test_warm_up_reports_failure(monkeypatch):
+    """Un fallo al precargar queda disponible para el readiness y se limpia al reintentar."""
+    def missing_punkt():
+        raise LookupError("punkt")
+
+    monkeypatch.setattr(chunking, "_get_sent_tokenize", missing_punkt)
+    chunking.warm_up("words")
+    assert chunking.warm_up_error() == "LookupError: punkt"
+
+    monkeypatch.setattr(chunking, "_get_sent_tokenize", lambda: None)
+    chunking.warm_up("words")
+    assert chunking.warm_up_error() is None
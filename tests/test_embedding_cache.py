@@ -0,0 +1,49 @@
+# tests/test_embedding_cache.py
+
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def test_cache_is_keyed_by_encoder(tmp_path, monkeypatch):
+    """Un cambio de backend en el servicio no reutiliza los vectores del backend anterior."""
+    from utils import embedding_client
+    from utils.embedding_cache import EmbeddingCache
+
+    class Service:
+        def __init__(self):
+            self.encoder = None
+            self.backend = "torch"
+            self.texts = 0
+
+        async def embed(self, texts, operation="query"):
+            self.texts += len(texts)
+            self.encoder = self.backend
+            value = 1.0 if self.backend == "torch" else 2.0
+            return np.full((len(texts), 4), value, dtype=np.float32)
+
+    service = Service()
+    monkeypatch.setattr(embedding_client, "_service_client", service)
+    monkeypatch.setattr(
+        embedding_client, "embedding_cache",
+        EmbeddingCache("modelo", disk_path=str(tmp_path / "embeddings.sqlite3"))
+    )
+
+    async def run():
+        first = await embedding_client.get_embeddings(["hola", "mundo"])
+        cached = await embedding_client.get_embeddings(["hola", "mundo"])
+        assert service.texts == 2
+        service.backend = "onnx-int8-avx2"
+        # El primer llamado con el backend nuevo embebe lo que falta y detecta el cambio
+        switched = await embedding_client.get_embeddings(["hola", "nuevo"])
+        return first, cached, switched
+
+    first, cached, switched = asyncio.run(run())
+
+    assert (first == 1.0).all() and (cached == 1.0).all()
+    assert (switched == 2.0).all()
@@ -0,0 +1,53 @@
+# tests/test_partitions.py
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("QDRANT_LOCATION", ":memory:")
+os.environ.setdefault("NLTK_DOWNLOAD", "false")
+
+
+def test_redated_document_moves_without_touching_same_title(tmp_path, monkeypatch):
+    """Un documento con la fecha corregida cambia de partición; otro con el mismo título se conserva."""
+    monkeypatch.setenv("JOBS_DB_PATH", str(tmp_path / "jobs.sqlite3"))
+
+    from api.main import app
+    from api.schemas import DocumentItem
+    from benchmarks.standins import install_fake_embedder
+    from core import partitions
+    from core.client import create_partitioned_collection, insert_data, list_partitions
+    from utils.payload import build_payload
+
+    monkeypatch.setattr(partitions, "PARTITIONS_DIR", str(tmp_path / "partitions"))
+
+    def document(text: str, date: str) -> dict:
+        return DocumentItem(text=text, metadata={"title": "Resumen diario", "date": date, "tags": ["a"]})
+
+    async def upload(*documents):
+        payloads = await build_payload(documents, chunk=False, collection_name="news")
+        result = await insert_data("news", payloads)
+        assert "error" not in result, result
+
+    async def counts():
+        result = await list_partitions("news")
+        return {partition["key"]: partition["points_count"] for partition in result["partitions"]}
+
+    async def run():
+        install_fake_embedder()
+        async with app.router.lifespan_context(app):
+            await create_partitioned_collection("news", "month", 512)
+            await upload(document("resumen de mayo", "2024-05-31"))
+            await upload(document("resumen de junio", "2024-06-01"))
+            before = await counts()
+            # El resumen de mayo tenía mal la fecha
+            await upload(document("resumen de mayo", "2024-04-30"))
+            return before, await counts()
+
+    before, after = asyncio.run(run())
+
+    assert before == {"2024-05": 1, "2024-06": 1}
+    assert after == {"2024-04": 1, "2024-05": 0, "2024-06": 1}
@@ -0,0 +1,59 @@
+# tests/test_search.py
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("QDRANT_LOCATION", ":memory:")
+os.environ.setdefault("NLTK_DOWNLOAD", "false")
+
+
+def test_search_single_grouped_and_batch(tmp_path, monkeypatch):
+    """Las tres variantes de búsqueda corren contra el cliente de Qdrant instalado."""
+    monkeypatch.setenv("JOBS_DB_PATH", str(tmp_path / "jobs.sqlite3"))
+
+    from api.main import app
+    from api.schemas import METADATA_PAYLOAD_INDEXES
+    from benchmarks.standins import install_fake_embedder
+    from core.client import create_collection
+
+    documents = [
+        {"text": f"documento {i} sobre mercados", "metadata": {"title": f"t{i % 3}", "date": "2024-01-01", "tags": ["a"]}}
+        for i in range(12)
+    ]
+
+    async def run():
+        install_fake_embedder()
+        async with app.router.lifespan_context(app):
+            await create_collection("search_test", 512, METADATA_PAYLOAD_INDEXES)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                upload = await client.post("/api/collections/search_test/upload", json={"data": documents, "chunk": False})
+                assert upload.status_code == 200, upload.text
+                single = await client.post(
+                    "/api/collections/search_test/search",
+                    json={"query": "mercados", "limit": 5, "threshold": -1}
+                )
+                grouped = await client.post(
+                    "/api/collections/search_test/search",
+                    json={"query": "mercados", "limit": 5, "threshold": -1, "group_by_title": True, "group_size": 2}
+                )
+                batch = await client.post(
+                    "/api/collections/search_test/search/batch",
+                    json={"searches": [{"query": "mercados", "limit": 3, "threshold": -1}, {"query": "bonos", "limit": 4, "threshold": -1}]}
+                )
+            return single, grouped, batch
+
+    single, grouped, batch = asyncio.run(run())
+
+    assert single.status_code == 200, single.text
+    assert len(single.json()["data"]["results"]) == 5
+    assert grouped.status_code == 200, grouped.text
+    assert {group["id"] for group in grouped.json()["data"]["groups"]} == {"t0", "t1", "t2"}
+    assert batch.status_code == 200, batch.text
+    assert [len(results) for results in batch.json()["data"]["results"]] == [3, 4]
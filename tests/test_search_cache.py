@@ -0,0 +1,67 @@
+# tests/test_search_cache.py
+
+import asyncio
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from utils.search_cache import SearchCache
+
+
+def test_pending_write_skips_cache_until_settled(monkeypatch):
+    """Tras una escritura con wait=false no se cachea hasta que pasa la ventana."""
+    import utils.search_cache as module
+
+    now = [1000.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: now[0])
+    cache = SearchCache(max_entries=10, ttl_seconds=60, settle_seconds=5)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"results": len(calls)}
+
+    async def run():
+        cache.invalidate("docs", pending=True)
+        await cache.get_or_compute("docs", "q", compute)
+        await cache.get_or_compute("docs", "q", compute)
+        assert len(calls) == 2
+
+        now[0] += 6
+        await cache.get_or_compute("docs", "q", compute)
+        await cache.get_or_compute("docs", "q", compute)
+        assert len(calls) == 3
+
+    asyncio.run(run())
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    """Si se cancela el request que inició el cálculo, los coalescidos reciben el resultado."""
+    cache = SearchCache(max_entries=10, ttl_seconds=60)
+    release = None
+
+    async def compute():
+        await release.wait()
+        return {"results": 1}
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        leader = asyncio.ensure_future(cache.get_or_compute("docs", "q", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(cache.get_or_compute("docs", "q", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        result = await follower
+        assert leader.cancelled()
+        assert result == {"results": 1}
+        assert cache.coalesced == 1
+        # El resultado quedó cacheado aunque el primer caller se canceló
+        assert await cache.get_or_compute("docs", "q", compute) == {"results": 1}
+        assert cache.hits == 1
+
+    asyncio.run(run())
@@ -0,0 +1,57 @@
+# tests/test_upload_stream.py
+
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("QDRANT_LOCATION", ":memory:")
+os.environ.setdefault("NLTK_DOWNLOAD", "false")
+
+
+def test_upload_stream_writes_every_document(tmp_path, monkeypatch):
+    """Un body NDJSON enviado en varios fragmentos termina completo en Qdrant."""
+    monkeypatch.setenv("JOBS_DB_PATH", str(tmp_path / "jobs.sqlite3"))
+
+    from api.main import app
+    from benchmarks.standins import install_fake_embedder
+    from core.client import create_collection, get_client
+
+    documents = [
+        {"text": f"documento {i} sobre mercados", "metadata": {"title": f"t{i}", "date": "2024-01-01", "tags": ["a"]}}
+        for i in range(200)
+    ]
+
+    async def body():
+        # Varios mensajes http.request, cortando líneas a la mitad
+        raw = "".join(json.dumps(document) + "\n" for document in documents).encode()
+        for start in range(0, len(raw), 997):
+            yield raw[start:start + 997]
+
+    async def run():
+        install_fake_embedder()
+        async with app.router.lifespan_context(app):
+            await create_collection("stream_test", 512)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post(
+                    "/api/collections/stream_test/upload/stream",
+                    params={"chunk": "false", "batch_size": 16},
+                    content=body(),
+                )
+            count = await get_client().count(collection_name="stream_test", exact=True)
+            return response, count.count
+
+    # Si el body y la detección de desconexión compiten por `receive()` el request puede colgarse
+    response, count = asyncio.run(asyncio.wait_for(run(), timeout=30))
+    events = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == 200
+    assert events[-1]["event"] == "done", events[-1]
+    assert events[-1]["documents"] == len(documents)
+    assert count == len(documents)
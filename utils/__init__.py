@@ -1,4 +1,4 @@
 from .env import load_env, get_env_var
-from .ids import generate_uuid4
+from .ids import generate_uuid4, generate_point_id
 
-__all__ = ["load_env", "get_env_var", "generate_uuid4"]
\ No newline at end of file
+__all__ = ["load_env", "get_env_var", "generate_uuid4", "generate_point_id"]
\ No newline at end of file
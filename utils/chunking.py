@@ -1,20 +1,173 @@
 # utils/chunking.py
 
-from nltk.tokenize import sent_tokenize
-import nltk
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, List, Optional
+import multiprocessing
 
+from utils.env import get_env_var
 
-nltk.download('punkt')
 
-def text_splitter(text: str, max_words: int = 300, overlap: int = 50) -> list[str]:
+# Unidad con la que se miden los chunks: "tokens" (tokenizer del modelo) o "words"
+CHUNK_UNIT = get_env_var("CHUNK_UNIT", "tokens")
+# distiluse-base-multilingual-cased-v2 trunca a 128 tokens; se reservan 2 para [CLS] y [SEP]
+CHUNK_MAX_SIZE = int(get_env_var("CHUNK_MAX_SIZE", 126 if CHUNK_UNIT == "tokens" else 1000))
+CHUNK_OVERLAP = int(get_env_var("CHUNK_OVERLAP", 16 if CHUNK_UNIT == "tokens" else 100))
+CHUNK_TOKENIZER = get_env_var(
+    "CHUNK_TOKENIZER",
+    get_env_var("EMBEDDINGS_MODEL", "sentence-transformers/distiluse-base-multilingual-cased-v2")
+)
+# Procesos para chunking en paralelo y tamaño mínimo (en caracteres) de la carga para usarlos
+CHUNK_PROCESSES = int(get_env_var("CHUNK_PROCESSES", 0))
+CHUNK_PARALLEL_MIN_CHARS = int(get_env_var("CHUNK_PARALLEL_MIN_CHARS", 1_000_000))
+
+# Permite descargar los datos de NLTK en runtime si no vienen en la imagen
+NLTK_DOWNLOAD = get_env_var("NLTK_DOWNLOAD", "true").lower() == "true"
+
+# Recibe una lista de textos y devuelve la longitud de cada uno
+LengthFunction = Callable[[List[str]], List[int]]
+
+# Motivo por el que falló la última precarga de tokenizers (None si no falló)
+_warm_up_error: Optional[str] = None
+
+
+@lru_cache(maxsize=None)
+def _get_sent_tokenize() -> Callable[..., List[str]]:
+    """
+    Importa NLTK y verifica los datos de punkt en el primer uso, no al importar el módulo.
+    Las imágenes Docker ya traen los datos; solo se descargan si faltan y NLTK_DOWNLOAD lo permite.
+    """
+    import nltk
+    from nltk.tokenize import sent_tokenize
+
+    try:
+        sent_tokenize("Hola. Mundo.", language="spanish")
+    except LookupError:
+        if not NLTK_DOWNLOAD:
+            raise
+        # NLTK >= 3.9 usa punkt_tab; versiones anteriores usan punkt
+        nltk.download("punkt_tab", quiet=True)
+        nltk.download("punkt", quiet=True)
+    return sent_tokenize
+
+
+def sent_tokenize(text: str, language: str = "spanish") -> List[str]:
+    return _get_sent_tokenize()(text, language=language)
+
+
+def warm_up(unit: str = CHUNK_UNIT) -> None:
+    """
+    Carga por adelantado el tokenizer de oraciones y, si corresponde, el del modelo.
+    Un fallo no es fatal: se reintenta en el primer uso y el readiness de la API lo informa.
+    """
+    global _warm_up_error
+    try:
+        _get_sent_tokenize()
+        get_length_function(unit)(["Hola mundo"])
+        _warm_up_error = None
+    except Exception as e:
+        _warm_up_error = f"{type(e).__name__}: {e}"
+
+
+def warm_up_error() -> Optional[str]:
+    """El error de la última precarga de tokenizers, o None si no falló."""
+    return _warm_up_error
+
+
+def count_words(texts: List[str]) -> List[int]:
+    """
+    Cuenta las palabras (separadas por espacios) de cada texto.
+    """
+    return [len(text.split()) for text in texts]
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(model_name: str = CHUNK_TOKENIZER) -> LengthFunction:
+    """
+    Devuelve una función que cuenta los tokens del modelo para una lista de textos,
+    sin contar los tokens especiales. El tokenizer se carga una sola vez por proceso.
+    """
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    def count_tokens(texts: List[str]) -> List[int]:
+        if not texts:
+            return []
+        encoded = tokenizer(texts, add_special_tokens=False, truncation=False)["input_ids"]
+        return [len(ids) for ids in encoded]
+
+    return count_tokens
+
+
+def get_length_function(unit: str = CHUNK_UNIT) -> LengthFunction:
+    """
+    Devuelve la función de longitud para la unidad indicada ("tokens" o "words").
+    """
+    if unit == "tokens":
+        return get_token_counter()
+    if unit == "words":
+        return count_words
+    raise ValueError(f"Unidad de chunking no soportada: {unit}")
+
+
+def _split_oversized(sentence: str, max_words: int, length_function: LengthFunction) -> List[tuple]:
+    """
+    Divide por palabras una oración que por sí sola supera el máximo.
+    """
+    words = sentence.split()
+    pieces = []
+    current = []
+    total = 0
+    for word, size in zip(words, length_function(words)):
+        if current and total + size > max_words:
+            pieces.append((" ".join(current), total))
+            current, total = [], 0
+        current.append(word)
+        total += size
+    if current:
+        pieces.append((" ".join(current), total))
+    return pieces
+
+
+def _tail_words(sentence: str, budget: int, length_function: LengthFunction) -> Optional[tuple]:
+    """
+    Últimas palabras de una oración que suman a lo sumo `budget` unidades, o None.
+    """
+    words = sentence.split()
+    tail = []
+    total = 0
+    for word, size in zip(reversed(words), reversed(length_function(words))):
+        if total + size > budget:
+            break
+        tail.append(word)
+        total += size
+    if not tail:
+        return None
+    return " ".join(reversed(tail)), total
+
+
+def text_splitter(
+    text: str,
+    max_words: int = 300,
+    overlap: int = 50,
+    length_function: LengthFunction = count_words
+) -> list[str]:
     """
     Divide un texto en chunks respetando párrafos y oraciones,
-    con un máximo de palabras por chunk y superposición entre ellos.
+    con un tamaño máximo por chunk y superposición entre ellos.
+
+    El tamaño se mide con `length_function` (palabras por defecto, o tokens del
+    modelo con `get_token_counter()`), manteniendo contadores acumulados en una
+    sola pasada sobre las oraciones.
 
     Args:
         text (str): Texto completo a dividir.
-        max_words (int): Máximo número de palabras por chunk.
-        overlap (int): Número de palabras a solapar entre chunks consecutivos.
+        max_words (int): Tamaño máximo de cada chunk, en unidades de `length_function`.
+        overlap (int): Unidades a solapar entre chunks consecutivos: las últimas oraciones
+            completas que entran y, en lo que falte, las últimas palabras de la anterior.
+        length_function (LengthFunction): Función que mide una lista de textos.
 
     Returns:
         list[str]: Lista de fragmentos de texto (chunks).
@@ -22,26 +175,93 @@ def text_splitter(text: str, max_words: int = 300, overlap: int = 50) -> list[st
     paragraphs = [p.strip() for p in text.split('\n') if p.strip() and len(p.strip().split()) >= 3]
     chunks = []
 
-    for para in paragraphs:
-        words = para.split()
-        if len(words) <= max_words:
+    for para, para_size in zip(paragraphs, length_function(paragraphs)):
+        if para_size <= max_words:
             chunks.append(para)
-        else:
-            sentences = sent_tokenize(para, language="spanish")
-            chunk = []
-            count = 0
-            for sent in sentences:
-                sent_words = sent.split()
-                if count + len(sent_words) <= max_words:
-                    chunk.append(sent)
-                    count += len(sent_words)
-                else:
-                    chunks.append(" ".join(chunk))
-
-                    chunk = chunk[-overlap:] if overlap < len(chunk) else chunk
-                    chunk.append(sent)
-                    count = sum(len(s.split()) for s in chunk)
-            if chunk:
-                chunks.append(" ".join(chunk))
-
-    return chunks
\ No newline at end of file
+            continue
+
+        sentences = sent_tokenize(para, language="spanish")
+        units = []
+        for sent, size in zip(sentences, length_function(sentences)):
+            if size > max_words:
+                units.extend(_split_oversized(sent, max_words, length_function))
+            else:
+                units.append((sent, size))
+
+        window = deque()
+        count = 0
+        for sent, size in units:
+            if window and count + size > max_words:
+                chunks.append(" ".join(s for s, _ in window))
+
+                # Conservar las últimas oraciones que entran en el solapamiento
+                kept = deque()
+                kept_count = 0
+                while window and kept_count + window[-1][1] <= overlap:
+                    s, n = window.pop()
+                    kept.appendleft((s, n))
+                    kept_count += n
+                # Completar con el final de la oración que no entró entera
+                if window and kept_count < overlap:
+                    tail = _tail_words(window[-1][0], overlap - kept_count, length_function)
+                    if tail is not None:
+                        kept.appendleft(tail)
+                        kept_count += tail[1]
+                window, count = kept, kept_count
+
+                # Descartar solapamiento si no deja lugar para la nueva oración
+                while window and count + size > max_words:
+                    count -= window.popleft()[1]
+
+            window.append((sent, size))
+            count += size
+
+        if window:
+            chunks.append(" ".join(s for s, _ in window))
+
+    return chunks
+
+
+def _split_with_unit(text: str, max_words: int, overlap: int, unit: str) -> list[str]:
+    return text_splitter(text, max_words, overlap, get_length_function(unit))
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+def _get_executor(processes: int) -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn evita heredar threads y locks del proceso de la API
+        _executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def split_texts(
+    texts: List[str],
+    max_words: int = CHUNK_MAX_SIZE,
+    overlap: int = CHUNK_OVERLAP,
+    unit: str = CHUNK_UNIT,
+    processes: int = CHUNK_PROCESSES,
+    min_chars: int = CHUNK_PARALLEL_MIN_CHARS
+) -> List[list[str]]:
+    """
+    Divide varios textos en chunks. Si la carga suma al menos `min_chars` caracteres
+    y `processes` > 1, los textos se reparten en un pool de procesos.
+
+    Returns:
+        List[list[str]]: Los chunks de cada texto, en el mismo orden.
+    """
+    total_chars = sum(len(text) for text in texts)
+    if processes > 1 and len(texts) > 1 and total_chars >= min_chars:
+        executor = _get_executor(processes)
+        return list(executor.map(
+            _split_with_unit, texts,
+            [max_words] * len(texts), [overlap] * len(texts), [unit] * len(texts),
+            chunksize=max(1, len(texts) // (processes * 4))
+        ))
+
+    length_function = get_length_function(unit)
+    return [text_splitter(text, max_words, overlap, length_function) for text in texts]
@@ -0,0 +1,166 @@
+# utils/embedding_cache.py
+
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza un texto para usarlo como clave de cache: Unicode NFC,
+    espacios colapsados y sin espacios al inicio o final.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(model_name: str, encoder: str, text: str) -> str:
+    """
+    Genera la clave de cache a partir del modelo, el encoder que lo ejecuta (backend y
+    cuantización, que cambian los vectores) y el hash SHA-256 del texto normalizado.
+    """
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model_name}:{encoder}:{digest}"
+
+
+class SQLiteEmbeddingStore:
+    """
+    Tier persistente del cache: guarda cada embedding como blob float32 en SQLite.
+
+    Args:
+        path (str): Ruta al archivo SQLite (se crea si no existe).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            # SQLite limita la cantidad de parámetros por consulta
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        rows = [
+            (key, np.asarray(vector, dtype=np.float32).tobytes())
+            for key, vector in items.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingCache:
+    """
+    Cache de embeddings direccionado por contenido con dos niveles:
+    un LRU acotado en memoria y un store opcional en disco que sobrevive reinicios.
+
+    Args:
+        model_name (str): Nombre del modelo, forma parte de la clave.
+        max_entries (int): Máximo número de embeddings en memoria.
+        disk_path (str, optional): Ruta al SQLite persistente; None desactiva el tier en disco.
+    """
+
+    def __init__(self, model_name: str, max_entries: int = 50_000, disk_path: Optional[str] = None):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.disk = SQLiteEmbeddingStore(disk_path) if disk_path else None
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def key(self, text: str, encoder: str) -> str:
+        return cache_key(self.model_name, encoder, text)
+
+    def lookup(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Busca las claves en ambos niveles.
+
+        Args:
+            keys (Sequence[str]): Claves generadas con `key()`.
+
+        Returns:
+            Dict[str, np.ndarray]: Embeddings encontrados, indexados por clave de cache.
+        """
+        found = {}
+        missing = []
+
+        with self._lock:
+            for key in keys:
+                if key in found:
+                    continue
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                    self.memory_hits += 1
+                else:
+                    missing.append(key)
+
+        if missing and self.disk is not None:
+            from_disk = self.disk.get_many(list(dict.fromkeys(missing)))
+            with self._lock:
+                for key, vector in from_disk.items():
+                    self._remember(key, vector)
+                found.update(from_disk)
+            self.disk_hits += sum(1 for key in missing if key in from_disk)
+
+        self.misses += sum(1 for key in missing if key not in found)
+        return found
+
+    def store(self, keys: Sequence[str], vectors: Sequence[np.ndarray]) -> None:
+        """Guarda embeddings recién calculados en memoria y, si está activo, en disco."""
+        # Copiar cada fila para no retener el buffer completo de la respuesta original
+        items = {key: np.array(vector, dtype=np.float32) for key, vector in zip(keys, vectors)}
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+        if self.disk is not None:
+            self.disk.put_many(items)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "model_name": self.model_name,
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "disk_enabled": self.disk is not None,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
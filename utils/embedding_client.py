@@ -1,12 +1,237 @@
 # utils/embedding_client.py
 
+import asyncio
+import random
+from typing import Optional
+
 import httpx
+import numpy as np
+from utils.env import get_env_var
+from utils.embedding_cache import EmbeddingCache
+from utils.vector_codec import F32_MEDIA_TYPE, JSON_MEDIA_TYPE, BINARY_MEDIA_TYPES, decode_embeddings
+from utils.metrics import timed, observe_batch, observe_bytes
+
+EMBEDDINGS_SERVICE_BASE_URL = get_env_var("EMBEDDINGS_SERVICE_URL", "http://embeddings_service:8001").rstrip("/")
+EMBEDDINGS_SERVICE_URL = EMBEDDINGS_SERVICE_BASE_URL + "/embed"
+EMBEDDINGS_READY_URL = EMBEDDINGS_SERVICE_BASE_URL + "/health/ready"
+EMBEDDINGS_MODEL = get_env_var("EMBEDDINGS_MODEL", "sentence-transformers/distiluse-base-multilingual-cased-v2")
+# Header con el que el servicio informa su encoder (backend y cuantización)
+ENCODER_HEADER = "X-Embedding-Encoder"
+
+# Status HTTP que se consideran transitorios y se reintentan
+RETRYABLE_STATUS = {429, 502, 503, 504}
+
+embedding_cache = EmbeddingCache(
+    model_name=EMBEDDINGS_MODEL,
+    max_entries=int(get_env_var("EMBED_CACHE_MAX_ENTRIES", 50_000)),
+    disk_path=get_env_var("EMBED_CACHE_PATH"),
+)
+
+
+class EmbeddingServiceClient:
+    """
+    Cliente HTTP de larga vida para el servicio de embeddings.
+
+    Mantiene un pool de conexiones keep-alive, aplica timeouts distintos para
+    consultas ("query") y cargas masivas ("ingest"), reintenta errores
+    transitorios con backoff exponencial con jitter y divide listas grandes de
+    textos en sub-requests acotados que se envían en paralelo. `encoder` guarda la
+    identidad del encoder informada por el servicio (None hasta la primera respuesta).
+
+    Args:
+        url (str): URL del endpoint /embed.
+        max_connections (int): Máximo de conexiones abiertas en el pool.
+        max_keepalive (int): Máximo de conexiones ociosas mantenidas vivas.
+        http2 (bool): Habilita HTTP/2 (requiere el extra `httpx[http2]`).
+        query_timeout (float): Timeout en segundos para consultas.
+        ingest_timeout (float): Timeout en segundos para cargas masivas.
+        max_retries (int): Reintentos ante errores transitorios.
+        backoff (float): Base en segundos del backoff exponencial.
+        max_texts_per_request (int): Máximo de textos por sub-request.
+        max_concurrent_requests (int): Máximo de sub-requests simultáneos por llamada.
+        binary (bool): Pide la respuesta en float32 binario en lugar de JSON.
+    """
+
+    def __init__(
+        self,
+        url: str = EMBEDDINGS_SERVICE_URL,
+        max_connections: int = 20,
+        max_keepalive: int = 10,
+        http2: bool = False,
+        query_timeout: float = 5.0,
+        ingest_timeout: float = 120.0,
+        max_retries: int = 3,
+        backoff: float = 0.2,
+        max_texts_per_request: int = 256,
+        max_concurrent_requests: int = 4,
+        binary: bool = True,
+    ):
+        self.url = url
+        self.timeouts = {"query": query_timeout, "ingest": ingest_timeout}
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_texts_per_request = max_texts_per_request
+        self.max_concurrent_requests = max_concurrent_requests
+        self.headers = {"Accept": f"{F32_MEDIA_TYPE}, {JSON_MEDIA_TYPE};q=0.5" if binary else JSON_MEDIA_TYPE}
+        self.encoder: Optional[str] = None
+        self._http = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+            ),
+            timeout=query_timeout,
+        )
+
+    async def close(self) -> None:
+        await self._http.aclose()
+
+    async def ready(self) -> bool:
+        """Consulta el endpoint de readiness del servicio de embeddings."""
+        try:
+            response = await self._http.get(EMBEDDINGS_READY_URL, timeout=2)
+            if response.status_code != 200:
+                return False
+            self.encoder = response.json().get("encoder", self.encoder)
+            return True
+        except (httpx.HTTPError, ValueError):
+            return False
+
+    @staticmethod
+    def _decode(response: httpx.Response) -> np.ndarray:
+        media_type = response.headers.get("content-type", JSON_MEDIA_TYPE).split(";")[0].strip()
+        if media_type in BINARY_MEDIA_TYPES:
+            return decode_embeddings(response.content, media_type)
+        # Compatibilidad con servicios que solo responden JSON
+        return np.asarray(response.json().get("embeddings", []), dtype=np.float32)
+
+    async def _post(self, texts: list[str], timeout: float) -> np.ndarray:
+        observe_batch("embedding_http", len(texts))
+        with timed("embedding_http"):
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = await self._http.post(
+                        self.url, json={"texts": texts}, headers=self.headers, timeout=timeout
+                    )
+                    if response.status_code not in RETRYABLE_STATUS or attempt == self.max_retries:
+                        response.raise_for_status()
+                        observe_bytes("embedding_http", len(response.content))
+                        self.encoder = response.headers.get(ENCODER_HEADER, self.encoder)
+                        return self._decode(response)
+                except httpx.TransportError:
+                    if attempt == self.max_retries:
+                        raise
+                # Full jitter: espera aleatoria entre 0 y backoff * 2^intento
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    async def embed(self, texts: list[str], operation: str = "query") -> np.ndarray:
+        """
+        Obtiene embeddings del servicio, dividiendo en sub-requests si hace falta.
+
+        Args:
+            texts (list[str]): Textos a embeber.
+            operation (str): "query" o "ingest", define el timeout aplicado.
+
+        Returns:
+            np.ndarray: Matriz float32 (n, dim), una fila por texto en el mismo orden.
+        """
+        timeout = self.timeouts.get(operation, self.timeouts["query"])
+        if len(texts) <= self.max_texts_per_request:
+            return await self._post(texts, timeout)
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        async def post_slice(start: int) -> np.ndarray:
+            async with semaphore:
+                return await self._post(texts[start:start + self.max_texts_per_request], timeout)
+
+        parts = await asyncio.gather(*(
+            post_slice(start) for start in range(0, len(texts), self.max_texts_per_request)
+        ))
+        return np.concatenate(parts)
+
+
+_service_client: Optional[EmbeddingServiceClient] = None
+
+def start_embedding_client() -> EmbeddingServiceClient:
+    """
+    Crea el cliente compartido a partir de las variables de entorno.
+    Se llama desde el lifespan de la aplicación.
+    """
+    global _service_client
+    if _service_client is None:
+        _service_client = EmbeddingServiceClient(
+            max_connections=int(get_env_var("EMBED_HTTP_MAX_CONNECTIONS", 20)),
+            max_keepalive=int(get_env_var("EMBED_HTTP_MAX_KEEPALIVE", 10)),
+            http2=get_env_var("EMBED_HTTP2", "false").lower() == "true",
+            query_timeout=float(get_env_var("EMBED_QUERY_TIMEOUT", 5)),
+            ingest_timeout=float(get_env_var("EMBED_INGEST_TIMEOUT", 120)),
+            max_retries=int(get_env_var("EMBED_HTTP_RETRIES", 3)),
+            max_texts_per_request=int(get_env_var("EMBED_REQUEST_MAX_TEXTS", 256)),
+            max_concurrent_requests=int(get_env_var("EMBED_REQUEST_CONCURRENCY", 4)),
+            binary=get_env_var("EMBED_BINARY", "true").lower() == "true",
+        )
+    return _service_client
+
+async def close_embedding_client() -> None:
+    """Cierra el cliente compartido y sus conexiones."""
+    global _service_client
+    if _service_client is not None:
+        await _service_client.close()
+        _service_client = None
+
+async def get_embeddings(texts: list[str], operation: str = "query") -> np.ndarray:
+    """
+    Obtiene los embeddings de una lista de textos, consultando primero el cache.
+    Solo los textos que no están en cache se envían al servicio de embeddings.
+    Las claves incluyen el encoder del servicio: hasta conocerlo no se consulta el
+    cache, y si cambia (otro EMBED_BACKEND) los vectores anteriores dejan de usarse.
+
+    Args:
+        texts (list[str]): Textos a embeber.
+        operation (str): "query" para búsquedas o "ingest" para cargas masivas.
+
+    Returns:
+        np.ndarray: Matriz float32 (n, dim), una fila por texto en el mismo orden.
+    """
+    client = start_embedding_client()
+    encoder = client.encoder
+    with timed("embedding_cache"):
+        keys = [embedding_cache.key(text, encoder) for text in texts]
+        if encoder is None:
+            found = {}
+        elif embedding_cache.disk is not None:
+            found = await asyncio.to_thread(embedding_cache.lookup, keys)
+        else:
+            found = embedding_cache.lookup(keys)
+
+    # Deduplicar los textos faltantes por clave para no embeber dos veces el mismo contenido
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found and key not in missing:
+            missing[key] = text
 
-EMBEDDINGS_SERVICE_URL = "http://embeddings_service:8001/embed"
+    if missing:
+        embeddings = await client.embed(list(missing.values()), operation=operation)
+        if client.encoder != encoder:
+            if found:
+                # Los hits eran de otro encoder: recalcular todo con el actual
+                return await get_embeddings(texts, operation)
+            missing = {embedding_cache.key(text, client.encoder): text for text in missing.values()}
+            keys = [embedding_cache.key(text, client.encoder) for text in texts]
+        missing_keys = list(missing.keys())
+        if client.encoder is None:
+            # Servicio que no informa su encoder: no se cachea
+            pass
+        elif embedding_cache.disk is not None:
+            await asyncio.to_thread(embedding_cache.store, missing_keys, embeddings)
+        else:
+            embedding_cache.store(missing_keys, embeddings)
+        # Sin hits ni duplicados la matriz decodificada ya está en el orden pedido
+        if not found and len(missing_keys) == len(keys):
+            return embeddings
+        found.update(zip(missing_keys, embeddings))
 
-async def get_embeddings(texts: list[str]) -> list[list[float]]:
-    async with httpx.AsyncClient(timeout=10) as client:
-        response = await client.post(EMBEDDINGS_SERVICE_URL, json={"texts": texts})
-        response.raise_for_status()
-        data = response.json()
-        return data.get("embeddings", [])
+    if not keys:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.stack([found[key] for key in keys])
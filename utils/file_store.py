@@ -0,0 +1,62 @@
+# utils/file_store.py
+"""
+Archivos de configuración por colección (proyecciones PCA, particiones por tiempo)
+que la API lee en cada request y los scripts pueden reemplazar en caliente.
+"""
+
+import os
+from pathlib import Path
+from typing import Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def atomic_write(path: Path, write: Callable[[Path], None], tmp_suffix: str = ".tmp") -> None:
+    """
+    Escribe `path` a través de un archivo temporal y lo reemplaza con `os.replace`:
+    la API puede estar leyendo el archivo anterior.
+
+    Args:
+        path (Path): Archivo destino; su directorio se crea si no existe.
+        write (Callable): Escribe el contenido en la ruta temporal que recibe.
+        tmp_suffix (str): Sufijo del temporal (np.savez, por ejemplo, exige terminar en .npz).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(tmp_suffix)
+    write(tmp)
+    os.replace(tmp, path)
+
+
+class MtimeCache(Generic[T]):
+    """
+    Cache en memoria de un archivo por colección que se relee cuando cambia su mtime.
+
+    Args:
+        path_for (Callable): Ruta del archivo de una colección.
+        load (Callable): Lee y parsea el archivo.
+    """
+
+    def __init__(self, path_for: Callable[[str], Path], load: Callable[[Path], T]):
+        self.path_for = path_for
+        self.load = load
+        # colección -> (mtime del archivo, contenido)
+        self._loaded: Dict[str, Tuple[float, T]] = {}
+
+    def get(self, collection_name: str) -> Optional[T]:
+        """El contenido del archivo de la colección, o None si no existe."""
+        path = self.path_for(collection_name)
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            self._loaded.pop(collection_name, None)
+            return None
+        cached = self._loaded.get(collection_name)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, self.load(path))
+            self._loaded[collection_name] = cached
+        return cached[1]
+
+    def delete(self, collection_name: str) -> None:
+        """Elimina el archivo de la colección y lo olvida."""
+        self.path_for(collection_name).unlink(missing_ok=True)
+        self._loaded.pop(collection_name, None)
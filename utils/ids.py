@@ -1,7 +1,11 @@
 # utils/ids.py
 
+import hashlib
 import uuid
 
+# Namespace fijo para derivar IDs de puntos: cambiarlo invalida todos los IDs existentes
+POINT_ID_NAMESPACE = uuid.UUID("6f1c7a52-3d4e-5b8a-9c2f-1e7d0b4a8f36")
+
 def generate_uuid4() -> str:
     """
     Genera un UUID versión 4 como string.
@@ -19,3 +23,25 @@ def generate_custom_id(prefix: str = "") -> str:
         str: Prefijo + UUID4.
     """
     return f"{prefix}{uuid.uuid4()}"
+
+def content_hash(text: str) -> str:
+    """
+    Devuelve el hash SHA-256 (hex) del contenido de un fragmento.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def generate_point_id(collection_name: str, title: str | None, text: str) -> str:
+    """
+    Genera un UUID versión 5 determinístico para un fragmento: el mismo contenido
+    del mismo documento en la misma colección produce siempre el mismo ID.
+
+    Args:
+        collection_name (str): Nombre de la colección.
+        title (str | None): Título del documento.
+        text (str): Texto del fragmento.
+
+    Returns:
+        str: UUID5 como string.
+    """
+    name = "\x1f".join([collection_name, title or "", content_hash(text)])
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, name))
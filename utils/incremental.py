@@ -0,0 +1,107 @@
+# utils/incremental.py
+
+import asyncio
+from collections import defaultdict
+from typing import Dict, List
+
+from core.client import (
+    existing_point_ids,
+    document_point_ids,
+    update_points_metadata,
+    delete_points,
+    insert_data
+)
+from core.partitions import get_spec
+from utils.ids import generate_point_id
+from utils.chunking import CHUNK_MAX_SIZE, CHUNK_OVERLAP
+from utils.payload import chunk_documents, embed_chunks
+
+
+async def incremental_upload(
+        collection_name: str,
+        data: List[Dict],
+        max_words: int = CHUNK_MAX_SIZE,
+        overlap: int = CHUNK_OVERLAP,
+        chunk: bool = True
+) -> Dict:
+    """
+    Sube documentos de forma incremental usando IDs determinísticos por contenido.
+
+    Solo se embeben y suben los fragmentos nuevos o modificados; los que ya existen
+    conservan su vector y se les actualiza la metadata, y los fragmentos del mismo
+    título que ya no forman parte del documento se eliminan.
+
+    Args:
+        collection_name (str): Nombre de la colección.
+        data (List[Dict]): Documentos con "text" y "metadata" (el título identifica al documento).
+        max_words (int): Tamaño máximo por chunk, en la unidad de CHUNK_UNIT.
+        overlap (int): Solapamiento entre chunks, en la misma unidad.
+        chunk (bool): Si es False, cada documento se sube completo.
+
+    Returns:
+        Dict: Cantidad de fragmentos nuevos, sin cambios y eliminados, o un error.
+    """
+    # Las búsquedas de IDs existentes irían solo a la partición del alias
+    if get_spec(collection_name) is not None:
+        return {
+            "error": "La carga incremental no está soportada en colecciones particionadas por tiempo",
+            "collection_name": collection_name
+        }
+
+    try:
+        chunks, metadata = await asyncio.to_thread(chunk_documents, data, max_words, overlap, chunk)
+
+        ids = []
+        ids_by_title = defaultdict(list)
+        metadata_by_title = {}
+        for text, meta in zip(chunks, metadata):
+            title = meta.get("title")
+            point_id = generate_point_id(collection_name, title, text)
+            ids.append(point_id)
+            ids_by_title[title].append(point_id)
+            metadata_by_title[title] = meta
+
+        existing = await existing_point_ids(collection_name, list(dict.fromkeys(ids)))
+
+        # Fragmentos nuevos, sin repetir los que aparecen más de una vez en la carga
+        seen = set()
+        new_chunks, new_metadata, new_ids = [], [], []
+        for point_id, text, meta in zip(ids, chunks, metadata):
+            if point_id in existing or point_id in seen:
+                continue
+            seen.add(point_id)
+            new_chunks.append(text)
+            new_metadata.append(meta)
+            new_ids.append(point_id)
+
+        if new_chunks:
+            payloads = await embed_chunks(new_chunks, new_metadata, collection_name)
+            for payload, point_id in zip(payloads, new_ids):
+                payload["id"] = point_id
+            result = await insert_data(collection_name, payloads)
+            if "error" in result:
+                return result
+
+        deleted = 0
+        for title, title_ids in ids_by_title.items():
+            current = set(title_ids)
+            unchanged = [point_id for point_id in current if point_id in existing]
+            # La metadata (tags, fecha, url) puede cambiar aunque el texto no
+            await update_points_metadata(collection_name, unchanged, metadata_by_title[title])
+
+            # Sin título no hay forma de identificar el documento anterior
+            if title is None:
+                continue
+            stale = list(await document_point_ids(collection_name, title) - current)
+            await delete_points(collection_name, stale)
+            deleted += len(stale)
+
+        return {
+            "status": "Incremental upload completed",
+            "collection_name": collection_name,
+            "new": len(new_ids),
+            "unchanged": len(existing),
+            "deleted": deleted
+        }
+    except Exception as e:
+        return {"error": str(e), "collection_name": collection_name}
@@ -0,0 +1,163 @@
+# utils/ingest.py
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from utils.chunking import CHUNK_MAX_SIZE, CHUNK_OVERLAP
+from utils.payload import chunk_documents, embed_chunks
+
+# Marca de fin de stream que cada etapa propaga a la siguiente
+_DONE = object()
+
+
+async def _stage(
+    inbox: asyncio.Queue,
+    outbox: asyncio.Queue | None,
+    handler: Callable[[object], Awaitable[object]],
+    workers: int
+) -> None:
+    """
+    Ejecuta `workers` consumidores concurrentes sobre `inbox`. Cada resultado distinto
+    de None se publica en `outbox`, cuyo tamaño acotado frena a la etapa si la
+    siguiente va más lenta (backpressure).
+    """
+    async def worker():
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                # Volver a publicar la marca para que el resto de los workers también termine
+                await inbox.put(_DONE)
+                return
+            result = await handler(item)
+            if result is not None and outbox is not None:
+                await outbox.put(result)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    if outbox is not None:
+        await outbox.put(_DONE)
+
+
+async def ingest_stream(
+    documents: AsyncIterator,
+    sink: Callable[[List[Dict]], Awaitable[Dict]],
+    batch_size: int = 16,
+    queue_size: int = 4,
+    embed_concurrency: int = 2,
+    upsert_concurrency: int = 2,
+    max_words: int = CHUNK_MAX_SIZE,
+    overlap: int = CHUNK_OVERLAP,
+    chunk: bool = True,
+    collection_name: Optional[str] = None
+) -> AsyncIterator[Dict]:
+    """
+    Ingesta en pipeline: lectura -> chunking -> embeddings -> upsert, en batches de
+    `batch_size` documentos. Las etapas se solapan y se comunican con colas acotadas,
+    así la memoria se mantiene constante sin importar el tamaño de la carga.
+
+    Args:
+        documents (AsyncIterator): Documentos (DocumentItem) a medida que llegan.
+        sink (Callable): Corrutina que recibe una lista de payloads y los persiste;
+            devuelve un dict con "error" si falla (como `core.client.insert_data`).
+        batch_size (int): Documentos por batch.
+        queue_size (int): Máximo de batches en espera entre etapas.
+        embed_concurrency (int): Batches embebiéndose en simultáneo.
+        upsert_concurrency (int): Batches escribiéndose en Qdrant en simultáneo.
+        max_words (int): Tamaño máximo por chunk, en la unidad de CHUNK_UNIT.
+        overlap (int): Solapamiento entre chunks, en la misma unidad.
+        chunk (bool): Si es False, cada documento se sube completo.
+        collection_name (str, optional): Colección destino, para aplicar su proyección si tiene.
+
+    Yields:
+        Dict: Eventos de progreso ("progress", "batch_failed") y un evento final "done" o "error".
+    """
+    progress = {"documents": 0, "chunks": 0, "upserted": 0, "batches": 0, "failed_batches": 0}
+    events: asyncio.Queue = asyncio.Queue()
+    to_chunk: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    to_embed: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    to_upsert: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    batch_counter = 0
+
+    def fail(batch_id: int, stage: str, error: str) -> None:
+        progress["failed_batches"] += 1
+        events.put_nowait({"event": "batch_failed", "batch": batch_id, "stage": stage, "error": error, **progress})
+
+    async def read() -> None:
+        nonlocal batch_counter
+        batch = []
+        async for doc in documents:
+            progress["documents"] += 1
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                await to_chunk.put((batch_counter, batch))
+                batch_counter += 1
+                batch = []
+        if batch:
+            await to_chunk.put((batch_counter, batch))
+            batch_counter += 1
+        await to_chunk.put(_DONE)
+
+    async def chunk_batch(item):
+        batch_id, batch = item
+        try:
+            chunks, metadata = await asyncio.to_thread(chunk_documents, batch, max_words, overlap, chunk)
+        except Exception as e:
+            fail(batch_id, "chunking", str(e))
+            return None
+        progress["chunks"] += len(chunks)
+        return batch_id, chunks, metadata
+
+    async def embed_batch(item):
+        batch_id, chunks, metadata = item
+        try:
+            return batch_id, await embed_chunks(chunks, metadata, collection_name)
+        except Exception as e:
+            fail(batch_id, "embedding", str(e))
+            return None
+
+    async def upsert_batch(item):
+        batch_id, payloads = item
+        if not payloads:
+            return None
+        try:
+            result = await sink(payloads)
+        except Exception as e:
+            result = {"error": str(e)}
+        if "error" in result:
+            fail(batch_id, "upsert", result["error"])
+            return None
+        progress["upserted"] += len(payloads)
+        progress["batches"] += 1
+        events.put_nowait({"event": "progress", "batch": batch_id, **progress})
+        return None
+
+    async def run() -> None:
+        tasks = [
+            asyncio.create_task(read()),
+            asyncio.create_task(_stage(to_chunk, to_embed, chunk_batch, 1)),
+            asyncio.create_task(_stage(to_embed, to_upsert, embed_batch, embed_concurrency)),
+            asyncio.create_task(_stage(to_upsert, None, upsert_batch, upsert_concurrency)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # Si una etapa falla (p. ej. una línea inválida) el resto quedaría esperando en su cola
+            for task in tasks:
+                task.cancel()
+
+    pipeline = asyncio.create_task(run())
+    pipeline.add_done_callback(lambda _: events.put_nowait(_DONE))
+    try:
+        while True:
+            event = await events.get()
+            if event is _DONE:
+                break
+            yield event
+
+        if pipeline.exception() is not None:
+            yield {"event": "error", "error": str(pipeline.exception()), **progress}
+        else:
+            yield {"event": "done", **progress}
+    finally:
+        # Si el cliente se desconecta se cancela todo el pipeline
+        if not pipeline.done():
+            pipeline.cancel()
@@ -0,0 +1,303 @@
+# utils/jobs.py
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from utils.env import get_env_var
+
+# Estados de un job: queued -> running -> completed | failed | cancelled
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+class SQLiteJobStore:
+    """
+    Persistencia de los jobs de ingesta y sus batches en SQLite. Cada batch guarda sus
+    documentos y su estado, de modo que un job interrumpido se retoma desde el primer
+    batch pendiente.
+
+    Args:
+        path (str): Ruta al archivo SQLite (se crea si no existe).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                collection_name TEXT NOT NULL,
+                options TEXT NOT NULL,
+                status TEXT NOT NULL,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                documents INTEGER NOT NULL,
+                points INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS job_batches (
+                job_id TEXT NOT NULL,
+                batch_index INTEGER NOT NULL,
+                documents TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                points INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                PRIMARY KEY (job_id, batch_index)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def create(self, collection_name: str, batches: List[List[dict]], options: dict) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, collection_name, options, status, documents, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, collection_name, json.dumps(options), sum(len(b) for b in batches), now, now)
+            )
+            self._conn.executemany(
+                "INSERT INTO job_batches (job_id, batch_index, documents) VALUES (?, ?, ?)",
+                [(job_id, index, json.dumps(batch, ensure_ascii=False)) for index, batch in enumerate(batches)]
+            )
+            self._conn.commit()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM job_batches WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+            errors = [
+                {"batch": row["batch_index"], "error": row["error"]}
+                for row in self._conn.execute(
+                    "SELECT batch_index, error FROM job_batches WHERE job_id = ? AND status = 'failed' "
+                    "ORDER BY batch_index LIMIT 20", (job_id,)
+                )
+            ]
+        total = sum(counts.values())
+        return {
+            "job_id": job["id"],
+            "collection_name": job["collection_name"],
+            "status": job["status"],
+            "cancel_requested": bool(job["cancel_requested"]),
+            "documents": job["documents"],
+            "points": job["points"],
+            "batches": {
+                "total": total,
+                "done": counts.get("done", 0),
+                "failed": counts.get("failed", 0),
+                "pending": counts.get("pending", 0),
+            },
+            "progress": (counts.get("done", 0) + counts.get("failed", 0)) / total if total else 1.0,
+            "options": json.loads(job["options"]),
+            "error": job["error"],
+            "failed_batches": errors,
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+        }
+
+    def unfinished(self) -> List[str]:
+        """Jobs en cola o interrumpidos mientras corrían, en orden de creación."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def pending_batches(self, job_id: str) -> List[int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT batch_index FROM job_batches WHERE job_id = ? AND status = 'pending' ORDER BY batch_index",
+                (job_id,)
+            ).fetchall()
+        return [row["batch_index"] for row in rows]
+
+    def batch_documents(self, job_id: str, batch_index: int) -> List[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT documents FROM job_batches WHERE job_id = ? AND batch_index = ?", (job_id, batch_index)
+            ).fetchone()
+        return json.loads(row["documents"])
+
+    def finish_batch(self, job_id: str, batch_index: int, points: int, error: Optional[str] = None) -> None:
+        """Checkpoint: marca el batch como terminado y suma sus puntos al job en una sola transacción."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE job_batches SET status = ?, points = ?, error = ? WHERE job_id = ? AND batch_index = ?",
+                ("failed" if error else "done", points, error, job_id, batch_index)
+            )
+            self._conn.execute(
+                "UPDATE jobs SET points = points + ?, updated_at = ? WHERE id = ?", (points, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = COALESCE(?, error), updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def request_cancel(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status NOT IN (?, ?, ?)",
+                (time.time(), job_id, *TERMINAL_STATUSES)
+            )
+            self._conn.commit()
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobQueue:
+    """
+    Cola de jobs de ingesta en segundo plano con un pool acotado de workers en el
+    mismo proceso. Cada job se procesa batch a batch y cada batch terminado queda
+    registrado en el store; al reiniciar, los jobs en cola o interrumpidos se
+    retoman desde el primer batch pendiente.
+
+    Args:
+        store (SQLiteJobStore): Persistencia de jobs y batches.
+        handler (Callable): Corrutina `(collection_name, documents, options) -> dict`
+            que procesa un batch; devuelve "num_points" o un dict con "error".
+        workers (int): Jobs procesándose a la vez. Mantenerlo bajo deja capacidad
+            para las búsquedas interactivas.
+        batch_size (int): Documentos por batch (unidad de checkpoint).
+    """
+
+    def __init__(
+        self,
+        store: SQLiteJobStore,
+        handler: Callable[[str, List[dict], dict], Awaitable[Dict]],
+        workers: int = 1,
+        batch_size: int = 32
+    ):
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.batch_size = batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Lanza los workers y vuelve a encolar los jobs que quedaron sin terminar."""
+        self._queue = asyncio.Queue()
+        for job_id in await asyncio.to_thread(self.store.unfinished):
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Detiene los workers; el job en curso queda 'running' y se retoma al reiniciar."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, collection_name: str, documents: List[dict], options: Optional[dict] = None) -> str:
+        """Persiste el job dividido en batches y lo encola. Devuelve su ID."""
+        if self._queue is None:
+            raise RuntimeError("Cola de jobs no iniciada")
+        batches = [documents[i:i + self.batch_size] for i in range(0, len(documents), self.batch_size)]
+        job_id = await asyncio.to_thread(self.store.create, collection_name, batches, options or {})
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def cancel(self, job_id: str) -> Optional[dict]:
+        """Pide cancelar el job; se detiene antes del siguiente batch. Los batches ya subidos se conservan."""
+        await asyncio.to_thread(self.store.request_cancel, job_id)
+        return await self.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await asyncio.to_thread(self.store.set_status, job_id, "failed", str(e))
+
+    async def _run(self, job_id: str) -> None:
+        job = await self.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            return
+        await asyncio.to_thread(self.store.set_status, job_id, "running")
+
+        for batch_index in await asyncio.to_thread(self.store.pending_batches, job_id):
+            if await asyncio.to_thread(self.store.cancel_requested, job_id):
+                await asyncio.to_thread(self.store.set_status, job_id, "cancelled")
+                return
+            documents = await asyncio.to_thread(self.store.batch_documents, job_id, batch_index)
+            try:
+                result = await self.handler(job["collection_name"], documents, job["options"])
+            except Exception as e:
+                result = {"error": str(e)}
+            await asyncio.to_thread(
+                self.store.finish_batch, job_id, batch_index, result.get("num_points", 0), result.get("error")
+            )
+
+        job = await self.get(job_id)
+        if job["batches"]["failed"]:
+            await asyncio.to_thread(
+                self.store.set_status, job_id, "failed", f"{job['batches']['failed']} batch(es) fallaron"
+            )
+        else:
+            await asyncio.to_thread(self.store.set_status, job_id, "completed")
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def start_job_queue(handler: Callable[[str, List[dict], dict], Awaitable[Dict]]) -> JobQueue:
+    """
+    Crea la cola compartida a partir de las variables de entorno.
+    Se llama desde el lifespan de la aplicación; luego hay que llamar a `start()`.
+    """
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(
+            SQLiteJobStore(get_env_var("JOBS_DB_PATH", "jobs.sqlite3")),
+            handler,
+            workers=int(get_env_var("JOB_WORKERS", 1)),
+            batch_size=int(get_env_var("JOB_BATCH_SIZE", 32)),
+        )
+    return _job_queue
+
+
+def get_job_queue() -> JobQueue:
+    if _job_queue is None:
+        raise RuntimeError("Cola de jobs no iniciada")
+    return _job_queue
+
+
+async def close_job_queue() -> None:
+    global _job_queue
+    if _job_queue is not None:
+        await _job_queue.stop()
+        _job_queue.store.close()
+        _job_queue = None
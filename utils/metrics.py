@@ -0,0 +1,168 @@
+# utils/metrics.py
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# Etapas instrumentadas:
+#   chunking, embedding_http, embedding_cache          (api)
+#   qdrant_upsert, qdrant_search, qdrant_scroll, qdrant_delete (api)
+#   queue_wait, encode                                 (embeddings_service)
+#   serialization                                      (ambos)
+STAGE_LATENCY = Histogram(
+    "rag_stage_duration_seconds",
+    "Duración de cada etapa del pipeline",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUEST_LATENCY = Histogram(
+    "rag_http_request_duration_seconds",
+    "Duración total de cada request HTTP",
+    ["method", "route", "status"],
+)
+BATCH_SIZE = Histogram(
+    "rag_batch_size",
+    "Elementos por batch (textos, puntos o búsquedas)",
+    ["stage"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096),
+)
+PAYLOAD_BYTES = Histogram(
+    "rag_payload_bytes",
+    "Tamaño en bytes de los payloads intercambiados",
+    ["stage"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+ERRORS = Counter(
+    "rag_errors_total",
+    "Errores por etapa",
+    ["stage"],
+)
+
+# Tiempos acumulados del request en curso, para el header Server-Timing
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[Dict[str, float]]:
+    """Devuelve el diccionario de tiempos del request en curso (None fuera de un request)."""
+    return _request_timings.get()
+
+
+def add_timing(timings: Optional[Dict[str, float]], stage: str, seconds: float) -> None:
+    """Suma `seconds` a la etapa en un diccionario de tiempos capturado con `current_timings()`."""
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def record(stage: str, seconds: float) -> None:
+    """Registra la duración de una etapa en el histograma y en el request en curso."""
+    STAGE_LATENCY.labels(stage).observe(seconds)
+    add_timing(current_timings(), stage, seconds)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """
+    Mide el bloque como una etapa. Si el bloque lanza una excepción se cuenta
+    como error de la etapa y se propaga.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        ERRORS.labels(stage).inc()
+        raise
+    finally:
+        record(stage, time.perf_counter() - started)
+
+
+def observe_batch(stage: str, size: int) -> None:
+    BATCH_SIZE.labels(stage).observe(size)
+
+
+def observe_bytes(stage: str, size: int) -> None:
+    PAYLOAD_BYTES.labels(stage).observe(size)
+
+
+def count_error(stage: str) -> None:
+    ERRORS.labels(stage).inc()
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items())
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse que mide la serialización del body como etapa `serialization`."""
+
+    def render(self, content) -> bytes:
+        with timed("serialization"):
+            body = super().render(content)
+        observe_bytes("response", len(body))
+        return body
+
+
+class TimedORJSONResponse(ORJSONResponse):
+    """
+    Igual que TimedJSONResponse pero serializa con orjson (requiere el paquete `orjson`).
+    Las rutas que la devuelven directamente evitan además el `jsonable_encoder` de FastAPI.
+    """
+
+    def render(self, content) -> bytes:
+        with timed("serialization"):
+            body = super().render(content)
+        observe_bytes("response", len(body))
+        return body
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware ASGI que abre un contexto de tiempos por request, agrega el header
+    `Server-Timing` con las etapas medidas y registra la latencia total por ruta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timings["total"] = time.perf_counter() - started
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing_header(timings).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            # Se usa la plantilla de la ruta (no el path real) para acotar la cardinalidad
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope.get("method", ""),
+                getattr(route, "path", "unmatched"),
+                str(status),
+            ).observe(time.perf_counter() - started)
+            if status >= 500:
+                count_error("http")
+
+
+def metrics_response() -> Response:
+    """Respuesta con todas las métricas en el formato de texto de Prometheus."""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
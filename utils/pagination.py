@@ -0,0 +1,49 @@
+# utils/pagination.py
+
+import base64
+import json
+from typing import Optional, Union
+
+# ID de punto de Qdrant, o {"p": clave de partición, "o": ID | None} en colecciones particionadas
+PointOffset = Union[int, str, dict]
+
+
+def encode_cursor(offset: Optional[PointOffset]) -> Optional[str]:
+    """
+    Convierte el `next_page_offset` de Qdrant en un cursor opaco (base64 url-safe).
+
+    Args:
+        offset (int | str | dict | None): ID del primer punto de la página siguiente, o el
+            offset compuesto (partición + ID) de una colección particionada por tiempo.
+
+    Returns:
+        str | None: Cursor opaco o None si no hay más páginas.
+    """
+    if offset is None:
+        return None
+    raw = json.dumps({"o": offset}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[PointOffset]:
+    """
+    Recupera el offset de Qdrant a partir de un cursor generado con `encode_cursor`.
+
+    Raises:
+        ValueError: Si el cursor no es válido.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        offset = data["o"]
+    except Exception:
+        raise ValueError("Cursor inválido")
+    if isinstance(offset, dict):
+        if not isinstance(offset.get("p"), str) or not isinstance(offset.get("o"), (int, str, type(None))):
+            raise ValueError("Cursor inválido")
+        return offset
+    if not isinstance(offset, (int, str)):
+        raise ValueError("Cursor inválido")
+    return offset
@@ -1,15 +1,70 @@
 # utils/payload.py
 
-from typing import List, Dict
-from utils.chunking import text_splitter
+from typing import List, Dict, Optional, Tuple
+from utils.chunking import split_texts, CHUNK_MAX_SIZE, CHUNK_OVERLAP
 from utils.serialization import serialize_metadata
 from utils.embedding_client import get_embeddings
+from utils.metrics import timed, observe_batch
+from utils.projection import project
+
+def chunk_documents(
+        data: List[Dict[str, str]],
+        max_words: int = CHUNK_MAX_SIZE,
+        overlap: int = CHUNK_OVERLAP,
+        chunk: bool = True
+) -> Tuple[List[str], List[Dict]]:
+    """
+    Divide los documentos en chunks y serializa su metadata. Es trabajo de CPU puro;
+    con CHUNK_PROCESSES > 1 las cargas grandes se reparten en un pool de procesos.
+
+    Args:
+        data (List[Dict]): Lista de documentos con "text" y "metadata".
+        max_words (int): Tamaño máximo por chunk, en la unidad de CHUNK_UNIT (tokens o palabras).
+        overlap (int): Solapamiento entre chunks, en la misma unidad.
+        chunk (bool): Si es False, cada documento se usa completo como un único fragmento.
+
+    Returns:
+        Tuple[List[str], List[Dict]]: Fragmentos y la metadata serializada de cada uno.
+    """
+    texts = [doc.text for doc in data]
+    with timed("chunking"):
+        chunks_per_doc = split_texts(texts, max_words, overlap) if chunk else [[text] for text in texts]
+    observe_batch("chunking", len(texts))
+
+    all_chunks = []
+    all_metadata = []
+    for doc, chunks in zip(data, chunks_per_doc):
+        metadata = serialize_metadata(doc.metadata.dict() if doc.metadata else {})
+        all_chunks.extend(chunks)
+        all_metadata.extend([metadata] * len(chunks))
+
+    return all_chunks, all_metadata
+
+async def embed_chunks(chunks: List[str], metadata: List[Dict], collection_name: Optional[str] = None) -> List[Dict]:
+    """
+    Obtiene los embeddings de los fragmentos y arma los payloads para Qdrant.
+    Si la colección tiene una proyección (utils.projection) se aplica a toda la matriz.
+
+    Returns:
+        List[Dict]: Lista de payloads con keys "text", "embedding" y "metadata".
+    """
+    if not chunks:
+        return []
+    embeddings = project(collection_name, await get_embeddings(chunks, operation="ingest"))
+    return [
+        {
+            "text": chunk,
+            "embedding": embedding,
+            "metadata": meta
+        } for chunk, embedding, meta in zip(chunks, embeddings, metadata)
+    ]
 
 async def build_payload(
         data: List[Dict[str, str]],
-        max_words: int = 1000,
-        overlap: int = 100,
-        chunk : bool = True
+        max_words: int = CHUNK_MAX_SIZE,
+        overlap: int = CHUNK_OVERLAP,
+        chunk : bool = True,
+        collection_name: Optional[str] = None
 ) -> List[Dict]:
     """
     Procesa un documento para dividirlo en chunks, obtener embeddings y preparar payloads.
@@ -18,69 +73,52 @@ async def build_payload(
         data (List[Dict]): Lista de documentos, donde cada documento es un dict con keys:
             - "text" (str): Texto a chunkear.
             - "metadata" (dict): Metadatos asociados al texto.
-        max_words (int): Máximo número de palabras por chunk.
-        overlap (int): Número de palabras solapadas entre chunks.
+        max_words (int): Tamaño máximo por chunk, en la unidad de CHUNK_UNIT (tokens o palabras).
+        overlap (int): Solapamiento entre chunks, en la misma unidad.
+        chunk (bool): Si es False, cada documento se sube completo como un único fragmento.
+        collection_name (str, optional): Colección destino, para aplicar su proyección si tiene.
 
     Returns:
         List[Dict]: Lista de payloads con keys:
             - "text": fragmento de texto chunked.
-            - "embeddings": vector embedding del chunk.
+            - "embedding": vector embedding del chunk (fila de np.ndarray).
             - "metadata": metadatos serializados.
     """
-    payloads = []
     try:
-        if not chunk:
-            text = data[0].text
-            metadata = data[0].metadata.dict() if data[0].metadata else {}
-            all_chunks = [text]
-            all_metadata = [serialize_metadata(metadata)]
-            embeddings = await get_embeddings(all_chunks)
-
-            for chunk, embedding, metadata in zip(all_chunks, embeddings, all_metadata):
-                payloads.append({
-                    "text": chunk,
-                    "embedding": embedding,
-                    "metadata": metadata
-                })
-            return payloads
-                
-        else:
-            all_chunks = []
-            all_metadata = []
-            # Si se requiere chunking, procesar cada documento
-            for doc in data:
-                text = doc.text
-                metadata = doc.metadata.dict() if doc.metadata else {}
-                chunks = text_splitter(text, max_words=max_words, overlap=overlap)
-
-                all_chunks.extend(chunks)
-                all_metadata.extend([serialize_metadata(metadata)] * len(chunks))
-
-            embeddings = await get_embeddings(all_chunks)
-
-            for chunk, embedding, metadata in zip(all_chunks, embeddings, all_metadata):
-                payloads.append({
-                    "text": chunk,
-                    "embedding": embedding,
-                    "metadata": metadata
-                })
-
-            return payloads
+        all_chunks, all_metadata = chunk_documents(data, max_words=max_words, overlap=overlap, chunk=chunk)
+        return await embed_chunks(all_chunks, all_metadata, collection_name)
     except Exception as e:
         return [{"error": str(e)}]
     
-async def build_query_vector(query: str) -> list:
+async def build_query_vector(query: str, collection_name: Optional[str] = None) -> list:
     """
     Genera un vector de embedding para una consulta de búsqueda.
 
     Args:
         query (str): Texto de búsqueda.
+        collection_name (str, optional): Colección consultada, para aplicar su proyección si tiene.
 
     Returns:
         list: Vector de embedding correspondiente al query.
     """
     try:
-        embeddings = await get_embeddings([query])
-        return embeddings[0]
+        embeddings = project(collection_name, await get_embeddings([query]))
+        return embeddings[0].tolist()
+    except Exception as e:
+        raise RuntimeError(f"Error generating query embedding: {str(e)}")
+async def build_query_vectors(queries: List[str], collection_name: Optional[str] = None) -> List[list]:
+    """
+    Genera los vectores de varias consultas con un único llamado al servicio de embeddings.
+
+    Args:
+        queries (List[str]): Textos de búsqueda.
+        collection_name (str, optional): Colección consultada, para aplicar su proyección si tiene.
+
+    Returns:
+        List[list]: Un vector por consulta, en el mismo orden.
+    """
+    try:
+        embeddings = project(collection_name, await get_embeddings(queries))
+        return embeddings.tolist()
     except Exception as e:
-        raise RuntimeError(f"Error generating query embedding: {str(e)}")
\ No newline at end of file
+        raise RuntimeError(f"Error generating query embeddings: {str(e)}")
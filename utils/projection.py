@@ -0,0 +1,247 @@
+# utils/projection.py
+"""
+Proyección PCA opcional por colección para reducir la dimensión de los vectores.
+
+La matriz de proyección se guarda como `{PROJECTION_DIR}/{colección}.npz` y, si existe,
+se aplica a los embeddings de esa colección tanto al subir documentos como al buscar.
+
+Uso:
+    # Recall@k y ahorro de memoria de varias dimensiones sobre una muestra de la colección
+    python -m utils.projection evaluate --collection noticias --dims 128 256
+
+    # Ajustar la proyección y copiar los puntos re-proyectados a una colección nueva, sin re-embeber
+    python -m utils.projection migrate --collection noticias --dim 256 --target noticias_256
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from utils.env import get_env_var
+from utils.file_store import MtimeCache, atomic_write
+
+PROJECTION_DIR = get_env_var("PROJECTION_DIR", "projections")
+
+
+class Projection:
+    """
+    Proyección lineal `(x - mean) @ components` seguida de normalización L2.
+
+    Args:
+        mean (np.ndarray): Media de la muestra de ajuste, shape (d,).
+        components (np.ndarray): Componentes principales en columnas, shape (d, k).
+        explained_variance (float): Fracción de la varianza de la muestra que conservan los k componentes.
+    """
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray, explained_variance: float = 0.0):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+        self.explained_variance = float(explained_variance)
+
+    @property
+    def input_dim(self) -> int:
+        return self.components.shape[0]
+
+    @property
+    def output_dim(self) -> int:
+        return self.components.shape[1]
+
+    def apply(self, vectors) -> np.ndarray:
+        """Proyecta una matriz (n, d) con un único matmul y normaliza cada fila."""
+        projected = (np.asarray(vectors, dtype=np.float32) - self.mean) @ self.components
+        norms = np.linalg.norm(projected, axis=1, keepdims=True)
+        return projected / np.maximum(norms, 1e-12)
+
+    def save(self, path: Path) -> None:
+        atomic_write(
+            path,
+            lambda tmp: np.savez(tmp, mean=self.mean, components=self.components, explained_variance=self.explained_variance),
+            tmp_suffix=".tmp.npz"
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "Projection":
+        with np.load(path) as data:
+            return cls(data["mean"], data["components"], float(data["explained_variance"]))
+
+
+def fit_pca(sample: np.ndarray, dim: int) -> Projection:
+    """
+    Ajusta PCA con SVD sobre una muestra de embeddings.
+
+    Args:
+        sample (np.ndarray): Embeddings de la colección, shape (n, d).
+        dim (int): Dimensión de salida (menor o igual a min(n, d)).
+    """
+    sample = np.asarray(sample, dtype=np.float32)
+    if dim > min(sample.shape):
+        raise ValueError(f"La dimensión {dim} supera el rango de la muestra {sample.shape}")
+    mean = sample.mean(axis=0)
+    _, singular_values, vt = np.linalg.svd(sample - mean, full_matrices=False)
+    variance = singular_values ** 2
+    return Projection(mean, vt[:dim].T, variance[:dim].sum() / variance.sum())
+
+
+def projection_path(collection_name: str) -> Path:
+    return Path(PROJECTION_DIR) / f"{collection_name}.npz"
+
+
+_projections = MtimeCache(projection_path, Projection.load)
+
+
+def get_projection(collection_name: str) -> Optional[Projection]:
+    """Devuelve la proyección de la colección, o None si no tiene."""
+    return _projections.get(collection_name)
+
+
+def save_projection(collection_name: str, projection: Projection) -> None:
+    projection.save(projection_path(collection_name))
+
+
+def delete_projection(collection_name: str) -> None:
+    """Elimina la proyección de la colección (al borrarla o recrearla)."""
+    _projections.delete(collection_name)
+
+
+def project(collection_name: Optional[str], vectors: np.ndarray) -> np.ndarray:
+    """Aplica la proyección de la colección si tiene una; si no, devuelve los vectores sin cambios."""
+    projection = get_projection(collection_name) if collection_name else None
+    return projection.apply(vectors) if projection is not None else vectors
+
+
+def recall_at_k(base: np.ndarray, queries: np.ndarray, projection: Projection, k: int) -> float:
+    """
+    Recall@k de la búsqueda en el espacio proyectado respecto de la búsqueda exacta
+    en la dimensión completa (producto interno sobre vectores normalizados).
+    """
+    def normalize(matrix):
+        return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+    truth = np.argsort(-(normalize(queries) @ normalize(base).T), axis=1)[:, :k]
+    found = np.argsort(-(projection.apply(queries) @ projection.apply(base).T), axis=1)[:, :k]
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth.tolist(), found.tolist()))
+    return hits / (len(queries) * k)
+
+
+def memory_report(points: int, input_dim: int, output_dim: int) -> dict:
+    """Memoria de los vectores fp32 antes y después de proyectar (sin índice ni payload)."""
+    full = points * input_dim * 4
+    reduced = points * output_dim * 4
+    return {
+        "points": points,
+        "full_bytes": full,
+        "projected_bytes": reduced,
+        "saved_bytes": full - reduced,
+        "ratio": reduced / full if full else 0.0,
+    }
+
+
+async def sample_vectors(collection_name: str, size: int, page_size: int = 1000) -> np.ndarray:
+    """Lee hasta `size` vectores de la colección (los primeros del scroll)."""
+    from core.client import iter_points
+
+    vectors = []
+    async for points, _ in iter_points(collection_name, None, page_size, with_vectors=True, payload_fields=[]):
+        vectors.extend(point.vector for point in points)
+        if len(vectors) >= size:
+            break
+    return np.asarray(vectors[:size], dtype=np.float32)
+
+
+async def evaluate(collection_name: str, dims: list, sample_size: int, queries: int, k: int) -> dict:
+    """
+    Ajusta PCA sobre una muestra y mide, para cada dimensión, recall@k y ahorro de memoria.
+    Las consultas se separan de la muestra de ajuste.
+    """
+    from core.client import count_points
+
+    sample = await sample_vectors(collection_name, sample_size + queries)
+    if len(sample) <= queries:
+        raise ValueError(f"La colección '{collection_name}' tiene muy pocos puntos para evaluar")
+    query_vectors, base = sample[:queries], sample[queries:]
+    points = await count_points(collection_name)
+
+    results = []
+    for dim in dims:
+        projection = fit_pca(base, dim)
+        results.append({
+            "dim": dim,
+            "explained_variance": projection.explained_variance,
+            f"recall@{k}": recall_at_k(base, query_vectors, projection, k),
+            "memory": memory_report(points, sample.shape[1], dim),
+        })
+    return {"collection_name": collection_name, "input_dim": sample.shape[1], "sample": len(base), "results": results}
+
+
+async def migrate(collection_name: str, dim: int, target: str, sample_size: int, page_size: int, profile: str) -> dict:
+    """
+    Ajusta la proyección sobre una muestra de `collection_name`, crea `target` con la
+    dimensión reducida y copia todos los puntos re-proyectados, conservando IDs y payloads.
+    La proyección queda guardada para `target`, así las nuevas cargas y búsquedas la usan.
+    """
+    from api.schemas import METADATA_PAYLOAD_INDEXES
+    from core.client import create_collection, iter_points, upsert_points
+
+    projection = fit_pca(await sample_vectors(collection_name, sample_size), dim)
+    created = await create_collection(target, dim, METADATA_PAYLOAD_INDEXES, profile)
+    if "error" in created:
+        raise RuntimeError(created["error"])
+    save_projection(target, projection)
+
+    migrated = 0
+    async for points, _ in iter_points(collection_name, None, page_size, with_vectors=True):
+        if not points:
+            continue
+        await upsert_points(
+            target,
+            ids=[point.id for point in points],
+            vectors=projection.apply([point.vector for point in points]),
+            payloads=[point.payload for point in points]
+        )
+        migrated += len(points)
+
+    return {
+        "source": collection_name,
+        "target": target,
+        "dim": dim,
+        "explained_variance": projection.explained_variance,
+        "migrated": migrated,
+        "projection_path": str(projection_path(target)),
+        "memory": memory_report(migrated, projection.input_dim, dim),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    evaluate_parser = commands.add_parser("evaluate", help="Medir recall@k y memoria para varias dimensiones")
+    evaluate_parser.add_argument("--collection", required=True)
+    evaluate_parser.add_argument("--dims", type=int, nargs="+", default=[64, 128, 256])
+    evaluate_parser.add_argument("--sample", type=int, default=20_000)
+    evaluate_parser.add_argument("--queries", type=int, default=200)
+    evaluate_parser.add_argument("--k", type=int, default=10)
+
+    migrate_parser = commands.add_parser("migrate", help="Copiar la colección re-proyectada a una colección nueva")
+    migrate_parser.add_argument("--collection", required=True)
+    migrate_parser.add_argument("--dim", type=int, required=True)
+    migrate_parser.add_argument("--target", help="Colección destino (por defecto '{colección}_{dim}')")
+    migrate_parser.add_argument("--sample", type=int, default=20_000)
+    migrate_parser.add_argument("--page-size", type=int, default=1000)
+    migrate_parser.add_argument("--profile", default="default")
+
+    args = parser.parse_args()
+    if args.command == "evaluate":
+        result = asyncio.run(evaluate(args.collection, args.dims, args.sample, args.queries, args.k))
+    else:
+        target = args.target or f"{args.collection}_{args.dim}"
+        result = asyncio.run(migrate(args.collection, args.dim, target, args.sample, args.page_size, args.profile))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
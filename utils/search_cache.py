@@ -0,0 +1,168 @@
+# utils/search_cache.py
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from utils.embedding_cache import normalize_text
+from utils.env import get_env_var
+
+
+class SearchCache:
+    """
+    Cache TTL + LRU de resultados de búsqueda, con invalidación por colección.
+
+    Cada colección tiene un contador de generación que forma parte de la clave:
+    al escribir o borrar en la colección se incrementa y las entradas anteriores
+    dejan de ser alcanzables (el LRU las expulsa con el tiempo). Los misses
+    idénticos concurrentes comparten un único cálculo.
+
+    Una escritura con wait=false vuelve antes de que Qdrant la aplique: durante
+    `settle_seconds` no se cachean los resultados de esa colección, para no guardar
+    datos viejos bajo la generación nueva hasta que venza el TTL.
+
+    Args:
+        max_entries (int): Máximo número de resultados en memoria.
+        ttl_seconds (float): Vida máxima de cada resultado; 0 desactiva el cache.
+        settle_seconds (float): Ventana sin cache tras una escritura sin confirmar.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0, settle_seconds: float = 5.0):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.settle_seconds = settle_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        # colección -> instante (monotonic) hasta el que no se cachea
+        self._unsettled_until: Dict[str, float] = {}
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def request_key(query: str, **params) -> str:
+        """
+        Normaliza la consulta y sus parámetros (filtros, límite, umbral) en una clave estable.
+        """
+        return json.dumps(
+            {"query": normalize_text(query), **params},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+
+    def generation(self, collection_name: str) -> int:
+        return self._generations.get(collection_name, 0)
+
+    def invalidate(self, collection_name: str, pending: bool = False) -> None:
+        """
+        Incrementa la generación de la colección tras una escritura o borrado.
+        Con `pending=True` (escritura encolada con wait=false) además suspende el cache
+        de la colección durante `settle_seconds`.
+        """
+        self._generations[collection_name] = self.generation(collection_name) + 1
+        self.invalidations += 1
+        if pending:
+            self._unsettled_until[collection_name] = time.monotonic() + self.settle_seconds
+
+    def _settled(self, collection_name: str) -> bool:
+        until = self._unsettled_until.get(collection_name)
+        if until is None:
+            return True
+        if until <= time.monotonic():
+            del self._unsettled_until[collection_name]
+            return True
+        return False
+
+    def _get(self, key: Tuple) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key: Tuple, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_compute(
+        self,
+        collection_name: str,
+        request_key: str,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Devuelve el resultado cacheado o lo calcula una sola vez aunque lleguen
+        varios requests idénticos a la vez. Las excepciones no se cachean y cancelar
+        un request no cancela el cálculo que comparten los demás.
+
+        Args:
+            collection_name (str): Colección consultada.
+            request_key (str): Clave generada con `request_key()`.
+            compute (Callable): Corrutina sin argumentos que ejecuta la búsqueda.
+        """
+        if self.ttl <= 0 or self.max_entries <= 0 or not self._settled(collection_name):
+            return await compute()
+
+        generation = self.generation(collection_name)
+        key = (collection_name, generation, request_key)
+
+        value = self._get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            # shield: si este caller se cancela no debe cancelar el cálculo compartido
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        # El cálculo corre como task propia: si el primer caller se cancela, los que
+        # se sumaron siguen esperando el mismo resultado
+        task = asyncio.ensure_future(compute())
+        self._inflight[key] = task
+
+        def finish(done: asyncio.Task) -> None:
+            self._inflight.pop(key, None)
+            if done.cancelled() or done.exception() is not None:
+                return
+            # Si hubo una escritura mientras se calculaba, el resultado ya no corresponde a la generación vigente
+            if self.generation(collection_name) == generation and self._settled(collection_name):
+                self._put(key, done.result())
+
+        task.add_done_callback(finish)
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "settle_seconds": self.settle_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+
+search_cache = SearchCache(
+    max_entries=int(get_env_var("SEARCH_CACHE_MAX_ENTRIES", 1024)),
+    ttl_seconds=float(get_env_var("SEARCH_CACHE_TTL", 60)),
+    settle_seconds=float(get_env_var("SEARCH_CACHE_SETTLE_SECONDS", 5)),
+)
@@ -0,0 +1,61 @@
+# utils/vector_codec.py
+
+import io
+import struct
+
+import numpy as np
+
+JSON_MEDIA_TYPE = "application/json"
+# float32 little-endian crudo precedido por un header de 8 bytes: filas y dimensión (uint32 LE)
+F32_MEDIA_TYPE = "application/x-embeddings-f32"
+# Formato .npy estándar de NumPy
+NPY_MEDIA_TYPE = "application/x-npy"
+
+BINARY_MEDIA_TYPES = (F32_MEDIA_TYPE, NPY_MEDIA_TYPE)
+
+_HEADER = struct.Struct("<II")
+
+
+def negotiate_media_type(accept: str | None) -> str:
+    """
+    Elige el formato de respuesta a partir del header Accept.
+    Si no se pide explícitamente un formato binario se usa JSON.
+    """
+    if not accept:
+        return JSON_MEDIA_TYPE
+    requested = [part.split(";")[0].strip() for part in accept.split(",")]
+    for media_type in requested:
+        if media_type in BINARY_MEDIA_TYPES or media_type == JSON_MEDIA_TYPE:
+            return media_type
+    return JSON_MEDIA_TYPE
+
+
+def encode_embeddings(embeddings: np.ndarray, media_type: str) -> bytes:
+    """
+    Serializa una matriz (n, dim) en el formato binario indicado.
+    """
+    matrix = np.ascontiguousarray(embeddings, dtype="<f4")
+    if matrix.ndim != 2:
+        raise ValueError(f"Se esperaba una matriz 2D, se recibió shape {matrix.shape}")
+
+    if media_type == F32_MEDIA_TYPE:
+        return _HEADER.pack(*matrix.shape) + matrix.tobytes()
+    if media_type == NPY_MEDIA_TYPE:
+        buffer = io.BytesIO()
+        np.save(buffer, matrix, allow_pickle=False)
+        return buffer.getvalue()
+    raise ValueError(f"Formato binario no soportado: {media_type}")
+
+
+def decode_embeddings(content: bytes, media_type: str) -> np.ndarray:
+    """
+    Decodifica una respuesta binaria en una matriz float32 (n, dim).
+    Para el formato f32 el array es una vista de solo lectura sobre `content`, sin copias.
+    """
+    media_type = media_type.split(";")[0].strip()
+    if media_type == F32_MEDIA_TYPE:
+        rows, dim = _HEADER.unpack_from(content)
+        return np.frombuffer(content, dtype="<f4", count=rows * dim, offset=_HEADER.size).reshape(rows, dim)
+    if media_type == NPY_MEDIA_TYPE:
+        return np.load(io.BytesIO(content), allow_pickle=False)
+    raise ValueError(f"Formato binario no soportado: {media_type}")